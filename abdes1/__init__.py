@@ -1,3 +1,5 @@
+__version__ = "0.1.0"
+
 from abdes1.actors import *
 
 # from abdes1.actors import Message
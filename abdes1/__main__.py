@@ -0,0 +1,179 @@
+"""
+__main__.py
+
+Command line interface.
+
+    python -m abdes1 run <config.json>
+    python -m abdes1 run <config.json> --until 1000 --checkpoint warm.ckpt
+    python -m abdes1 replicate <config.json> -n 100
+    python -m abdes1 sweep <config.json> --grid Server.service_rate=1.8,2.0,2.5 --seeds 10
+    python -m abdes1 plot <output> --window 1000:1100
+
+run runs the simulation described by the configuration (see abdes1/des/topology.py) with the synchronous kernel.
+replicate runs independent replications in parallel and reports confidence intervals (see abdes1/des/replications.py).
+sweep runs a configuration at the points of a grid or a Latin hypercube design, with a result cache (see abdes1/des/sweep.py).
+plot plots the queue depths written by a stats actor, downsampled, e.g. a zoom into a window (see abdes1/des/plotting.py).
+"""
+import argparse
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+from abdes1 import __version__
+from abdes1.core import TraceRecorder, create_future_event_list
+from abdes1.des import DE_EventLoop
+from abdes1.des.topology import build_actor_system, load_config
+from abdes1.utils.logger import configure_logging
+
+
+def run(args: argparse.Namespace) -> None:
+    config = load_config(args.config)
+    trace = TraceRecorder(args.trace) if args.trace is not None else None
+    event_loop = DE_EventLoop(synchronous=True, future_event_list=create_future_event_list(args.future_event_list), batch=args.batch, trace=trace)
+    if args.restore is not None:
+        from abdes1.des.checkpoint import load_checkpoint, restore_checkpoint
+
+        actor_system = restore_checkpoint(load_checkpoint(args.restore), config, event_loop, seed=args.seed)
+    else:
+        actor_system = build_actor_system(config, event_loop, seed=args.seed)
+    try:
+        asyncio.run(actor_system.run(until=args.until))
+    finally:
+        if trace is not None:
+            trace.close()
+    if args.checkpoint is not None:
+        from abdes1.des.checkpoint import save_checkpoint
+
+        save_checkpoint(actor_system, args.checkpoint)
+    print(f"Simulation completed: {event_loop.event_count} events dispatched, simulation time {event_loop.current_time:.2f}, seed {actor_system.random_streams.seed}.")
+
+
+def replicate(args: argparse.Namespace) -> None:
+    # Imported here so that run does not pay for the process pool machinery
+    from abdes1.des.replications import run_replications
+
+    config = load_config(args.config)
+    checkpoint = None
+    if args.checkpoint is not None:
+        from abdes1.des.checkpoint import load_checkpoint
+
+        checkpoint = load_checkpoint(args.checkpoint)
+    seeds = range(args.seed, args.seed + args.replications)
+    results = run_replications(
+        config, seeds, args.output_dir, max_workers=args.workers, plot=args.plot, log_level=args.log_level or "WARNING", checkpoint=checkpoint
+    )
+
+    print(f"{args.replications} replications, seeds {seeds.start}..{seeds.stop - 1}, {args.level:.0%} confidence intervals:")
+    for name, ci in results.confidence_intervals(args.level).items():
+        print(f"  {name:<28} {ci.mean:>14.4f} +/- {ci.half_width:.4f}")
+
+
+def parse_parameter(argument: str) -> Tuple[str, str]:
+    path, separator, values = argument.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Expected <path>=<values>, got '{argument}'")
+    return path, values
+
+
+def parse_number(value: str) -> Any:
+    number = float(value)
+    return int(number) if number.is_integer() and "." not in value else number
+
+
+def sweep(args: argparse.Namespace) -> None:
+    from abdes1.des.sweep import grid, latin_hypercube, run_sweep
+
+    config = load_config(args.config)
+    if args.lhs:
+        ranges = {}
+        for path, values in args.lhs:
+            low, _, high = values.partition(":")
+            ranges[path] = (float(low), float(high))
+        points = latin_hypercube(ranges, args.points, seed=args.seed)
+    else:
+        points = grid({path: [parse_number(value) for value in values.split(",")] for path, values in args.grid})
+
+    seeds = range(args.seed, args.seed + args.seeds)
+    results = run_sweep(config, points, seeds, args.output_dir, cache_dir=args.cache_dir, max_workers=args.workers, log_level=args.log_level or "WARNING")
+
+    names = list(dict.fromkeys(name for result in results for name in result.summary))
+    paths = list(points[0]) if points else []
+    print(",".join(paths + ["seed", "cached"] + names))
+    for result in results:
+        print(",".join([str(result.point[path]) for path in paths] + [str(result.seed), str(result.cached)] + [str(result.summary.get(name, "")) for name in names]))
+
+
+def parse_window(argument: str) -> Tuple[float, float]:
+    start, separator, end = argument.partition(":")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"Expected <start>:<end>, got '{argument}'")
+    return float(start), float(end)
+
+
+def plot(args: argparse.Namespace) -> None:
+    from abdes1.des.plotting import plot_queue_depths
+
+    print(plot_queue_depths(args.output, png_path=args.png, window=args.window, method=args.method, pixels=args.pixels))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="abdes1", description="Actor based discrete event simulation.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("--log-level", default=None, help="Default log level (e.g. WARNING). Overridden by LOGGING_LEVEL_DEFAULT.")
+    parser.add_argument("--log-file", default=None, help="Also write the log to this file.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the simulation described by a configuration file.")
+    run_parser.add_argument("config", help="Path to the configuration file.")
+    run_parser.add_argument("--future-event-list", default="heap", choices=["heap", "calendar", "ladder"], help="Future event list implementation.")
+    run_parser.add_argument("--batch", action="store_true", help="Dispatch events with the same timestamp in batches per actor.")
+    run_parser.add_argument("--trace", default=None, help="Record a binary trace of all dispatched events to this file.")
+    run_parser.add_argument("--seed", type=int, default=None, help="Master seed of the random streams. Random if not given. With --restore: reseed the continuation.")
+    run_parser.add_argument("--until", type=float, default=None, help="Stop at this simulation time.")
+    run_parser.add_argument("--checkpoint", default=None, help="Save a checkpoint to this file when the run stops.")
+    run_parser.add_argument("--restore", default=None, help="Continue from a checkpoint file instead of starting at time 0.")
+    run_parser.set_defaults(func=run)
+
+    replicate_parser = commands.add_parser("replicate", help="Run independent replications in parallel and report confidence intervals.")
+    replicate_parser.add_argument("config", help="Path to the configuration file.")
+    replicate_parser.add_argument("-n", "--replications", type=int, default=10, help="Number of replications.")
+    replicate_parser.add_argument("--seed", type=int, default=1, help="Seed of the first replication; the others use the following seeds.")
+    replicate_parser.add_argument("--output-dir", default="replications", help="Every replication writes its files to <output-dir>/seed-<seed>/.")
+    replicate_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes. Defaults to the number of CPUs.")
+    replicate_parser.add_argument("--level", type=float, default=0.95, help="Confidence level.")
+    replicate_parser.add_argument("--plot", action="store_true", help="Plot the queue depths of every replication.")
+    replicate_parser.add_argument("--checkpoint", default=None, help="Start every replication from this checkpoint file (see run --checkpoint).")
+    replicate_parser.set_defaults(func=replicate)
+
+    sweep_parser = commands.add_parser("sweep", help="Run a configuration over a parameter grid or Latin hypercube, caching the results.")
+    sweep_parser.add_argument("config", help="Path to the configuration file.")
+    design = sweep_parser.add_mutually_exclusive_group(required=True)
+    design.add_argument("--grid", type=parse_parameter, action="append", metavar="PATH=V1,V2,...", help="Grid values of a parameter, e.g. Server.service_rate=1.8,2.0")
+    design.add_argument("--lhs", type=parse_parameter, action="append", metavar="PATH=LOW:HIGH", help="Latin hypercube range of a parameter, e.g. Server.service_rate=1.5:3.0")
+    sweep_parser.add_argument("--points", type=int, default=10, help="Number of Latin hypercube points.")
+    sweep_parser.add_argument("--seeds", type=int, default=1, help="Number of seeds (replications) per point.")
+    sweep_parser.add_argument("--seed", type=int, default=1, help="First seed; also seeds the Latin hypercube design.")
+    sweep_parser.add_argument("--output-dir", default="sweep", help="Directory of the run outputs.")
+    sweep_parser.add_argument("--cache-dir", default=None, help="Directory of the result cache. Defaults to <output-dir>/cache.")
+    sweep_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes. Defaults to the number of CPUs.")
+    sweep_parser.set_defaults(func=sweep)
+
+    plot_parser = commands.add_parser("plot", help="Plot the queue depths written by a stats actor, downsampled to the width of the plot.")
+    plot_parser.add_argument("output", help="Output path of the stats actor: a columnar store or a CSV file.")
+    plot_parser.add_argument("--window", type=parse_window, default=None, metavar="START:END", help="Only plot this time range.")
+    plot_parser.add_argument("--method", default="minmax", choices=["minmax", "lttb"], help="Min/max envelope per pixel column, or LTTB points.")
+    plot_parser.add_argument("--pixels", type=int, default=1000, help="Pixel columns (minmax) or points (lttb).")
+    plot_parser.add_argument("--png", default=None, help="PNG file. Defaults to queue_depth_<name>.png next to the output.")
+    plot_parser.set_defaults(func=plot)
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.log_level is not None or args.log_file is not None:
+        configure_logging(level=args.log_level, filename=args.log_file)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from .dispatch import handler, UnknownMessageType
 from .actor import Actor
 
 # from ..core.actor_protocol import ActorProtocol
@@ -9,6 +10,8 @@ from .resource import Resource, ResourceArgs
 __all__ = [
     # 'ActorProtocol',
     "Actor",
+    "handler",
+    "UnknownMessageType",
     "Message",
     "Resource",
     "ResourceArgs",
@@ -1,29 +1,132 @@
 from __future__ import annotations
-import asyncio
+import copy
+import sys
 from asyncio import Queue
-from typing import TYPE_CHECKING
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .message import Message
-from abdes1.core import ActorSystem
+from abdes1.core import ActorSystem, Address
+from abdes1.actors.dispatch import UnknownMessageType, collect_handlers
 from abdes1.utils.logger import ALogger
 
+MessageHandler = Callable[["Message"], Awaitable[None]]
+
 
 class Actor:
+    # Dispatch table of the class: message type -> method name. See dispatch.py
+    handler_table: Dict[str, str] = {}
+    # Attributes that make up the simulation state of the actor, saved and restored by checkpoints (see
+    # checkpoint.py) and by the Time Warp kernel (see time_warp.py)
+    state_fields: Tuple[str, ...] = ()
+    # State fields that draw from a random stream of their own, "<id>.<field>", instead of the stream of the actor
+    # id (see stream_name)
+    own_streams: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        cls.handler_table = collect_handlers(reversed(cls.__mro__))
+
     def __init__(self, id: str, actor_system: ActorSystem) -> None:
         self.id = id
         self.mailbox: Queue[Message] = Queue()
         self.actor_system = actor_system
+        # Set by ActorSystem.register_actor
+        self.address: Optional[Address] = None
+        self.handlers: Dict[str, MessageHandler] = {message_type: getattr(self, name) for message_type, name in self.handler_table.items()}
         self.logger = ALogger(f"{self.id}")
         self.logger.info(f"Actor '{self.id}' created")
 
+    def stream_name(self, field: str) -> str:
+        """
+        Name of the random stream a state field draws from (see RandomStreams.stream).
+        """
+        return f"{self.id}.{field}" if field in self.own_streams else self.id
+
+    def resolve_references(self) -> None:
+        """
+        Resolve the ids of the actors this actor sends messages to (ActorSystem.resolve) and keep the addresses.
+        Called once, after all actors are registered and before the first event is dispatched.
+
+        Override this method in actors that are configured with the ids of other actors.
+        """
+        pass
+
+    def save_state(self) -> Dict[str, Any]:
+        """
+        Snapshot of the state fields. Values with a get_state method (e.g. distributions, which hold a random
+        stream) save their own state, all others are copied (shallow).
+        """
+        state: Dict[str, Any] = {}
+        for name in self.state_fields:
+            value = getattr(self, name)
+            state[name] = value.get_state() if hasattr(value, "get_state") else copy.copy(value)
+        return state
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore a snapshot taken by save_state. The snapshot is consumed: it must not be restored twice.
+        """
+        for name, value in state.items():
+            current = getattr(self, name)
+            if hasattr(current, "set_state"):
+                current.set_state(value)
+            else:
+                setattr(self, name, value)
+
+    # --- Incremental state saving (see time_warp.py)
+
+    def start_undo_logs(self) -> None:
+        """
+        Start the undo logs of the state fields that have one (e.g. queue disciplines, see queue_disciplines.py).
+        """
+        for name in self.state_fields:
+            value = getattr(self, name)
+            if hasattr(value, "start_undo_log"):
+                value.start_undo_log()
+
+    def mark_state(self) -> Dict[str, Any]:
+        """
+        Like save_state, but the values with an undo log only save their position in it (O(1)), not a copy.
+        """
+        state: Dict[str, Any] = {}
+        for name in self.state_fields:
+            value = getattr(self, name)
+            if getattr(value, "undo_log", None) is not None:
+                state[name] = value.mark()
+            else:
+                state[name] = value.get_state() if hasattr(value, "get_state") else copy.copy(value)
+        return state
+
+    def undo_state(self, state: Dict[str, Any]) -> None:
+        """
+        Go back to a snapshot taken by mark_state. The later snapshots must have been undone first.
+        """
+        for name, value in state.items():
+            current = getattr(self, name)
+            if getattr(current, "undo_log", None) is not None:
+                current.undo(value)
+            elif hasattr(current, "set_state"):
+                current.set_state(value)
+            else:
+                setattr(self, name, value)
+
+    def forget_state(self, state: Optional[Dict[str, Any]]) -> None:
+        """
+        Drop the undo log entries before a snapshot taken by mark_state, the oldest one that can still be undone.
+        Without one, drop them all.
+        """
+        for name in self.state_fields:
+            value = getattr(self, name)
+            if getattr(value, "undo_log", None) is not None:
+                value.forget(state[name] if state is not None else value.mark())
+
     async def run(self) -> None:
         self.logger.info(f"Actor '{self.id}' running")
         while True:
             message = await self.mailbox.get()
             self.logger.debug(f"Handling mailbox message from '{message.from_id}': {message}. Mailbox size now [{self.mailbox.qsize()}].")
             await self.process_message(message)
-            await asyncio.sleep(0.01)
 
         # TODO support shutdown
         # print("Actor stopping")
@@ -38,6 +141,21 @@ class Actor:
     #     logging.log_event(self.id, f"Sending Message to '{message.to_id}': {message}")
     #     self.actor_system.schedule_event_from_now(Event(0.0, message))
 
+    def register_handler(self, message_type: str, handler: MessageHandler) -> None:
+        """
+        Register a handler for a message type that is only known at run time, e.g. a configured entity name.
+        """
+        self.handlers[sys.intern(message_type)] = handler
+
+    def check_message_type(self, message: Message) -> None:
+        """
+        Reject a message that this actor has no handler for. Actors without any handlers accept all messages.
+        """
+        if self.handlers and message.type not in self.handlers:
+            raise UnknownMessageType(
+                f"Invalid message type: {message.type}. Valid message types are: {', '.join(repr(t) for t in self.handlers)}",
+            )
+
     async def receive(self, message: Message) -> None:
         """
         Receive a message from another actor. Add the message to the mailbox.
@@ -47,17 +165,37 @@ class Actor:
         Args:
             message (Message): _description_
         """
+        self.check_message_type(message)
+
+        if self.actor_system.event_loop.synchronous:
+            # The event loop awaits the handler directly, there is no mailbox round trip
+            await self.process_message(message)
+            return
+
         # TODO Handle when mailbox is full / backpressure
         self.mailbox.put_nowait(message)
         self.logger.debug(f"Adding mailbox Message from '{message.from_id}': {message}. Mailbox size now [{self.mailbox.qsize()}]. ")
 
+    async def receive_batch(self, messages: List[Message]) -> None:
+        """
+        Receive several messages with the same timestamp, in order. Used by event loops that dispatch in batches.
+
+        Override this method to handle a batch at once instead of message by message.
+
+        Args:
+            messages (List[Message]): The messages, in the order they were scheduled
+        """
+        for message in messages:
+            await self.receive(message)
+
     async def process_message(self, message: Message) -> None:
         """
-        Process a message from the mailbox. Override this method to implement the actor's logic.
+        Process a message from the mailbox by calling the handler registered for its type.
+
+        Register handlers with @handler (see dispatch.py), or override this method to implement the actor's logic.
         """
-        self.logger.debug(f"Actor {self.id} processing message: {message}")
-        # TODO Implement message processing logic
-        # TODO Validate message is for this actor
-        # TODO Validate message format
-        self.logger.debug(f"Actor {self.id} processed message: {message}")
-        pass
+        message_handler = self.handlers.get(message.type)
+        if message_handler is not None:
+            await message_handler(message)
+            return
+        self.logger.debug(f"Actor {self.id} has no handler for message: {message}")
@@ -0,0 +1,48 @@
+"""
+dispatch.py
+
+Message handler registration.
+
+Decorate the methods of an actor with @handler("message-type"). When the actor class is created, the decorated
+methods of the class and its base classes are collected into a dispatch table: message type -> method name.
+Each actor instance binds the table once, so routing a message is a single dict lookup and call, and an unknown
+message type is rejected with a failed lookup.
+
+Message types are interned, so the lookup hashes and compares by identity for message types that are string
+literals or come from the same configuration value.
+
+Message types that are only known at run time, such as an entity name from the configuration, are registered
+on the instance with Actor.register_handler.
+"""
+import sys
+from typing import Any, Callable, Dict, Iterable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class UnknownMessageType(Exception):
+    pass
+
+
+def handler(*message_types: str) -> Callable[[F], F]:
+    """
+    Register the decorated actor method as the handler for one or more message types.
+    """
+
+    def decorate(method: F) -> F:
+        setattr(method, "message_types", tuple(sys.intern(t) for t in message_types))
+        return method
+
+    return decorate
+
+
+def collect_handlers(classes: Iterable[type]) -> Dict[str, str]:
+    """
+    Build a dispatch table (message type -> method name) from classes, base classes first.
+    """
+    table: Dict[str, str] = {}
+    for klass in classes:
+        for name, attribute in vars(klass).items():
+            for message_type in getattr(attribute, "message_types", ()):
+                table[message_type] = name
+    return table
@@ -1,8 +1,12 @@
-from dataclasses import dataclass
-from typing import Any, Optional
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Optional, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from abdes1.core import Address
 
-@dataclass
+
+@dataclass(slots=True)
 class Message:
     type: str
     content: Any
@@ -14,3 +18,6 @@ class Message:
     time: Optional[float] = None
     # scheduled_time: Optional[float] = None
     processed: bool = False
+    # Resolved addresses (see ActorSystem.resolve). The event loop delivers to to_address without a registry lookup
+    from_address: Optional[Address] = field(default=None, repr=False, compare=False)
+    to_address: Optional[Address] = field(default=None, repr=False, compare=False)
@@ -1,15 +1,33 @@
 from .actor_protocol import ActorProtocol
+from .address import Address
 from .registry import Registry
-from .event import Event
+from .event import Event, EventHandle
+from .future_event_list import FutureEventList, BinaryHeap, create_future_event_list
+from .calendar_queue import CalendarQueue
+from .ladder_queue import LadderQueue
 from .event_loop import EventLoop
 from .event_loop_protocol import EventLoopProtocol
+from .metrics import MetricsChannel, MetricRecord
+from .trace import TraceRecorder, TraceReader, TraceRecord
 from .actor_system import ActorSystem
 
 __all__ = [
     "ActorProtocol",
+    "Address",
     "Registry",
     "Event",
+    "EventHandle",
+    "FutureEventList",
+    "BinaryHeap",
+    "CalendarQueue",
+    "LadderQueue",
+    "create_future_event_list",
     "EventLoop",
     "EventLoopProtocol",
+    "MetricsChannel",
+    "MetricRecord",
+    "TraceRecorder",
+    "TraceReader",
+    "TraceRecord",
     "ActorSystem",
 ]
@@ -1,20 +1,34 @@
 from __future__ import annotations
-from typing import Optional, Protocol, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Protocol, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from abdes1.actors import Message
-    from abdes1.core import ActorSystem
+    from abdes1.core import ActorSystem, Address
 
 
 class ActorProtocol(Protocol):
     id: str
+    address: Optional[Address]
+    state_fields: Tuple[str, ...]
 
     @property
     def actor_system(self) -> Optional[ActorSystem]:
         ...
 
+    def resolve_references(self) -> None:
+        ...
+
     async def run(self) -> None:
         ...
 
     async def receive(self, message: Message) -> None:
         ...
+
+    async def receive_batch(self, messages: List[Message]) -> None:
+        ...
+
+    def save_state(self) -> Dict[str, Any]:
+        ...
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        ...
@@ -23,26 +23,43 @@ import asyncio
 if TYPE_CHECKING:
     from abdes1.core import ActorProtocol, EventLoopProtocol
     from abdes1.actors import Message
-from abdes1.core import Event, Registry
+from abdes1.core import Address, Event, EventHandle, Registry
+from abdes1.core.metrics import MetricsChannel
+from abdes1.utils.random_generators import RandomStreams
 from abdes1.utils import ALogger
 
 
 class ActorSystem:
-    def __init__(self, event_loop: EventLoopProtocol) -> None:
+    def __init__(self, event_loop: EventLoopProtocol, seed: Optional[int] = None) -> None:
+        """
+        Args:
+            event_loop (EventLoopProtocol): The event loop
+            seed (int): Master seed of the random streams of the actors (see random_streams)
+        """
         self.registry = Registry()
+        # Every actor draws from its own stream: actor_system.random_streams.stream(actor.id)
+        self.random_streams = RandomStreams(seed)
         self._event_loop = event_loop
         self._event_loop.actor_system = self
+        self.metrics = MetricsChannel(event_loop)
         self.logger = ALogger("-system-")
         self.logger.info("Actor System created")
 
-    async def run(self) -> None:
+    async def run(self, until: Optional[float] = None) -> None:
+        """
+        Args:
+            until (float): Stop before the first event after this simulation time (see DE_EventLoop.run)
+        """
         # TODO: Refactor to Actor System and place the tasks below under supervision
 
+        # Fail before the first event if an actor refers to an actor that does not exist
+        self.resolve_references()
+
         # Schedule all actors to run concurrently
         _ = [asyncio.create_task(actor.run()) for actor in self.list_actors()]
 
         # Schedule the future event loop
-        event_loop_task = asyncio.create_task(self._event_loop.run())
+        event_loop_task = asyncio.create_task(self._event_loop.run() if until is None else self._event_loop.run(until))
 
         self.logger.info("Actor System running")
         # await self._event_loop.run()
@@ -55,7 +72,7 @@ class ActorSystem:
     def register_actor(self, actor_class: Type[ActorProtocol], *args: Any, **kwargs: Any) -> None:
         kwargs.update({"actor_system": self})
         actor = actor_class(*args, **kwargs)
-        self.registry.actors.append(actor)
+        actor.address = self.registry.register_actor(actor)
         self.logger.info(f"Actor '{actor.id}' registered")
 
     def actor(self, actor_id: str) -> Optional[ActorProtocol]:
@@ -67,10 +84,28 @@ class ActorSystem:
     def find_actor(self, target_actor: str) -> Optional[ActorProtocol]:
         return self.registry.find_actor(target_actor)
 
+    def resolve(self, target_actor: str) -> Address:
+        """
+        Return the address of a registered actor, to be kept by the caller and put in messages (Message.to_address).
+        Raises ValueError if there is no actor with this id.
+        """
+        return self.registry.resolve(target_actor)
+
+    def resolve_references(self) -> None:
+        """
+        Let every actor resolve the ids of the actors it sends messages to. Called by run() before the first event,
+        so a misconfigured id fails at build time instead of being dropped at run time.
+        """
+        for actor in self.list_actors():
+            actor.resolve_references()
+
     # --- Scheduler / Event loop
 
-    def schedule_event(self, event: Event) -> None:
-        self._event_loop.schedule_event(event)
+    def schedule_event(self, event: Event) -> EventHandle:
+        """
+        Schedule an event. The returned handle can be used to cancel the event before it is dispatched.
+        """
+        return self._event_loop.schedule_event(event)
 
     def dispatch_message(self, message: Message) -> None:
         self._event_loop.dispatch_message(message)
@@ -0,0 +1,25 @@
+"""
+address.py
+
+An address is a resolved reference to a registered actor.
+
+Resolve the id of an actor once, e.g. in resolve_references(), keep the address and put it in the messages
+that are sent to that actor. The event loop delivers a message with an address straight to the actor,
+without looking up its id in the registry.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from abdes1.core import ActorProtocol
+
+
+class Address:
+    __slots__ = ("id", "actor")
+
+    def __init__(self, id: str, actor: ActorProtocol) -> None:
+        self.id = id
+        self.actor = actor
+
+    def __repr__(self) -> str:
+        return f"Address({self.id!r})"
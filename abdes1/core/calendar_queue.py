@@ -0,0 +1,122 @@
+"""
+calendar_queue.py
+
+Calendar queue (R. Brown, "Calendar queues: a fast O(1) priority queue implementation for the simulation event
+set problem", CACM 1988).
+
+Events are hashed by time into an array of buckets ("days") of a fixed width. A bucket holds the events of every
+"year" (nbuckets * width) that fall on its day, kept sorted. Dequeueing scans forward from the current day for an
+event that belongs to the current year. The number of buckets follows the number of events (doubling and halving),
+and the bucket width is re-estimated from the spacing of the events at the head of the queue on every resize.
+
+Event times are expected to be non-negative.
+"""
+from __future__ import annotations
+from bisect import insort
+from heapq import nsmallest
+from typing import List
+
+from abdes1.core.future_event_list import EventEntry, FutureEventList
+
+# Number of head events sampled to estimate the bucket width
+_WIDTH_SAMPLE_SIZE = 25
+
+
+class CalendarQueue(FutureEventList):
+    def __init__(self, nbuckets: int = 2, width: float = 1.0) -> None:
+        super().__init__()
+        self._size = 0
+        self._resize_enabled = True
+        self._setup(nbuckets, width, 0.0)
+
+    def _setup(self, nbuckets: int, width: float, start: float) -> None:
+        self._buckets: List[List[EventEntry]] = [[] for _ in range(nbuckets)]
+        self._nbuckets = nbuckets
+        self._width = width
+        self._top_threshold = 2 * nbuckets
+        self._bottom_threshold = nbuckets // 2 - 2
+        self._set_cursor(start)
+
+    def _set_cursor(self, time: float) -> None:
+        # The cursor is the day the next dequeue starts scanning from, and the end of that day in the current year.
+        # Half a bucket of slack protects against rounding, entries of the next year are always a full year away.
+        n = int(time / self._width)
+        self._last_time = time
+        self._last_bucket = n % self._nbuckets
+        self._bucket_top = (n + 1.5) * self._width
+
+    def _push(self, entry: EventEntry) -> None:
+        time = entry[0]
+        insort(self._buckets[int(time / self._width) % self._nbuckets], entry)
+        self._size += 1
+        if time < self._last_time:
+            # Scheduled before the cursor: restart the scan from this event's day
+            self._set_cursor(time)
+        if self._size > self._top_threshold and self._resize_enabled:
+            self._resize(2 * self._nbuckets)
+
+    def _pop(self) -> EventEntry:
+        bucket = self._locate()
+        entry = bucket.pop(0)
+        self._size -= 1
+        if self._size < self._bottom_threshold and self._resize_enabled:
+            self._resize(self._nbuckets // 2)
+        return entry
+
+    def _peek(self) -> EventEntry:
+        return self._locate()[0]
+
+    def _clear(self) -> List[EventEntry]:
+        entries = [entry for bucket in self._buckets for entry in bucket]
+        self._size = 0
+        self._setup(2, self._width, self._last_time)
+        return entries
+
+    def _locate(self) -> List[EventEntry]:
+        """
+        Move the cursor to the bucket holding the smallest entry and return that bucket.
+        """
+        if self._size == 0:
+            raise IndexError("pop from an empty calendar queue")
+
+        buckets = self._buckets
+        i = self._last_bucket
+        bucket_top = self._bucket_top
+        for _ in range(self._nbuckets):
+            bucket = buckets[i]
+            if bucket and bucket[0][0] < bucket_top:
+                self._last_bucket = i
+                self._bucket_top = bucket_top
+                self._last_time = bucket[0][0]
+                return bucket
+            i += 1
+            if i == self._nbuckets:
+                i = 0
+            bucket_top += self._width
+
+        # A whole year without events: jump directly to the smallest entry
+        bucket = min((b for b in buckets if b), key=lambda b: b[0])
+        self._set_cursor(bucket[0][0])
+        return bucket
+
+    def _resize(self, nbuckets: int) -> None:
+        entries = [entry for bucket in self._buckets for entry in bucket]
+        width = self._estimate_width(entries)
+
+        self._resize_enabled = False
+        self._setup(max(nbuckets, 2), width, self._last_time)
+        for entry in entries:
+            insort(self._buckets[int(entry[0] / self._width) % self._nbuckets], entry)
+        self._resize_enabled = True
+
+    def _estimate_width(self, entries: List[EventEntry]) -> float:
+        # Three times the average separation of the head events, ignoring separations more than twice the average
+        sample = nsmallest(_WIDTH_SAMPLE_SIZE, entries)
+        separations = [b[0] - a[0] for a, b in zip(sample, sample[1:])]
+        if not separations:
+            return self._width
+        average = sum(separations) / len(separations)
+        small = [s for s in separations if s <= 2.0 * average]
+        width = 3.0 * sum(small) / len(small) if small else 0.0
+        # All sampled events at the same time: keep the current width
+        return width if width > 0.0 else self._width
@@ -1,23 +1,61 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, TYPE_CHECKING
 import functools
 
 if TYPE_CHECKING:
     from abdes1.actors import Message
+    from abdes1.core import EventLoopProtocol
 
 
 @functools.total_ordering
-@dataclass
+@dataclass(slots=True)
 class Event:
     message: Message
     time: Optional[float] = None
+    # Events with the same time are ordered by priority (lower first), then in the order they were scheduled
+    priority: int = 0
+    cancelled: bool = field(default=False, repr=False)
+    dispatched: bool = field(default=False, repr=False)
 
     def __post_init__(self):
         if self.time is None:
             self.time = 0.0
 
-    def __lt__(self, other: "Message") -> bool:
-        if (self.time is None) or (other.time is None):
-            return False
-        return self.time < other.time
+    def __lt__(self, other: "Event") -> bool:
+        # The future event list compares (time, priority, sequence number) tuples and never gets here
+        return (self.time, self.priority) < (other.time, other.priority)  # type: ignore
+
+
+class EventHandle:
+    """
+    Handle to a scheduled event, returned by schedule_event.
+
+    Use it to cancel the event before it is dispatched, e.g. a timeout that is no longer needed,
+    a customer that reneges or a service completion that is preempted.
+    """
+
+    __slots__ = ("event", "_event_loop")
+
+    def __init__(self, event: Event, event_loop: EventLoopProtocol) -> None:
+        self.event = event
+        self._event_loop = event_loop
+
+    @property
+    def time(self) -> float:
+        assert self.event.time is not None
+        return self.event.time
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.cancelled
+
+    @property
+    def pending(self) -> bool:
+        return not (self.event.cancelled or self.event.dispatched)
+
+    def cancel(self) -> bool:
+        """
+        Cancel the event. Returns False if the event was already dispatched or cancelled.
+        """
+        return self._event_loop.cancel_event(self.event)
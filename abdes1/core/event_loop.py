@@ -1,12 +1,14 @@
 from __future__ import annotations
-from asyncio import PriorityQueue
-from typing import TYPE_CHECKING
+import asyncio
+import itertools
+from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from abdes1.actors import Message
     from abdes1.core import ActorSystem
 
-from abdes1.core import Event
+from abdes1.core import Event, EventHandle
+from abdes1.core.future_event_list import BinaryHeap, FutureEventList
 
 from abdes1.core.message_logger import MessageLogger
 from abdes1.utils.logger import ALogger
@@ -17,26 +19,51 @@ class EventLoop:
 
     def __init__(
         self,
+        future_event_list: Optional[FutureEventList] = None,
     ) -> None:
-        self.future_event_queue: PriorityQueue[Event] = PriorityQueue()
+        self.future_event_list = future_event_list if future_event_list is not None else BinaryHeap()
+        self._not_empty = asyncio.Event()
+        self._sequence = itertools.count()
+        self.synchronous = False
+        # This loop does not keep simulation time
+        self.current_time = 0.0
         self.logger = ALogger("-loop-")
         self.logger.info("Event loop created")
         self.message_logger = MessageLogger("-loop-")
 
-    def schedule_event(self, event: Event) -> None:
+    def schedule_event(self, event: Event) -> EventHandle:
         self.logger.debug(f"Scheduling event {event} with scheduled time {event.time:>.2f}")
-        self.future_event_queue.put_nowait(event)
+        self._push(event)
+        return EventHandle(event, self)
+
+    def cancel_event(self, event: Event) -> bool:
+        if event.cancelled or event.dispatched:
+            return False
+        self.logger.debug(f"Cancelling event {event}")
+        self.future_event_list.cancel(event)
+        return True
 
     def dispatch_message(self, message: Message) -> None:
         self.logger.debug(f"Dispatching message {message} as soon as possible")
         e = Event(time=None, message=message)
-        self.future_event_queue.put_nowait(e)
+        self._push(e)
+
+    def _push(self, event: Event) -> None:
+        assert event.time is not None, "event.time is None"
+        self.future_event_list.push((event.time, event.priority, next(self._sequence), event))
+        self._not_empty.set()
 
     async def run(self) -> None:
         self.logger.info("Event loop running")
 
+        future_event_list = self.future_event_list
         while True:
-            event = await self.future_event_queue.get()
+            if not future_event_list:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+            _, _, _, event = future_event_list.pop()
+            event.dispatched = True
 
             self.logger.debug(f"Processing message {event.message} with scheduled time {event.time:>.2f}")
 
@@ -44,7 +71,8 @@ class EventLoop:
 
             # send message to actor
             message = event.message
-            target_actor = self.actor_system.find_actor(message.to_id)
+            to_address = message.to_address
+            target_actor = to_address.actor if to_address is not None else self.actor_system.find_actor(message.to_id)
             if target_actor is not None:
                 message.time = event.time
                 self.message_logger.log_message(event_source="-loop-", message=message)
@@ -1,23 +1,33 @@
 from __future__ import annotations
-from typing import Protocol, TYPE_CHECKING
+from typing import Optional, Protocol, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from abdes1.actors import Message
-    from abdes1.core import ActorSystem, Event
+    from abdes1.core import ActorSystem, Event, EventHandle
 
 
 class EventLoopProtocol(Protocol):
     actor_system: ActorSystem
+    # When True, the event loop awaits actor handlers directly instead of going through the actors' mailboxes
+    synchronous: bool
+    # Simulation time of the event being dispatched
+    current_time: float
 
     # @property
     # def actor_system(self) -> Optional[ActorSystem]:
     #     ...
 
-    async def run(self) -> None:
+    async def run(self, until: Optional[float] = None) -> None:
+        ...
+
+    def stop(self) -> None:
         ...
 
     def dispatch_message(self, message: Message) -> None:
         ...
 
-    def schedule_event(self, event: Event) -> None:
+    def schedule_event(self, event: Event) -> EventHandle:
+        ...
+
+    def cancel_event(self, event: Event) -> bool:
         ...
@@ -0,0 +1,179 @@
+"""
+future_event_list.py
+
+The future event list (FEL) holds the events that are scheduled but not yet dispatched.
+
+Entries are tuples (time, priority, sequence number, event). The sequence number is unique and assigned by the
+event loop, so entries are totally ordered without ever comparing events, and ties on (time, priority) resolve
+in the order the events were scheduled.
+
+Cancelled events are not removed from the underlying structure. They stay behind as tombstones, which is O(1),
+and are dropped when they reach the head of the list. When tombstones make up most of the list, the list is
+compacted.
+
+Implementations:
+- BinaryHeap: heapq, O(log n) enqueue/dequeue. Best for small to medium event lists.
+- CalendarQueue: Brown's calendar queue, amortized O(1) enqueue/dequeue. See calendar_queue.py.
+- LadderQueue: Tang, Goh and Thng's ladder queue, amortized O(1) enqueue/dequeue. See ladder_queue.py.
+"""
+from __future__ import annotations
+from heapq import heapify, heappop, heappush
+from typing import List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from abdes1.core import Event
+
+EventEntry = Tuple[float, int, int, "Event"]
+
+
+class FutureEventList:
+    """
+    Base class of the future event list implementations.
+
+    Override _push, _pop, _peek and _clear to implement a future event list. Tombstones are handled here.
+    """
+
+    # Compact once there are at least this many tombstones and they outnumber the live events
+    compaction_threshold = 1024
+
+    def __init__(self) -> None:
+        self._stored = 0  # live entries and tombstones
+        self._tombstones = 0
+
+    def push(self, entry: EventEntry) -> None:
+        """
+        Add an entry to the future event list.
+        """
+        self._push(entry)
+        self._stored += 1
+
+    def pop(self) -> EventEntry:
+        """
+        Remove and return the smallest live entry. Raises IndexError when the future event list is empty.
+        """
+        while True:
+            entry = self._pop()
+            self._stored -= 1
+            if not entry[3].cancelled:
+                return entry
+            self._tombstones -= 1
+
+    def peek(self) -> EventEntry:
+        """
+        Return the smallest live entry without removing it. Raises IndexError when the future event list is empty.
+        """
+        while True:
+            entry = self._peek()
+            if not entry[3].cancelled:
+                return entry
+            self._pop()
+            self._stored -= 1
+            self._tombstones -= 1
+
+    def cancel(self, event: Event) -> None:
+        """
+        Turn a pending event into a tombstone.
+        """
+        event.cancelled = True
+        self._tombstones += 1
+        if self._tombstones >= self.compaction_threshold and 2 * self._tombstones > self._stored:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Drop all tombstones.
+        """
+        live = [entry for entry in self._clear() if not entry[3].cancelled]
+        self._stored = len(live)
+        self._tombstones = 0
+        self._load(live)
+
+    def clear(self) -> None:
+        """
+        Remove all entries.
+        """
+        self._clear()
+        self._stored = 0
+        self._tombstones = 0
+
+    def entries(self) -> List[EventEntry]:
+        """
+        Return the live entries, in any order, e.g. to save them. Drops the tombstones.
+        """
+        self.compact()
+        entries = self._clear()
+        self._load(list(entries))
+        return entries
+
+    def __len__(self) -> int:
+        return self._stored - self._tombstones
+
+    def __bool__(self) -> bool:
+        return self._stored > self._tombstones
+
+    # --- Override in implementations
+
+    def _push(self, entry: EventEntry) -> None:
+        raise NotImplementedError
+
+    def _pop(self) -> EventEntry:
+        """
+        Remove and return the smallest entry, tombstone or not.
+        """
+        raise NotImplementedError
+
+    def _peek(self) -> EventEntry:
+        raise NotImplementedError
+
+    def _clear(self) -> List[EventEntry]:
+        """
+        Remove and return all entries, in any order.
+        """
+        raise NotImplementedError
+
+    def _load(self, entries: List[EventEntry]) -> None:
+        """
+        Refill an empty future event list. Override when there is something faster than pushing one by one.
+        """
+        for entry in entries:
+            self._push(entry)
+
+
+class BinaryHeap(FutureEventList):
+    def __init__(self) -> None:
+        super().__init__()
+        self._heap: List[EventEntry] = []
+
+    def _push(self, entry: EventEntry) -> None:
+        heappush(self._heap, entry)
+
+    def _pop(self) -> EventEntry:
+        return heappop(self._heap)
+
+    def _peek(self) -> EventEntry:
+        return self._heap[0]
+
+    def _clear(self) -> List[EventEntry]:
+        entries, self._heap = self._heap, []
+        return entries
+
+    def _load(self, entries: List[EventEntry]) -> None:
+        heapify(entries)
+        self._heap = entries
+
+
+def create_future_event_list(kind: str) -> FutureEventList:
+    """
+    Create a future event list by name: 'heap', 'calendar' or 'ladder'.
+    """
+    if kind == "heap":
+        return BinaryHeap()
+    if kind == "calendar":
+        from abdes1.core.calendar_queue import CalendarQueue
+
+        return CalendarQueue()
+    if kind == "ladder":
+        from abdes1.core.ladder_queue import LadderQueue
+
+        return LadderQueue()
+    raise ValueError(f"Invalid future event list: '{kind}'. Valid future event lists are: 'heap', 'calendar', 'ladder'")
@@ -0,0 +1,177 @@
+"""
+ladder_queue.py
+
+Ladder queue (W. T. Tang, R. S. M. Goh, I. L.-J. Thng, "Ladder queue: an O(1) priority queue structure for
+large-scale discrete event simulation", ACM TOMACS 2005).
+
+The ladder queue has three tiers:
+- Top: an unsorted list of far future events. Enqueueing there is an append.
+- Ladder: rungs of buckets. The first rung is created from Top, and a bucket that holds too many events is split
+  into a new, finer rung instead of being sorted.
+- Bottom: the few events that are dequeued next, kept in a small heap.
+
+Events only get sorted once they reach Bottom, and Bottom is kept small. That gives amortized O(1) enqueue and
+dequeue, even when the event distribution changes during the run.
+
+Event times are expected to be non-negative.
+"""
+from __future__ import annotations
+from heapq import heapify, heappop, heappush
+from typing import List, Optional
+
+from abdes1.core.future_event_list import EventEntry, FutureEventList
+
+# A bucket with more events than this is split into a new rung instead of being moved to Bottom
+_THRESHOLD = 50
+_MAX_RUNGS = 8
+
+
+class _Rung:
+    def __init__(self, start: float, width: float, nbuckets: int) -> None:
+        self.start = start
+        self.width = width
+        self.buckets: List[Optional[List[EventEntry]]] = [None] * nbuckets
+        self.current = 0  # index of the next bucket to dequeue from
+        self.size = 0
+
+    @property
+    def current_start(self) -> float:
+        return self.start + self.current * self.width
+
+    def insert(self, entry: EventEntry) -> None:
+        # Clamp for rounding: the rung covers [current_start, start + nbuckets * width)
+        i = min(max(int((entry[0] - self.start) / self.width), self.current), len(self.buckets) - 1)
+        bucket = self.buckets[i]
+        if bucket is None:
+            self.buckets[i] = [entry]
+        else:
+            bucket.append(entry)
+        self.size += 1
+
+
+class LadderQueue(FutureEventList):
+    def __init__(self) -> None:
+        super().__init__()
+        self._top: List[EventEntry] = []
+        self._top_start = 0.0
+        self._top_min = float("inf")
+        self._top_max = float("-inf")
+        self._rungs: List[_Rung] = []
+        self._bottom: List[EventEntry] = []
+        self._size = 0
+
+    def _push(self, entry: EventEntry) -> None:
+        self._size += 1
+        time = entry[0]
+
+        # Strictly later: an event at the start of Top may tie with events that already left it, in the ladder or in Bottom
+        if time > self._top_start:
+            self._top.append(entry)
+            if time < self._top_min:
+                self._top_min = time
+            if time > self._top_max:
+                self._top_max = time
+            return
+
+        for rung in self._rungs:
+            if time >= rung.current_start:
+                rung.insert(entry)
+                return
+
+        heappush(self._bottom, entry)
+
+    def _pop(self) -> EventEntry:
+        self._fill_bottom()
+        self._size -= 1
+        return heappop(self._bottom)
+
+    def _peek(self) -> EventEntry:
+        self._fill_bottom()
+        return self._bottom[0]
+
+    def _clear(self) -> List[EventEntry]:
+        entries = self._top + self._bottom
+        for rung in self._rungs:
+            for bucket in rung.buckets:
+                if bucket:
+                    entries.extend(bucket)
+        self._top = []
+        self._top_start = 0.0
+        self._top_min = float("inf")
+        self._top_max = float("-inf")
+        self._rungs = []
+        self._bottom = []
+        self._size = 0
+        return entries
+
+    def _fill_bottom(self) -> None:
+        if self._bottom:
+            return
+        if self._size == 0:
+            raise IndexError("pop from an empty ladder queue")
+
+        while True:
+            if not self._rungs:
+                if self._transfer_top():
+                    return
+
+            rung = self._rungs[-1]
+            bucket = self._next_bucket(rung)
+            if bucket is None:
+                # Rung exhausted, continue with the coarser rung above it (or with Top)
+                self._rungs.pop()
+                continue
+
+            if len(bucket) > _THRESHOLD and len(self._rungs) < _MAX_RUNGS:
+                lowest = min(entry[0] for entry in bucket)
+                highest = max(entry[0] for entry in bucket)
+                if lowest < highest:
+                    # Split the bucket into a finer rung covering the same interval
+                    child = _Rung(rung.current_start, rung.width / _THRESHOLD, _THRESHOLD + 1)
+                    for entry in bucket:
+                        child.insert(entry)
+                    rung.current += 1
+                    self._rungs.append(child)
+                    continue
+
+            rung.current += 1
+            heapify(bucket)
+            self._bottom = bucket
+            return
+
+    def _next_bucket(self, rung: _Rung) -> Optional[List[EventEntry]]:
+        """
+        Take the next non-empty bucket from a rung, leaving the rung's cursor on it.
+        """
+        buckets = rung.buckets
+        while rung.size > 0:
+            bucket = buckets[rung.current]
+            if bucket:
+                buckets[rung.current] = None
+                rung.size -= len(bucket)
+                return bucket
+            rung.current += 1
+        return None
+
+    def _transfer_top(self) -> bool:
+        """
+        Move Top into the first rung of the ladder. Returns True if Top went straight to Bottom instead.
+        """
+        top = self._top
+        self._top = []
+        self._top_start = self._top_max
+        lowest, highest = self._top_min, self._top_max
+        self._top_min = float("inf")
+        self._top_max = float("-inf")
+
+        if lowest == highest:
+            # All events at the same time, nothing to spread over buckets
+            heapify(top)
+            self._bottom = top
+            return True
+
+        rung = _Rung(lowest, (highest - lowest) / len(top), len(top) + 1)
+        for entry in top:
+            rung.insert(entry)
+        self._rungs.append(rung)
+        return False
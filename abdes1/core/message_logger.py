@@ -7,12 +7,10 @@ if TYPE_CHECKING:
 
 
 import datetime
+import logging
 
 # import logging
 from abdes1.utils import ALogger
-from dotenv import load_dotenv
-
-load_dotenv()
 
 
 class MessageLogger(ALogger):
@@ -28,6 +26,10 @@ class MessageLogger(ALogger):
             source (str): The source of the event.
             message (Message): The message to log.
         """
+        # Formatting the line is the expensive part, skip it when it would be dropped anyway
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
         wall_time = datetime.datetime.now().strftime("%H:%M:%S")
 
         # Define the column names and widths
@@ -0,0 +1,62 @@
+"""
+metrics.py
+
+Side-band channel for metrics (probes).
+
+Actors record metrics, e.g. a queue depth, directly on the channel of the actor system instead of sending
+messages to a statistics actor. A record is stamped with the current simulation time and handed to the
+subscribers of its metric name right away: no Event is created and the future event list is not involved.
+
+Recording a metric that nobody subscribed to costs a dict lookup.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, NamedTuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from abdes1.core import EventLoopProtocol
+
+
+class MetricRecord(NamedTuple):
+    time: float
+    name: str
+    source: str
+    value: Any
+
+
+MetricSubscriber = Callable[[MetricRecord], None]
+
+
+class MetricsChannel:
+    def __init__(self, event_loop: EventLoopProtocol) -> None:
+        self._event_loop = event_loop
+        self._subscribers: Dict[str, List[MetricSubscriber]] = {}
+
+    def subscribe(self, name: str, subscriber: MetricSubscriber) -> None:
+        """
+        Call subscriber with every record of the metric name, in the order the records are made.
+
+        Subscribers are plain functions and must not block: they run inside the recording actor's handler.
+        """
+        self._subscribers.setdefault(name, []).append(subscriber)
+
+    def names(self) -> List[str]:
+        """
+        Names of the metrics that have subscribers.
+        """
+        return list(self._subscribers)
+
+    def record(self, name: str, value: Any, source: str) -> None:
+        """
+        Record a value of the metric name at the current simulation time.
+
+        Args:
+            name (str): Metric name, e.g. "queue-depth"
+            value (Any): The measured value
+            source (str): Id of the actor that made the measurement
+        """
+        subscribers = self._subscribers.get(name)
+        if not subscribers:
+            return
+        metric_record = MetricRecord(self._event_loop.current_time, name, source, value)
+        for subscriber in subscribers:
+            subscriber(metric_record)
@@ -2,30 +2,49 @@
 registry.py
 
 Registers actors and provides a lookup service.
+
+Actors are indexed by id, so a lookup is a dict access. Ids are unique: registering a second actor
+with the same id is an error.
 """
 from __future__ import annotations
-from typing import List, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from abdes1.core import ActorProtocol
+from abdes1.core.address import Address
 from abdes1.utils.logger import ALogger
 
 
 class Registry:
     def __init__(self) -> None:
-        self.actors: List[ActorProtocol] = []
+        self.addresses: Dict[str, Address] = {}
         self.logger = ALogger("-registry-")
         self.logger.info("Registry created")
 
-    def register_actor(self, actor: ActorProtocol) -> None:
-        self.actors.append(actor)
+    @property
+    def actors(self) -> List[ActorProtocol]:
+        return [address.actor for address in self.addresses.values()]
+
+    def register_actor(self, actor: ActorProtocol) -> Address:
+        if actor.id in self.addresses:
+            raise ValueError(f"Actor '{actor.id}' is already registered")
+        address = Address(actor.id, actor)
+        self.addresses[actor.id] = address
         self.logger.debug(f"Actor '{actor.id}' registered")
+        return address
 
     def find_actor(self, target_actor: str) -> Optional[ActorProtocol]:
-        for actor in self.actors:
-            if actor.id == target_actor:
-                return actor
-            else:
-                continue
-        self.logger.debug(f"Actor '{target_actor}' not found")
-        return None
+        address = self.addresses.get(target_actor)
+        if address is None:
+            self.logger.debug(f"Actor '{target_actor}' not found")
+            return None
+        return address.actor
+
+    def resolve(self, target_actor: str) -> Address:
+        """
+        Return the address of a registered actor. Raises ValueError if there is no actor with this id.
+        """
+        address = self.addresses.get(target_actor)
+        if address is None:
+            raise ValueError(f"Actor '{target_actor}' not found")
+        return address
@@ -0,0 +1,203 @@
+"""
+trace.py
+
+Binary simulation trace.
+
+TraceRecorder appends one fixed-width record per dispatched event to a memory-mapped file:
+
+    time (float64) | sequence number (uint64) | type code | from id code | to id code (uint32) | content length (uint32) | content offset (uint64)
+
+Message types and actor ids are stored as codes into a string table, written next to the trace as
+<path>.strings (JSON). Contents are written as text to <path>.content, the record holds offset and length.
+The trace file starts with a small header (magic, version, record size, record count).
+
+The event loop only calls the recorder when one is configured, so a disabled trace costs a None check per event.
+
+TraceReader maps a trace read-only. It supports len(), indexing, slicing and iteration without loading the
+whole trace into memory.
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Union, overload, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from abdes1.actors import Message
+
+MAGIC = b"ABDTRACE"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQ8x")
+RECORD = struct.Struct("<dQIIIIQ")
+NO_CONTENT = 0xFFFFFFFF  # content length of a message without content
+
+
+class TraceRecord(NamedTuple):
+    time: float
+    seq: int
+    type: str
+    from_id: str
+    to_id: str
+    content: Optional[str]
+
+
+class TraceRecorder:
+    def __init__(self, path: str, capacity: int = 65536) -> None:
+        """
+        Create a trace file. An existing trace at the same path is overwritten.
+
+        Args:
+            path (str): Path of the trace file
+            capacity (int): Number of records the file is initially sized for. The file doubles in size when it is full.
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be >= 1, got {capacity}")
+        self.path = path
+        self.count = 0
+        self._capacity = capacity
+        self._codes: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._content_offset = 0
+        self._content_file: BinaryIO = open(f"{path}.content", "wb")
+        self._file: BinaryIO = open(path, "w+b")
+        self._file.truncate(HEADER.size + capacity * RECORD.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, 0)
+        self._closed = False
+
+    def record(self, time: float, seq: int, message: Message) -> None:
+        if self.count == self._capacity:
+            self._grow()
+
+        content = message.content
+        if content is None:
+            length, offset = NO_CONTENT, 0
+        else:
+            data = str(content).encode()
+            length, offset = len(data), self._content_offset
+            self._content_file.write(data)
+            self._content_offset += length
+
+        codes = self._codes
+        type_code = codes.get(message.type)
+        if type_code is None:
+            type_code = self._code(message.type)
+        from_code = codes.get(message.from_id)
+        if from_code is None:
+            from_code = self._code(message.from_id)
+        to_code = codes.get(message.to_id)
+        if to_code is None:
+            to_code = self._code(message.to_id)
+
+        RECORD.pack_into(self._map, HEADER.size + self.count * RECORD.size, time, seq, type_code, from_code, to_code, length, offset)
+        self.count += 1
+
+    def flush(self) -> None:
+        """
+        Make the trace readable up to the last record: write the record count, the string table and the contents.
+        """
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, RECORD.size, self.count)
+        self._map.flush()
+        self._content_file.flush()
+        with open(f"{self.path}.strings", "w") as file:
+            json.dump(self._strings, file)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        self._map.close()
+        # Drop the unused capacity
+        self._file.truncate(HEADER.size + self.count * RECORD.size)
+        self._file.close()
+        self._content_file.close()
+        self._closed = True
+
+    def __enter__(self) -> TraceRecorder:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # --- Internal stuff
+
+    def _code(self, string: str) -> int:
+        code = len(self._strings)
+        self._strings.append(string)
+        self._codes[string] = code
+        return code
+
+    def _grow(self) -> None:
+        self._map.flush()
+        self._map.close()
+        self._capacity *= 2
+        self._file.truncate(HEADER.size + self._capacity * RECORD.size)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+
+class TraceReader:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(f"{path}.strings", "r") as file:
+            self.strings: List[str] = json.load(file)
+
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"Not a trace file (version {VERSION}): {path}")
+        self._count: int = count
+
+        self._content_file = open(f"{path}.content", "rb")
+        self._content_map: Optional[mmap.mmap] = None
+        if os.fstat(self._content_file.fileno()).st_size > 0:
+            self._content_map = mmap.mmap(self._content_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> TraceRecord:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[TraceRecord]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[TraceRecord, List[TraceRecord]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            return [self._record(i) for i in range(start, stop, step)]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("trace record index out of range")
+        return self._record(index)
+
+    def __iter__(self) -> Iterator[TraceRecord]:
+        for i in range(self._count):
+            yield self._record(i)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+        if self._content_map is not None:
+            self._content_map.close()
+        self._content_file.close()
+
+    def __enter__(self) -> TraceReader:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # --- Internal stuff
+
+    def _record(self, i: int) -> TraceRecord:
+        time, seq, type_code, from_code, to_code, length, offset = RECORD.unpack_from(self._map, HEADER.size + i * RECORD.size)
+        content: Optional[str] = None
+        if length != NO_CONTENT:
+            content = "" if self._content_map is None else self._content_map[offset : offset + length].decode()
+        strings = self.strings
+        return TraceRecord(time, seq, strings[type_code], strings[from_code], strings[to_code], content)
@@ -1,3 +1,5 @@
+# The actors import NumPy and the modules built on it (utils/distributions.py, utils/column_store.py, plotting.py)
+# in the methods that use them, so that importing abdes1 or abdes1.des.topology does not load NumPy.
 from .des_actor import DE_Actor
 from .des_event_loop import DE_EventLoop
 from .queue_actor import QueueActor, QueueActorArgs, QueueType
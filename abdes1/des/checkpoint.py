@@ -0,0 +1,134 @@
+"""
+checkpoint.py
+
+Save a running simulation and continue it later, in another process.
+
+    actor_system = build_actor_system(config, seed=1)
+    asyncio.run(actor_system.run(until=1000.0))  # e.g. the warm-up period
+    save_checkpoint(actor_system, "warm.ckpt")
+
+    actor_system = restore_checkpoint(load_checkpoint("warm.ckpt"), config)
+    asyncio.run(actor_system.run())
+
+A checkpoint holds the clock and the pending events of the event loop (DE_EventLoop.get_state) and the state
+fields of every actor (Actor.save_state), which include the buffers and random streams of the distributions. It
+does not hold the actors themselves: restoring builds the topology from the configuration, without the initial
+events, and then restores the state. The configuration must have the same actors, other parameters such as
+output paths may differ. Pending messages lose their resolved addresses and are delivered by actor id.
+
+The file is a pickle, compressed with zlib, after a short header. Only load checkpoints you trust.
+
+fork_checkpoint restores a checkpoint once per seed: the continuations share the state at the checkpoint, e.g. a
+warmed-up system, and then draw different random numbers. run_replications takes a checkpoint to do the same
+for a whole set of replications.
+"""
+from __future__ import annotations
+import copy
+import os
+import pickle
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+from abdes1 import __version__
+from abdes1.core import ActorSystem
+from abdes1.des.des_event_loop import DE_EventLoop
+from abdes1.des.topology import build_actor_system
+from abdes1.utils.random_generators import RandomStreams
+
+Checkpoint = Dict[str, Any]
+
+MAGIC = b"ABDESCKP"
+
+
+def create_checkpoint(actor_system: ActorSystem) -> Checkpoint:
+    """
+    Capture the state of a simulation, between two events (e.g. after run(until=...)).
+    """
+    event_loop = actor_system.event_loop
+    if not isinstance(event_loop, DE_EventLoop):
+        raise ValueError("Only simulations on a DE_EventLoop can be checkpointed")
+    return {
+        "version": __version__,
+        "seed": actor_system.random_streams.seed,
+        "event_loop": event_loop.get_state(),
+        "actors": {actor.id: actor.save_state() for actor in actor_system.list_actors()},
+    }
+
+
+def encode_checkpoint(checkpoint: Checkpoint) -> bytes:
+    return MAGIC + zlib.compress(pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def decode_checkpoint(data: bytes) -> Checkpoint:
+    if not data.startswith(MAGIC):
+        raise ValueError("Not an abdes1 checkpoint")
+    checkpoint: Checkpoint = pickle.loads(zlib.decompress(data[len(MAGIC) :]))
+    if checkpoint["version"] != __version__:
+        raise ValueError(f"Checkpoint of abdes1 {checkpoint['version']} cannot be restored by abdes1 {__version__}")
+    return checkpoint
+
+
+def save_checkpoint(actor_system: ActorSystem, path: str) -> Checkpoint:
+    """
+    Write a checkpoint of the simulation to a file, atomically, and return it.
+    """
+    checkpoint = create_checkpoint(actor_system)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(encode_checkpoint(checkpoint))
+    os.replace(temporary, path)
+    return checkpoint
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    with open(path, "rb") as file:
+        return decode_checkpoint(file.read())
+
+
+def restore_checkpoint(checkpoint: Checkpoint, config: Dict[str, Any], event_loop: Optional[DE_EventLoop] = None, seed: Optional[int] = None) -> ActorSystem:
+    """
+    Build the topology of the configuration and put it in the state of the checkpoint.
+
+    Args:
+        checkpoint (Checkpoint): From create_checkpoint or load_checkpoint
+        config (Dict[str, Any]): The configuration the checkpoint was taken with, or one with the same actors
+        event_loop (DE_EventLoop): The event loop. Defaults to a synchronous DE_EventLoop.
+        seed (int): Continue with fresh random streams from this master seed. By default the run continues exactly
+            as it would have without the checkpoint.
+    """
+    event_loop = event_loop if event_loop is not None else DE_EventLoop(synchronous=True)
+    actor_system = build_actor_system(config, event_loop, seed=checkpoint["seed"], initial_events=False)
+
+    # The checkpoint can be restored more than once (see fork_checkpoint), so the restored state must not share with it
+    states = copy.deepcopy(checkpoint["actors"])
+    actor_ids = {actor.id for actor in actor_system.list_actors()}
+    if actor_ids != set(states):
+        raise ValueError(f"The configuration has actors {sorted(actor_ids)}, the checkpoint has {sorted(states)}")
+    for actor in actor_system.list_actors():
+        actor.restore_state(states[actor.id])
+    event_loop.set_state(checkpoint["event_loop"])
+
+    if seed is not None:
+        reseed(actor_system, seed)
+    return actor_system
+
+
+def reseed(actor_system: ActorSystem, seed: int) -> None:
+    """
+    Switch every actor to its stream of a new master seed. The variates already drawn into the future event list
+    (e.g. arrivals scheduled up front) stay as they are. Everything random in the state fields (distributions,
+    entity attributes, the Random queue discipline) draws from the new stream of the same name (Actor.stream_name).
+    """
+    actor_system.random_streams = RandomStreams(seed)
+    for actor in actor_system.list_actors():
+        for name in actor.state_fields:
+            value = getattr(actor, name)
+            if hasattr(value, "reseed"):
+                value.reseed(actor_system.random_streams.stream(actor.stream_name(name)))
+
+
+def fork_checkpoint(checkpoint: Checkpoint, config: Dict[str, Any], seeds: Iterable[int]) -> List[ActorSystem]:
+    """
+    Restore the checkpoint once per seed, each continuation with its own random streams.
+    """
+    return [restore_checkpoint(checkpoint, config, seed=seed) for seed in seeds]
@@ -1,9 +1,7 @@
 from __future__ import annotations
 import asyncio
-import time
-
-# from asyncio import Queue
-from typing import TYPE_CHECKING
+from collections import deque
+from typing import Deque, List, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from abdes1.actors.message import Message
@@ -14,45 +12,76 @@ from abdes1.actors.actor import Actor
 class DE_Actor(Actor):
     def __init__(self, id: str, actor_system: ActorSystem) -> None:
         super().__init__(id, actor_system)
+        # One completion future per message in the mailbox, in mailbox order
+        self._completions: Deque[asyncio.Future[None]] = deque()
+
+    @property
+    def lookahead(self) -> float:
+        """
+        Lower bound on the delay between the time of a message this actor handles and the time of any event it
+        schedules for another actor. Used by the parallel kernel (see parallel.py); 0.0 is always safe.
+
+        Override this property in actors that never react instantly, e.g. a server with a minimum service time.
+        """
+        return 0.0
+
+    def peers(self) -> List[str]:
+        """
+        Ids of the actors this actor sends messages to. Actors are assumed to reply to the actors that send to them.
+        Used by the parallel kernel to find the links between logical processes.
+
+        Override this method in actors that are configured with the ids of other actors.
+        """
+        return []
 
     async def run(self) -> None:
         self.logger.info(f"Actor '{self.id}' running")
         while True:
             message = await self.mailbox.get()
+            completion = self._completions.popleft()
             self.logger.debug(f"Handling mailbox message from '{message.from_id}': {message}. Mailbox size now [{self.mailbox.qsize()}].")
 
             assert message.processed is False, "Message is already processed"
-            message.processed = False  # just in case
-            await self.process_message(message)
+            try:
+                await self.process_message(message)
+            except Exception as e:
+                # Hand the error to whoever is waiting in receive() instead of killing the actor task
+                completion.set_exception(e)
+                continue
+            message.processed = True
+            completion.set_result(None)
 
     async def receive(self, message: Message) -> None:
         """
-        Receive a message from another actor. Add the message to the mailbox.
+        Receive a message from another actor. Add the message to the mailbox and wait until it has been processed.
 
         Override this method to filter or validate messages before adding them to the mailbox.
 
         Args:
             message (Message): _description_
         """
+        self.check_message_type(message)
+
+        if self.actor_system.event_loop.synchronous:
+            # The event loop awaits the handler directly, there is no mailbox round trip
+            await self.process_message(message)
+            return
+
         # TODO Handle when mailbox is full / backpressure
 
+        completion: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._completions.append(completion)
         self.mailbox.put_nowait(message)
         self.logger.debug(f"Added mailbox Message from '{message.from_id}': {message}. Mailbox size now [{self.mailbox.qsize()}]. ")
 
-        timeout = 5  # or whatever value you deem appropriate
-        start_time = time.time()
-        while not message.processed:
-            await asyncio.sleep(0.01)
-            if time.time() - start_time > timeout:
-                self.logger.error(f"Timeout: Message was not processed in {timeout} seconds.")
-                break
+        # Resolved by run() as soon as process_message returns
+        await completion
 
         self.logger.debug(f"Message processed: {message}")
 
     async def process_message(self, message: Message) -> None:
         """
-        Process a message from the mailbox. Override this method to implement the actor's logic.
-
-        WAARNING: This method must be called from any subclass otherwise receive will hang
+        Process a message from the mailbox by calling the handler registered for its type.
         """
+        await super().process_message(message)
         message.processed = True
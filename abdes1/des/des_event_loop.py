@@ -1,60 +1,204 @@
 from __future__ import annotations
-from asyncio import PriorityQueue
-from typing import TYPE_CHECKING
+import asyncio
+import itertools
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from abdes1.actors import Message
     from abdes1.core import ActorSystem
+from abdes1.actors import Message
 
-from abdes1.core import Event
+from abdes1.core import Event, EventHandle
+from abdes1.core.future_event_list import BinaryHeap, FutureEventList
 
 from abdes1.core.message_logger import MessageLogger
+from abdes1.core.trace import TraceRecorder
 from abdes1.utils.logger import ALogger
 
 
 class DE_EventLoop:
     actor_system: ActorSystem
 
-    def __init__(self) -> None:
-        self.future_event_queue: PriorityQueue[Event] = PriorityQueue()
+    def __init__(
+        self,
+        synchronous: bool = False,
+        future_event_list: Optional[FutureEventList] = None,
+        batch: bool = False,
+        trace: Optional[TraceRecorder] = None,
+    ) -> None:
+        """
+        Discrete event loop.
+
+        Args:
+            synchronous (bool): Run the synchronous kernel. The target actor's handler is awaited directly instead
+                of going through its mailbox, and the loop stops when the future event list is empty. The default
+                (asynchronous) mode waits for new events forever, which is needed when events are scheduled from
+                outside the simulation (e.g. the interactive console).
+            future_event_list (FutureEventList): The future event list implementation. Defaults to a binary heap.
+                Use a CalendarQueue or LadderQueue when hundreds of thousands of events are pending.
+            batch (bool): Dispatch all events with the same timestamp together, grouped by target actor.
+                Every actor gets its messages in one receive_batch call.
+            trace (TraceRecorder): Record every dispatched event in a binary trace. The caller closes the recorder.
+        """
+        self.synchronous = synchronous
+        self.batch = batch
+        self.trace = trace
+        self.future_event_list = future_event_list if future_event_list is not None else BinaryHeap()
+        self._not_empty = asyncio.Event()
         self.current_time: float = 0.0
+        self.event_count = 0  # number of events dispatched
+        self._stop_requested = False
+        self._sequence = itertools.count()
         self.logger = ALogger("-loop-")
-        self.logger.info("Event loop created")
+        self.logger.info(f"Event loop created ({'synchronous' if synchronous else 'asynchronous'})")
         self.message_logger = MessageLogger("-loop-")
 
-    def schedule_event(self, event: Event) -> None:
+    def schedule_event(self, event: Event) -> EventHandle:
         self.logger.debug(f"Scheduling event {event} with scheduled time {event.time:>.2f}")
-        self.future_event_queue.put_nowait(event)
+        self._push(event)
+        return EventHandle(event, self)
+
+    def cancel_event(self, event: Event) -> bool:
+        if event.cancelled or event.dispatched:
+            return False
+        self.logger.debug(f"Cancelling event {event}")
+        self.future_event_list.cancel(event)
+        return True
 
     def dispatch_message(self, message: Message) -> None:
         self.logger.debug(f"Dispatching message {message} as soon as possible (current time: {self.current_time}))")
-        e = Event(time=None, message=message)
-        self.future_event_queue.put_nowait(e)
+        e = Event(time=self.current_time, message=message)
+        self._push(e)
+
+    def _push(self, event: Event) -> None:
+        assert event.time is not None, "event.time is None"
+        self.future_event_list.push((event.time, event.priority, next(self._sequence), event))
+        if not self.synchronous:
+            self._not_empty.set()
+
+    async def run(self, until: Optional[float] = None) -> None:
+        """
+        Dispatch events until there are none left (synchronous) or forever (asynchronous).
 
-    async def run(self) -> None:
+        Args:
+            until (float): Stop before the first event after this simulation time and advance the clock to it.
+                Calling run again continues from there, e.g. after saving a checkpoint (see checkpoint.py).
+        """
         self.logger.info("Event loop running")
 
+        dispatch_next = self._dispatch_batch if self.batch else self._dispatch_next
+        future_event_list = self.future_event_list
         while True:
-            event = await self.future_event_queue.get()
+            if self._stop_requested:
+                self._stop_requested = False
+                self.logger.info(f"Event loop stopped at {self.current_time} on request")
+                return
+            if until is not None and future_event_list and future_event_list.peek()[0] > until:
+                self.current_time = until
+                self.logger.info(f"Event loop stopped at {until}")
+                return
+            if not future_event_list:
+                if self.synchronous:
+                    break
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+            await dispatch_next()
+
+        self.logger.info("Event loop finished: no more future events")
+
+    def stop(self) -> None:
+        """
+        Stop the run after the event that is being dispatched, e.g. once the statistics are precise enough (see
+        StatsActor). The pending events stay: calling run again continues.
+        """
+        self._stop_requested = True
+        if not self.synchronous:
+            self._not_empty.set()
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        The clock, the counters and the pending events, without references to actors (see checkpoint.py).
+        """
+        # Take the next sequence number and put it back
+        sequence = next(self._sequence)
+        self._sequence = itertools.count(sequence)
+        events = [
+            (time, priority, seq, (event.message.type, event.message.content, event.message.from_id, event.message.to_id, event.message.time))
+            for time, priority, seq, event in self.future_event_list.entries()
+        ]
+        return {"current_time": self.current_time, "event_count": self.event_count, "sequence": sequence, "events": events}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Replace the clock, the counters and the pending events with a state from get_state.
+        """
+        self.current_time = state["current_time"]
+        self.event_count = state["event_count"]
+        self._sequence = itertools.count(state["sequence"])
+        self.future_event_list.clear()
+        for time, priority, seq, (type, content, from_id, to_id, message_time) in state["events"]:
+            message = Message(type=type, content=content, from_id=from_id, to_id=to_id, time=message_time)
+            self.future_event_list.push((time, priority, seq, Event(time=time, message=message, priority=priority)))
+        if not self.synchronous:
+            self._not_empty.set()
 
-            assert event.time is not None, "message.scheduled_time is None"
+    async def _dispatch_next(self) -> None:
+        time, _, seq, event = self.future_event_list.pop()
+        event.dispatched = True
+        self.event_count += 1
+        message = event.message
+        if self.trace is not None:
+            self.trace.record(time, seq, message)
 
-            # Advance simulation time
-            if (event.message.to_id != "stats") and (event.message.to_id != "arrivals"):
-                self.current_time = event.time
+        self.current_time = time
 
-            # if self.verbose:
-            #     self.logger.debug(f"T: {self.current_time:>.2f}")
+        # send message to actor, skip the registry lookup if the sender resolved the address
+        to_address = message.to_address
+        target_actor = to_address.actor if to_address is not None else self.actor_system.find_actor(message.to_id)
+        if target_actor is not None:
+            # Update the message time to the current simulation time, i.e. the message is sent "now"
+            message.time = self.current_time
+            self.message_logger.log_message(event_source="-loop-", message=message)
+            await target_actor.receive(message)
+        else:
+            self.logger.warning(f"Error: Actor '{message.to_id}' not found")
 
-            # send message to actor
+    async def _dispatch_batch(self) -> None:
+        """
+        Dispatch all events that share the next timestamp, one receive_batch call per target actor.
+
+        Actors are called in the order of their first event in the batch and each actor gets its messages in
+        scheduling order. Events scheduled while the batch is being dispatched, even for the same timestamp,
+        go into the next batch. Once an event is taken into a batch it counts as dispatched and can no longer
+        be cancelled.
+        """
+        future_event_list = self.future_event_list
+        time = future_event_list.peek()[0]
+
+        batch: Dict[str, List[Message]] = {}
+        while future_event_list and future_event_list.peek()[0] == time:
+            _, _, seq, event = future_event_list.pop()
+            event.dispatched = True
             message = event.message
-            target_actor = self.actor_system.find_actor(message.to_id)
-            if target_actor is not None:
-                # Update the message time to the current simulation time, i.e. the message is sent "now"
-                message.time = self.current_time
-                self.message_logger.log_message(event_source="-loop-", message=message)
-                await target_actor.receive(message)
+            if self.trace is not None:
+                self.trace.record(time, seq, message)
+            messages = batch.get(message.to_id)
+            if messages is None:
+                batch[message.to_id] = [message]
             else:
-                self.logger.warning(f"Error: Actor '{message.to_id}' not found")
+                messages.append(message)
 
-        # TODO Implement Shutdown
+        self.current_time = time
+        for to_id, messages in batch.items():
+            self.event_count += len(messages)
+
+            to_address = messages[0].to_address
+            target_actor = to_address.actor if to_address is not None else self.actor_system.find_actor(to_id)
+            if target_actor is None:
+                self.logger.warning(f"Error: Actor '{to_id}' not found")
+                continue
+
+            for message in messages:
+                message.time = self.current_time
+                self.message_logger.log_message(event_source="-loop-", message=message)
+            await target_actor.receive_batch(messages)
@@ -0,0 +1,82 @@
+"""
+entity.py
+
+Entities with attributes, for the queue disciplines that need more than the arrival order (see queue_disciplines.py).
+
+By default a generator sends entities as plain names, e.g. "entity_7". With attributes configured, it sends an
+Entity instead, which prints as its name:
+
+    "DE_Arrivals": {..., "attributes": {
+        "priority": {"type": "empirical", "values": [0, 1, 2], "probabilities": [0.2, 0.3, 0.5]},
+        "processing_time": {"type": "exponential", "rate": 2.0},
+        "due_in": {"type": "deterministic", "value": 5.0},
+        "entity_class": {"type": "empirical", "values": [0, 1], "probabilities": [0.5, 0.5]}
+    }}
+
+- priority: lower values are served first (Priority)
+- processing_time: the expected service time (SPT, LPT, CR)
+- due_in: the due date is the arrival time plus this (EDD, CR)
+- entity_class: the class, drawn as a number (RoundRobin)
+
+The attributes are drawn from their own random stream, so configuring them does not change the arrival times.
+"""
+import math
+from typing import Any, Dict, NamedTuple
+
+import numpy as np
+
+from abdes1.utils.distributions import Distribution, create_distribution
+
+
+class Entity(NamedTuple):
+    name: str
+    priority: float = 0.0
+    processing_time: float = 0.0
+    due_date: float = math.inf
+    entity_class: int = 0
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __format__(self, spec: str) -> str:
+        # Also in f-strings with a width, e.g. in the message log
+        return format(self.name, spec)
+
+
+ATTRIBUTES = ("priority", "processing_time", "due_in", "entity_class")
+
+
+class EntityAttributes:
+    """
+    Draws the attributes of new entities.
+    """
+
+    def __init__(self, specs: Dict[str, Dict[str, Any]], rng: np.random.Generator) -> None:
+        unknown = set(specs) - set(ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"Unknown entity attributes: {', '.join(sorted(unknown))}. Valid attributes are: {', '.join(ATTRIBUTES)}")
+        self.distributions: Dict[str, Distribution] = {name: create_distribution(spec, rng) for name, spec in specs.items()}
+
+    def create(self, name: str, arrival_time: float) -> Entity:
+        attributes: Dict[str, Any] = {}
+        for attribute, distribution in self.distributions.items():
+            if attribute == "due_in":
+                attributes["due_date"] = arrival_time + distribution.next()
+            elif attribute == "entity_class":
+                attributes["entity_class"] = int(distribution.next())
+            else:
+                attributes[attribute] = distribution.next()
+        return Entity(name, **attributes)
+
+    # --- Checkpoints (see Actor.save_state)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {attribute: distribution.get_state() for attribute, distribution in self.distributions.items()}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        for attribute, distribution_state in state.items():
+            self.distributions[attribute].set_state(distribution_state)
+
+    def reseed(self, rng: np.random.Generator) -> None:
+        for distribution in self.distributions.values():
+            distribution.reseed(rng)
@@ -15,28 +15,27 @@ Strategy:
 In a simulation, simulation time advances much more rapidly than real time.
 In order to simulate events arriving at a given rate, can generate events "up front".
 This is done by generating a batch of events at the start of the simulation.
+
+For long runs, the generator can stream arrivals instead (window): it keeps only a small window of arrivals
+in the future event list and schedules a "generate" event to itself to produce the next window.
+
+Entities are sent as names, e.g. "entity_7", or as an Entity with attributes (priority, due date, ...) if
+attributes are configured (see entity.py).
 """
-import random
-import asyncio
-from typing import Optional
-from math import log
+from typing import Any, Dict, List, Optional
 
 
 # from typing import Any, Coroutine
-from abdes1.core import ActorSystem, Event
-from abdes1.actors import Message
+from abdes1.core import ActorSystem, Address, Event
+from abdes1.actors import Message, handler
 from abdes1.des import DE_Actor
 from abdes1.utils.logger import ALogger
 
 
-random_arrivals = random.Random()
-
-
-def next_exponential(rate: float) -> float:
-    return -1 / rate * (log(1.0 - random_arrivals.random()))
-
-
 class Generator(DE_Actor):
+    state_fields = ("num_events", "generated", "last_event_time", "interarrival_time", "attributes")
+    own_streams = ("attributes",)
+
     def __init__(
         self,
         id: str,
@@ -46,9 +45,34 @@ class Generator(DE_Actor):
         destination: str,
         entity_name: str,
         actor_system: ActorSystem,
+        window: Optional[int] = None,
+        interarrival_time: Optional[Dict[str, Any]] = None,
+        attributes: Optional[Dict[str, Dict[str, Any]]] = None,
     ) -> None:
+        """
+        Args:
+            window (int): Streaming mode: keep at most this many arrivals in the future event list and generate the
+                next ones when the last of them is dispatched. Memory then stays constant however long the run is.
+                By default all arrivals are scheduled up front when the generator starts.
+            interarrival_time (Dict[str, Any]): Distribution of the time between arrivals (see utils/distributions.py).
+                Defaults to exponential with event_rate.
+            attributes (Dict[str, Dict[str, Any]]): Distributions of the entity attributes, e.g. {"priority": {...}}
+                (see entity.py). By default entities have no attributes.
+        """
+        from abdes1.des.entity import EntityAttributes
+        from abdes1.utils.distributions import create_distribution
+
         super().__init__(id, actor_system)
+        if window is not None and window < 1:
+            raise ValueError(f"Generator window must be at least 1, got {window}")
+        self.window = window
         self.event_rate = event_rate
+        self.interarrival_time = create_distribution(
+            interarrival_time if interarrival_time is not None else {"type": "exponential", "rate": event_rate},
+            actor_system.random_streams.stream(id),
+        )
+        # A stream of its own: with or without attributes, the arrival times are the same
+        self.attributes = EntityAttributes(attributes, actor_system.random_streams.stream(self.stream_name("attributes"))) if attributes is not None else None
         self.duration = duration
         self.num_arrivals = num_arrivals
         self.destination = destination
@@ -59,14 +83,27 @@ class Generator(DE_Actor):
         # TODO: Make sure the values are valid
         # event_rate should be > 0
         # duration should be > 0
-        # destination should be a valid actor id
+        # destination should be a valid actor id (checked in resolve_references)
+        self.destination_address: Optional[Address] = None
+        self.num_events = 0  # number of arrivals to generate, set on start
+        self.generated = 0  # number of arrivals scheduled so far
+        self.last_event_time = 0.0  # time of the last scheduled arrival
+
+    def resolve_references(self) -> None:
+        self.destination_address = self.actor_system.resolve(self.destination)
+
+    @property
+    def lookahead(self) -> float:
+        # Every arrival is at least one interarrival time after the one before (or after the start)
+        return self.interarrival_time.minimum
 
-    random_arrivals.seed(333)
+    def peers(self) -> List[str]:
+        return [self.destination]
 
     async def run(self) -> None:
         await super().run()
 
-    # --- Override Actor medhods
+    # --- Message handlers
 
     # A message is sent to this actor
     # What messages does a generator receive?
@@ -76,15 +113,13 @@ class Generator(DE_Actor):
     # Stop ? or stop condition?
     # Maybe only duration (simulated time) is enough?
     # Or the number of events generated?
-    async def receive(self, message: Message) -> None:
-        if message.type == "start":
-            self.logger.debug("Start message received")
-        await super().receive(message)
-
     # Generates entity: entity arrives
     # Server processes entity
     # When done, server sends message to queue "server-ready"
-    async def process_message(self, message: Message) -> None:
+    @handler("start")
+    async def on_start(self, message: Message) -> None:
+        self.logger.debug("Start message received")
+
         # based on event_rate (arrival_rate), generate a batch of events
         # How many events? numevents
         # What is the duration of the batch? duration
@@ -92,21 +127,36 @@ class Generator(DE_Actor):
         # What is the time of the first event? 0
         # What is the time of the last event? duration
 
-        # Schedule a batch of events
-        scheduled_time = 0.0
-
         # Calculate the number of events to generate
-        num_events = self.num_arrivals
+        self.num_events = self.num_arrivals
         if self.duration is not None:
-            num_events = int(self.event_rate * self.duration)
+            self.num_events = int(self.event_rate * self.duration)
+
+        self.generated = 0
+        self.last_event_time = 0.0
+
+        self._generate(self.num_events if self.window is None else self.window)
 
-        last_event_time = 0.0
+    # Streaming mode: the last arrival of the window has been dispatched, schedule the next window
+    @handler("generate")
+    async def on_generate(self, message: Message) -> None:
+        assert self.window is not None
+        self._generate(self.window)
 
-        # Schedule events
-        for i in range(num_events):
-            next_arrival_time = next_exponential(self.event_rate)
+    # --- Internal stuff
+
+    def _generate(self, count: int) -> None:
+        """
+        Schedule the next count arrivals. Then schedule either the refill of the window, at the time of the last
+        scheduled arrival, or the report event if all arrivals have been generated.
+        """
+        scheduled_time = self.last_event_time
+        for i in range(self.generated, min(self.generated + count, self.num_events)):
+            next_arrival_time = self.interarrival_time.next()
             scheduled_time += next_arrival_time
-            entity = f"entity_{i}"
+            entity: Any = f"entity_{i}"
+            if self.attributes is not None:
+                entity = self.attributes.create(entity, scheduled_time)
             event = Event(
                 time=scheduled_time,
                 # target_actor_id=target_actor or "",  # TODO Should be a 'deadletter' actor
@@ -116,22 +166,25 @@ class Generator(DE_Actor):
                     to_id=self.destination,
                     content=entity,
                     time=None,
+                    from_address=self.address,
+                    to_address=self.destination_address,
                 ),
             )
             self.logger.debug(
                 f"Generated arrival of '{entity}' after {next_arrival_time:.2f} at simulation time: {scheduled_time:.2f}",
             )
             self.actor_system.schedule_event(event)
-            last_event_time = scheduled_time
-
-            await asyncio.sleep(0.01)
+            self.generated += 1
+        self.last_event_time = scheduled_time
 
-        message.processed = True
+        if self.generated < self.num_events:
+            # Scheduled after the last arrival of the window, so it is dispatched after it
+            message = Message(type="generate", from_id=self.id, to_id=self.id, content=None, from_address=self.address, to_address=self.address)
+            self.actor_system.schedule_event(Event(time=self.last_event_time, message=message))
+            return
 
         # Schedule a report event
-        report_time = last_event_time + 10.0
+        report_time = self.last_event_time + 10.0
         message = Message(type="save-stats", from_id="mm1-actors", to_id="stats", content=None, time=0.0)
         evt = Event(time=report_time, message=message)
         self.actor_system.schedule_event(evt)
-
-    # --- Internal stuff
@@ -0,0 +1,333 @@
+"""
+parallel.py
+
+Conservative parallel discrete event simulation (Chandy-Misra-Bryant).
+
+The actors of a topology are partitioned over logical processes (LPs), one operating system process each. Every
+LP runs its own event loop over its own actors and dispatches an event only when it is safe: no other LP can
+still send it an event with an earlier time. The stats actors run in the coordinator (the calling process).
+
+Links and lookahead
+    Two LPs are linked when an actor of one sends to an actor of the other (DE_Actor.peers, replies included).
+    The lookahead of the link from LP i to LP j is the smallest lookahead (DE_Actor.lookahead) of the actors of
+    LP i that are linked to LP j: an event LP i sends to LP j is at least that much later than the event LP i
+    was dispatching. A cycle of links with a total lookahead of zero would deadlock, so it is rejected.
+
+Null messages
+    An LP that cannot dispatch its next event sends every linked LP a null message with a lower bound on the
+    time of anything it can still send: min(time of its next event, its own safe time) + link lookahead. The
+    safe time of an LP is the smallest bound it received. LPs block until a message or a bound arrives.
+
+Horizon
+    The run stops at the horizon until: events later than until are not dispatched. Once the LPs run out of
+    events, the bounds only advance by the lookahead per round of null messages, so keep until close to the end.
+
+Metrics recorded in the LPs and the messages to the stats actors are collected and replayed in time order into
+the stats actors in the coordinator. The results are the same as those of the sequential kernel, as long as no
+two events that depend on each other's order have the same time and run in different LPs.
+"""
+from __future__ import annotations
+import asyncio
+import heapq
+import math
+import multiprocessing
+import queue
+import traceback
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from abdes1.actors import Message
+from abdes1.core import ActorSystem, Event, MetricRecord
+from abdes1.des.des_actor import DE_Actor
+from abdes1.des.des_event_loop import DE_EventLoop
+from abdes1.des.remote_actor import RemoteActor
+from abdes1.des.topology import actor_configs, build_actor_system
+
+COORDINATOR = "coordinator"
+Links = Dict[int, Dict[int, float]]  # LP i -> LP j -> lookahead of the link i -> j
+
+
+class LookaheadError(Exception):
+    pass
+
+
+def stats_ids(config: Dict[str, Any]) -> List[str]:
+    return [stats["id"] for stats in actor_configs(config, "Stats")]
+
+
+def find_links(actor_system: ActorSystem, partition: Dict[str, int]) -> Links:
+    """
+    Find the links between LPs and their lookahead, from the peers and the lookahead of the actors.
+    """
+    neighbours: Dict[str, Set[str]] = {actor.id: set() for actor in actor_system.list_actors()}
+    for actor in actor_system.list_actors():
+        if isinstance(actor, DE_Actor):
+            for peer in actor.peers():
+                neighbours[actor.id].add(peer)
+                neighbours[peer].add(actor.id)
+
+    links: Links = {lp: {} for lp in set(partition.values())}
+    for actor_id, lp in partition.items():
+        actor = actor_system.find_actor(actor_id)
+        lookahead = actor.lookahead if isinstance(actor, DE_Actor) else 0.0
+        for neighbour in neighbours[actor_id]:
+            other = partition.get(neighbour)
+            if other is not None and other != lp:
+                links[lp][other] = min(links[lp].get(other, math.inf), lookahead)
+    return links
+
+
+def check_lookahead(links: Links) -> None:
+    """
+    Raise LookaheadError if the links with zero lookahead form a cycle.
+    """
+    zero = {lp: [other for other, lookahead in targets.items() if lookahead <= 0.0] for lp, targets in links.items()}
+    state: Dict[int, int] = {}  # 1: on the current path, 2: done
+
+    def visit(lp: int, path: List[int]) -> None:
+        state[lp] = 1
+        for other in zero[lp]:
+            if state.get(other) == 1:
+                cycle = path[path.index(other) :] + [lp, other]
+                raise LookaheadError(f"Logical processes {' -> '.join(map(str, cycle))} form a cycle without lookahead")
+            if other not in state:
+                visit(other, path + [lp])
+        state[lp] = 2
+
+    for lp in zero:
+        if lp not in state:
+            visit(lp, [])
+
+
+def check_partition(actor_system: ActorSystem, config: Dict[str, Any], partition: Dict[str, int]) -> List[int]:
+    """
+    Check that the partition assigns every actor except the stats actors to an LP, and return the LP numbers.
+    """
+    actor_ids = {actor.id for actor in actor_system.list_actors()} - set(stats_ids(config))
+    if set(partition) != actor_ids:
+        raise ValueError(f"The partition must assign exactly these actors to LPs: {', '.join(sorted(actor_ids))}")
+    lps = sorted(set(partition.values()))
+    if lps != list(range(len(lps))):
+        raise ValueError(f"LPs must be numbered 0..{len(lps) - 1}, got {lps}")
+    return lps
+
+
+class LP_EventLoop(DE_EventLoop):
+    def __init__(self, lp: int, links: Links, inboxes: List[Any], coordinator: Any, until: float) -> None:
+        super().__init__(synchronous=True)
+        self.lp = lp
+        self.until = until
+        self.inboxes = inboxes
+        self.coordinator = coordinator
+        self.lookahead = links[lp]
+        self.in_bound = {other: 0.0 for other, targets in links.items() if lp in targets}
+        self.out_bound = {other: 0.0 for other in self.lookahead}
+        self.coordinator_messages: List[Tuple[float, int, int, Message]] = []
+        self.null_messages = 0
+        self.remote_messages = 0
+
+    def _push(self, event: Event) -> None:
+        message = event.message
+        to_address = message.to_address
+        target = to_address.actor if to_address is not None else self.actor_system.find_actor(message.to_id)
+        if isinstance(target, RemoteActor):
+            self._send(target, event)
+        else:
+            super()._push(event)
+
+    def _send(self, target: RemoteActor, event: Event) -> None:
+        assert event.time is not None
+        # Sent away, it can no longer be cancelled here
+        event.dispatched = True
+        message = event.message
+        # Addresses refer to actors in this process, the receiver resolves the ids
+        remote_message = Message(type=message.type, content=message.content, from_id=message.from_id, to_id=message.to_id)
+        if target.location == COORDINATOR:
+            if event.time <= self.until:
+                self.coordinator_messages.append((event.time, event.priority, next(self._sequence), remote_message))
+            return
+
+        location: int = target.location
+        if location not in self.out_bound:
+            raise LookaheadError(f"LP {self.lp} sends to actor '{target.id}' in LP {location}, but there is no link: declare it in peers()")
+        if event.time < self.out_bound[location]:
+            raise LookaheadError(
+                f"Event for '{target.id}' at {event.time} is earlier than the bound {self.out_bound[location]} LP {self.lp} promised to LP {location}",
+            )
+        self.remote_messages += 1
+        self.inboxes[location].put(("event", self.lp, event.time, event.priority, remote_message))
+
+    def _send_null_messages(self, next_time: float) -> None:
+        for other, lookahead in self.lookahead.items():
+            bound = next_time + lookahead
+            if bound > self.out_bound[other]:
+                self.out_bound[other] = bound
+                self.null_messages += 1
+                self.inboxes[other].put(("null", self.lp, bound))
+
+    def _receive(self, block: bool) -> None:
+        inbox = self.inboxes[self.lp]
+        try:
+            item = inbox.get() if block else inbox.get_nowait()
+            while True:
+                if item[0] == "event":
+                    _, _, time, priority, message = item
+                    super()._push(Event(time=time, message=message, priority=priority))
+                else:
+                    _, other, bound = item
+                    self.in_bound[other] = max(self.in_bound[other], bound)
+                item = inbox.get_nowait()
+        except queue.Empty:
+            pass
+
+    async def run(self) -> None:
+        self.logger.info(f"Logical process {self.lp} running until {self.until}")
+        future_event_list = self.future_event_list
+        in_bound = self.in_bound
+        while True:
+            next_time = future_event_list.peek()[0] if future_event_list else math.inf
+            # Events that are still on their way have a time >= the bounds that came after them
+            safe_time = min(in_bound.values(), default=math.inf)
+            if next_time <= self.until and next_time < safe_time:
+                await self._dispatch_next()
+                continue
+            if next_time > self.until and safe_time > self.until:
+                break
+            self._send_null_messages(min(next_time, safe_time))
+            self._receive(block=True)
+
+        # Nothing more will come from this LP
+        self._send_null_messages(math.inf)
+        self.logger.info(f"Logical process {self.lp} finished: {self.event_count} events, {self.null_messages} null messages")
+
+
+def build_lp_system(
+    config: Dict[str, Any],
+    partition: Dict[str, int],
+    lp: int,
+    event_loop: DE_EventLoop,
+    seed: Optional[int],
+    metric_names: List[str],
+    records: List[MetricRecord],
+) -> ActorSystem:
+    """
+    Build the actor system of an LP: the actors of other LPs and the stats actors are RemoteActor placeholders,
+    and the metrics the stats actors subscribe to are collected in records.
+    """
+    remote: Dict[str, Any] = {actor_id: other for actor_id, other in partition.items() if other != lp}
+    remote.update({actor_id: COORDINATOR for actor_id in stats_ids(config)})
+    actor_system = build_actor_system(config, event_loop, seed=seed, remote=remote)
+    for name in metric_names:
+        actor_system.metrics.subscribe(name, records.append)
+    actor_system.resolve_references()
+    return actor_system
+
+
+def _run_lp(
+    lp: int,
+    config: Dict[str, Any],
+    partition: Dict[str, int],
+    seed: Optional[int],
+    until: float,
+    links: Links,
+    metric_names: List[str],
+    inboxes: List[Any],
+    coordinator: Any,
+) -> None:
+    try:
+        event_loop = LP_EventLoop(lp, links, inboxes, coordinator, until)
+        records: List[MetricRecord] = []
+        build_lp_system(config, partition, lp, event_loop, seed, metric_names, records)
+        asyncio.run(event_loop.run())
+        summary = {"events": event_loop.event_count, "null_messages": event_loop.null_messages, "remote_messages": event_loop.remote_messages}
+        coordinator.put(("done", lp, summary, records, event_loop.coordinator_messages))
+    except BaseException:
+        coordinator.put(("error", lp, traceback.format_exc()))
+
+
+class ParallelResult(NamedTuple):
+    # The coordinator's actor system: holds the stats actors with the replayed metrics
+    actor_system: ActorSystem
+    # Per LP: events, null_messages, remote_messages
+    lp_summaries: Dict[int, Dict[str, int]]
+
+
+def run_parallel(config: Dict[str, Any], partition: Dict[str, int], until: float, seed: Optional[int] = None, timeout: Optional[float] = None) -> ParallelResult:
+    """
+    Run a topology over logical processes.
+
+    Args:
+        config (Dict[str, Any]): The topology configuration (see topology.py)
+        partition (Dict[str, int]): Actor id -> LP number, for every actor except the stats actors
+        until (float): Simulation time horizon. Required: the LPs cannot tell by themselves that the run is over.
+        seed (int): Master seed of the random streams. Every actor draws from the same stream as in a sequential run.
+        timeout (float): Seconds to wait for the LPs
+    """
+    if not math.isfinite(until):
+        raise ValueError("The parallel kernel needs a finite horizon (until)")
+
+    # Build the whole topology once, to check the partition and to find the links
+    sequential = build_actor_system(config, DE_EventLoop(synchronous=True), seed=seed)
+    sequential.resolve_references()
+    lps = check_partition(sequential, config, partition)
+    links = find_links(sequential, partition)
+    check_lookahead(links)
+
+    # The stats actors run here, and get the metrics and messages of the LPs replayed
+    coordinator_system = build_actor_system({"Stats": config["Stats"]} if "Stats" in config else {}, DE_EventLoop(synchronous=True), seed=seed)
+    metric_names = coordinator_system.metrics.names()
+
+    context = multiprocessing.get_context("spawn")
+    inboxes = [context.Queue() for _ in lps]
+    coordinator = context.Queue()
+    processes = [
+        context.Process(target=_run_lp, args=(lp, config, partition, seed, until, links, metric_names, inboxes, coordinator), name=f"abdes1-lp-{lp}", daemon=True)
+        for lp in lps
+    ]
+    for process in processes:
+        process.start()
+
+    lp_summaries: Dict[int, Dict[str, int]] = {}
+    lp_records: Dict[int, List[MetricRecord]] = {}
+    messages: List[Tuple[float, int, int, Message]] = []
+    try:
+        while len(lp_summaries) < len(lps):
+            item = coordinator.get(timeout=timeout)
+            if item[0] == "error":
+                raise Exception(f"Logical process {item[1]} failed:\n{item[2]}")
+            _, lp, summary, records, lp_messages = item
+            lp_summaries[lp] = summary
+            lp_records[lp] = records
+            messages.extend(lp_messages)
+    finally:
+        for process in processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+
+    asyncio.run(replay(coordinator_system, [lp_records[lp] for lp in lps], messages))
+    return ParallelResult(coordinator_system, lp_summaries)
+
+
+async def replay(actor_system: ActorSystem, records: List[List[MetricRecord]], messages: List[Tuple[float, int, int, Message]]) -> None:
+    """
+    Replay the metric records of the LPs (every list in time order) and the messages for the stats actors into
+    the coordinator's actor system, in time order.
+    """
+    event_loop: DE_EventLoop = actor_system.event_loop  # type: ignore
+    messages.sort(key=lambda m: (m[0], m[1]))
+    stream = heapq.merge(
+        *[[(record.time, 0, record) for record in lp_records] for lp_records in records],
+        [(time, 1, message) for time, _, _, message in messages],
+        key=lambda item: (item[0], item[1]),
+    )
+    for time, kind, item in stream:
+        event_loop.current_time = time
+        if kind == 0:
+            actor_system.metrics.record(item.name, item.value, item.source)
+            continue
+        actor = actor_system.find_actor(item.to_id)
+        if actor is None:
+            continue
+        event_loop.event_count += 1
+        item.time = time
+        await actor.receive(item)
@@ -0,0 +1,123 @@
+"""
+plotting.py
+
+Plots of the queue depths written by a stats actor, downsampled to the width of the plot.
+
+    plot_queue_depths("mm1_actors")                              # queue_depth_mm1_actors.png
+    plot_queue_depths("mm1_actors", window=(1000.0, 1100.0))     # a zoom
+    python -m abdes1 plot mm1_actors --window 1000:1100
+
+The stats actor does not plot inside the simulation: start_plot plots in a worker process, which the simulation
+does not wait for (the Python interpreter does, when it exits).
+
+- "minmax" (default): the envelope of the minimum and the maximum per pixel column. The plot of a columnar store
+  comes from its pyramid (see abdes1/utils/downsampling.py), which is built and saved with the first plot, so a
+  zoom reads only the buckets in the window.
+- "lttb": Largest-Triangle-Three-Buckets, a line through a subset of the points
+"""
+from __future__ import annotations
+import logging
+import multiprocessing
+from multiprocessing.process import BaseProcess
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from abdes1.utils.column_store import is_column_store
+from abdes1.utils.downsampling import Pyramid, lttb
+
+PIXELS = 1000  # pixel columns, a bit more than the width of the default figure
+
+
+def _pyplot() -> Any:
+    """
+    Import matplotlib.pyplot on first use. It takes longer to import than the rest of abdes1 together.
+    """
+    # Don't let matplotlib use my logger but instead reate a new logger object for matplotlib
+    mpl_logger = logging.getLogger("matplotlib")
+    if not mpl_logger.handlers:
+        mpl_logger.setLevel(logging.WARNING)
+        mpl_handler = logging.StreamHandler()
+        mpl_formatter = logging.Formatter("%(levelname)s: %(message)s")
+        mpl_handler.setFormatter(mpl_formatter)
+        mpl_logger.addHandler(mpl_handler)
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def plot_path(output_path: str, window: Optional[Tuple[float, float]] = None) -> str:
+    """
+    queue_depth_<name>.png next to the output, queue_depth_<name>_<start>-<end>.png for a window.
+    """
+    path = Path(output_path)
+    suffix = f"_{window[0]:g}-{window[1]:g}" if window is not None else ""
+    return str(path.with_name(f"queue_depth_{path.stem}{suffix}.png"))
+
+
+def plot_queue_depths(
+    output_path: str,
+    png_path: Optional[str] = None,
+    window: Optional[Tuple[float, float]] = None,
+    method: str = "minmax",
+    pixels: int = PIXELS,
+) -> str:
+    """
+    Plot the queue depths of a stats actor output and return the path of the PNG file.
+
+    Args:
+        output_path (str): Columnar store or CSV file of a stats actor
+        png_path (str): Defaults to plot_path(output_path, window)
+        window (Tuple[float, float]): Only plot this time range
+        method (str): "minmax" or "lttb"
+        pixels (int): Pixel columns (minmax) or points (lttb)
+    """
+    # Imported here: stats_actor uses this module
+    from abdes1.des.stats_actor import read_queue_depths
+
+    if method not in ("minmax", "lttb"):
+        raise ValueError(f"Unknown plot method: {method}")
+    times, depths = read_queue_depths(output_path)
+
+    plt = _pyplot()
+    plt.figure()  # type: ignore
+    plt.title("M/M/1 Queue Simulation (Actors)")  # type: ignore
+    plt.xlabel("Time (seconds)")  # type: ignore
+    plt.ylabel("Queue Depth")  # type: ignore
+    plt.grid(True)  # type: ignore
+    if len(times) > 0:
+        start, end = window if window is not None else (float(times[0]), float(times[-1]))
+        if method == "lttb":
+            first = max(int(np.searchsorted(times, start, side="right")) - 1, 0)
+            last = int(np.searchsorted(times, end, side="right"))
+            x, y = lttb(times[first:last], depths[first:last], pixels)
+            plt.plot(x, y, drawstyle="steps-post", linewidth=0.5, color="black")  # type: ignore
+        else:
+            x, low, high = _pyramid(output_path, times, depths).window(start, end, pixels)
+            plt.fill_between(x, low, high, step="post", linewidth=0.5, color="black")  # type: ignore
+        plt.xlim(start, end)  # type: ignore
+    plt.tight_layout()  # type: ignore
+    png_path = png_path if png_path is not None else plot_path(output_path, window)
+    plt.savefig(png_path)  # type: ignore
+    plt.close()  # type: ignore
+    return png_path
+
+
+def start_plot(output_path: str, **kwargs: Any) -> BaseProcess:
+    """
+    Plot in a worker process (see plot_queue_depths for the arguments) and return the process.
+    """
+    process = multiprocessing.get_context("spawn").Process(target=plot_queue_depths, args=(output_path,), kwargs=kwargs, name="abdes1-plot")
+    process.start()
+    return process
+
+
+def _pyramid(output_path: str, times: np.ndarray, depths: np.ndarray) -> Pyramid:
+    if not is_column_store(output_path):
+        return Pyramid(times, depths)
+    pyramid = Pyramid.load(output_path, times, depths)
+    if pyramid is None:
+        pyramid = Pyramid(times, depths)
+        pyramid.save(output_path)
+    return pyramid
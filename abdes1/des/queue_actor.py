@@ -13,23 +13,22 @@ This queue contains entities that arrive and wait to be served by a server.
 Typically, a FIFO queue is used in an M/M/1 queueing system.
 In an M/M/1 queueing system, there is only one server.
 The id of this server is passed to the queue actor during initialization.
-"""
-from asyncio import Queue
 
-import asyncio
-from typing import Optional, Tuple, TypedDict
+The order in which waiting entities are served is the queue type (see queue_disciplines.py).
+"""
+from typing import Any, List, Optional, Tuple, TypedDict
 from enum import Enum
 
 
 # from typing import Any, Coroutine
-from abdes1.core import ActorSystem, Event
-from abdes1.actors import Message
+from abdes1.core import ActorSystem, Address, Event
+from abdes1.actors import Message, handler
 
 # from abdes1.utils.logger import ALogger
 from abdes1.des import DE_Actor
+from abdes1.des.queue_disciplines import QueueDiscipline, create_discipline
 
 
-# Having fun with queue types. For now we only use FIFO in M/M/1
 class QueueType(Enum):
     FIFO = "FIFO"
     LIFO = "LIFO"
@@ -50,6 +49,8 @@ class QueueActorArgs(TypedDict):
 
 
 class QueueActor(DE_Actor):
+    state_fields = ("queue", "server_ready", "in_service")
+
     def __init__(
         self,
         id: str,
@@ -61,36 +62,24 @@ class QueueActor(DE_Actor):
         super().__init__(id, actor_system)
         self.server = server
         self.entity_name = entity_name
-        self.type = type
-        self.queue: Queue[Tuple[float, str]] = Queue()
+        self.type = QueueType(type)  # also from the value, e.g. "FIFO" in a configuration file
+        self.queue: QueueDiscipline = create_discipline(self.type.value, actor_system.random_streams.stream(id))
         self.id = id
         self.server_ready: bool = False  # keep track of server state. Used in order to keep queue_actor reentrant.
+        self.server_address: Optional[Address] = None  # resolved in resolve_references()
+        self.in_service: Optional[Tuple[float, Any]] = None  # (arrival time, entity) of the entity at the server
+        self.register_handler(entity_name, self.on_entity)
+
+    def resolve_references(self) -> None:
+        self.server_address = self.actor_system.resolve(self.server)
+
+    def peers(self) -> List[str]:
+        return [self.server]
 
     async def run(self) -> None:
         await super().run()
 
-    # --- Override Actor medhods
-
-    # A message is sent to this actor
-    async def receive(self, message: Message) -> None:
-        # TODO Validate message format
-        # TODO Validate sender?
-        # Validate message is for this actor
-
-        if message.type == self.entity_name:
-            self.logger.debug(f"Message received from '{message.from_id}': Entity {message.content} arrived!")
-        elif message.type == "server-ready":
-            self.server_ready = True
-            self.logger.debug(f"Message received from '{message.from_id}': Server ready!")
-        elif message.type == "get-state":
-            state = f"Queue depth: {self._get_depth()}"
-            print(state)  # TODO: Should really send a message back to the sender
-        else:
-            raise Exception(
-                f"Invalid message type: {message.type}. Valid message types are: '{self.entity_name}', 'server-ready'",
-            )
-
-        await super().receive(message)
+    # --- Message handlers
 
     # Arrival message: entity arrives -> enqueue
     # Server ready message: server ready ->
@@ -103,100 +92,128 @@ class QueueActor(DE_Actor):
     # 2. Message "server-ready" received from server.
     #    If queue is not empty, dequeue message and send to server.
     #    If queue is empty, set server state to ready (server_ready = True)
-    async def process_message(self, message: Message) -> None:
-        try:
-            self.logger.debug(f"Processing message: {message}")
-
-            assert message.time is not None
-
-            # arrival time is either the scheduled time or the time the message was sent
-            arrival_time = message.time
-
-            # If server is ready, send message directly to server
-            # If server is not ready, enqueue message
-            if message.type == self.entity_name:
-                # If server is ready, send directly to server
-                #   entity was not queued, so time == arrival_time == scheduled_time
-                # Else, enqueue
-
-                if self.server_ready:
-                    if self.queue.empty():
-                        self.logger.debug(f"Queue is empty. Sending {self.entity_name} '{message.content}' directly to '{self.server}'")
-                        message_to_send = Message(type=self.entity_name, from_id=self.id, to_id=self.server, content=message.content)
-                        self.actor_system.schedule_event(Event(time=arrival_time, message=message_to_send))
-                    else:
-                        # Dequeue entity and send to server
-                        # Enqueue incoming message
-                        # scheduled_time = time 'server-ready' was received = msessage.secheduled_time
-
-                        self.logger.debug(
-                            f"Queue is not empty. Dequeueing {self.entity_name} '{message.content}' and sending to '{self.server}'.\
-                                  Queueing {self.entity_name} '{message.content}'"
-                        )
-
-                        self._enqueue(arrival_time, message.content)
-                        result = await self._dequeue()
-                        if result is None:
-                            raise Exception("Invalid result from dequeue")
-
-                        (_, entity) = result
-                        message_to_send = Message(
-                            type=self.entity_name,
-                            from_id=self.id,
-                            to_id=self.server,
-                            content=entity,
-                        )
-                        self.actor_system.schedule_event(Event(time=message.time, message=message_to_send))
-                else:
-                    self._enqueue(arrival_time, message.content)
-
-                self.actor_system.dispatch_message(
-                    message=Message(type="queue-depth", from_id=self.id, to_id="stats", content=self.queue.qsize(), time=message.time),
+
+    # Registered for the configured entity name in __init__
+    async def on_entity(self, message: Message) -> None:
+        self.logger.debug(f"Message received from '{message.from_id}': Entity {message.content} arrived!")
+
+        assert message.time is not None
+
+        # arrival time is either the scheduled time or the time the message was sent
+        arrival_time = message.time
+
+        # If server is ready, send directly to server
+        #   entity was not queued, so time == arrival_time == scheduled_time
+        # Else, enqueue
+        if self.server_ready:
+            if not self.queue:
+                self.logger.debug(f"Queue is empty. Sending {self.entity_name} '{message.content}' directly to '{self.server}'")
+                message_to_send = Message(
+                    type=self.entity_name,
+                    from_id=self.id,
+                    to_id=self.server,
+                    content=message.content,
+                    from_address=self.address,
+                    to_address=self.server_address,
+                )
+                self.actor_system.schedule_event(Event(time=arrival_time, message=message_to_send))
+                self._start_service(arrival_time, message.content)
+            else:
+                # Dequeue entity and send to server
+                # Enqueue incoming message
+                # scheduled_time = time 'server-ready' was received = msessage.secheduled_time
+
+                self.logger.debug(
+                    f"Queue is not empty. Dequeueing {self.entity_name} '{message.content}' and sending to '{self.server}'.\
+                          Queueing {self.entity_name} '{message.content}'"
                 )
 
-                self.server_ready = False
+                self._enqueue(arrival_time, message.content)
+                result = self._dequeue()
+                if result is None:
+                    raise Exception("Invalid result from dequeue")
+
+                (entity_arrival_time, entity) = result
+                message_to_send = Message(
+                    type=self.entity_name,
+                    from_id=self.id,
+                    to_id=self.server,
+                    content=entity,
+                    from_address=self.address,
+                    to_address=self.server_address,
+                )
+                self.actor_system.schedule_event(Event(time=message.time, message=message_to_send))
+                self._start_service(entity_arrival_time, entity)
+        else:
+            self._enqueue(arrival_time, message.content)
 
-            if message.type == "server-ready":
-                # The time is now the message.time, i.e. the time the message was sent from the server
-                # This is equal to the dequeue time plus the service time
-                # This is equal to the previous "server_ready" time plus the service time
+        self.actor_system.metrics.record("queue-depth", len(self.queue), self.id)
 
-                if (result := await self._dequeue()) is not None:
-                    _, entity = result
-                else:
-                    # No entities in queue, but server state is ready.
-                    # As soon as an entity arrives, the entity will be sent to the server
-                    return
+        self.server_ready = False
 
-                # TODO: We can calculate the wait time here!
+    @handler("server-ready")
+    async def on_server_ready(self, message: Message) -> None:
+        self.server_ready = True
+        self.logger.debug(f"Message received from '{message.from_id}': Server ready!")
 
-                self.logger.debug(f"Sending {self.entity_name} ({entity}) at the head of the queue to '{self.server}'")
-                message_to_send = Message(type=self.entity_name, from_id=self.id, to_id=self.server, content=entity)
+        # The time is now the message.time, i.e. the time the message was sent from the server
+        # This is equal to the dequeue time plus the service time
+        # This is equal to the previous "server_ready" time plus the service time
 
-                self.actor_system.schedule_event(Event(time=message.time, message=message_to_send))
-                self.server_ready = False
-                self.actor_system.dispatch_message(
-                    message=Message(type="queue-depth", from_id=self.id, to_id="stats", content=self.queue.qsize(), time=message.time),
-                )
+        if self.in_service is not None:
+            # The entity at the server is done: it leaves the system
+            self.actor_system.metrics.record("sojourn-time", message.time - self.in_service[0], self.id)  # type: ignore
 
-        finally:
-            await super().process_message(message)
+        if (result := self._dequeue()) is not None:
+            arrival_time, entity = result
+        else:
+            # No entities in queue, but server state is ready.
+            # As soon as an entity arrives, the entity will be sent to the server
+            self.in_service = None
+            self.actor_system.metrics.record("server-busy", 0, self.server)
+            return
+
+        self.logger.debug(f"Sending {self.entity_name} ({entity}) at the head of the queue to '{self.server}'")
+        message_to_send = Message(
+            type=self.entity_name,
+            from_id=self.id,
+            to_id=self.server,
+            content=entity,
+            from_address=self.address,
+            to_address=self.server_address,
+        )
+
+        self.actor_system.schedule_event(Event(time=message.time, message=message_to_send))
+        self.server_ready = False
+        self._start_service(arrival_time, entity)
+        self.actor_system.metrics.record("queue-depth", len(self.queue), self.id)
+
+    @handler("get-state")
+    async def on_get_state(self, message: Message) -> None:
+        state = f"Queue depth: {self._get_depth()}"
+        print(state)  # TODO: Should really send a message back to the sender
 
     # --- Internal stuff
 
-    def _enqueue(self, arrival_time: float, entity: str) -> None:
-        self.queue.put_nowait((arrival_time, entity))
-
-    async def _dequeue(self) -> Optional[Tuple[float, str]]:
-        try:
-            # 0.01 is a hack to avoid the queue.get() to block forever
-            async with asyncio.timeout_at(asyncio.get_running_loop().time() + 0.01):
-                (arrival_time, entity) = await self.queue.get()
-                self.logger.debug(f"Got '{entity}' with arrival time {arrival_time:.2f} off the queue. Queue size: {self.queue.qsize()}")
-                return (arrival_time, entity)
-
-        except TimeoutError:
+    def _start_service(self, arrival_time: float, entity: Any) -> None:
+        # Wait and sojourn times are measured here, the server only knows the service time
+        metrics = self.actor_system.metrics
+        metrics.record("wait-time", self.actor_system.event_loop.current_time - arrival_time, self.id)
+        if self.in_service is None:
+            metrics.record("server-busy", 1, self.server)
+        self.in_service = (arrival_time, entity)
+
+    def _enqueue(self, arrival_time: float, entity: Any) -> None:
+        self.queue.push(arrival_time, entity)
+
+    def _dequeue(self) -> Optional[Tuple[float, Any]]:
+        # Never wait for an entity: an empty queue simply means there is nothing to serve yet
+        result = self.queue.pop(self.actor_system.event_loop.current_time)
+        if result is None:
             return None
+        (arrival_time, entity) = result
+        self.logger.debug(f"Got '{entity}' with arrival time {arrival_time:.2f} off the queue. Queue size: {len(self.queue)}")
+        return (arrival_time, entity)
 
     def _get_depth(self) -> int:
-        return self.queue.qsize()
+        return len(self.queue)
@@ -0,0 +1,345 @@
+"""
+queue_disciplines.py
+
+The waiting lines of a queue actor, one per QueueType. Every discipline stores (arrival time, entity) items and
+takes the next one without waiting: pop returns None when the line is empty.
+
+- FIFO, LIFO: a deque, O(1)
+- Priority, SPT, LPT, EDD: a heap keyed on the priority, the processing time (shortest or longest first) or the due
+  date, O(log n). Equal keys are served in arrival order.
+- Random: a list with swap-remove, O(1)
+- RoundRobin: a deque per entity class and a rotation of the classes that have entities waiting, O(1)
+- CR: the smallest critical ratio (due date - now) / processing time first. The ratios of two entities can swap
+  order as time passes, so no heap can keep them sorted: pop scans the line, O(n).
+
+The keys come from the attributes of the entities (see entity.py). Entities without attributes, e.g. plain names,
+have the defaults of Entity, so every keyed discipline serves them in arrival order.
+
+Undo log (incremental state saving for the Time Warp kernel, see time_warp.py): once start_undo_log is called,
+every push and pop appends how to undo it. mark() is the position in the log, O(1) whatever the length of the
+line, and undo(mark) takes back the changes since then, latest first. forget(mark) drops the entries before a
+mark that is no longer needed. Without a log, push and pop record nothing.
+"""
+from __future__ import annotations
+import heapq
+import math
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Item = Tuple[float, Any]  # (arrival time, entity)
+
+
+class QueueDiscipline:
+    undo_log: Optional[List[Tuple[Any, ...]]] = None
+    _undo_base = 0  # marks of the entries dropped by forget
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def push(self, arrival_time: float, entity: Any) -> None:
+        raise NotImplementedError
+
+    def pop(self, now: float) -> Optional[Item]:
+        """
+        Take the next entity to serve at time now, or None if the line is empty.
+        """
+        raise NotImplementedError
+
+    # --- Checkpoints (see Actor.save_state)
+
+    def get_state(self) -> Any:
+        raise NotImplementedError
+
+    def set_state(self, state: Any) -> None:
+        raise NotImplementedError
+
+    # --- Undo log (see Actor.mark_state)
+
+    def start_undo_log(self) -> None:
+        self.undo_log = []
+        self._undo_base = 0
+
+    def mark(self) -> int:
+        assert self.undo_log is not None
+        return self._undo_base + len(self.undo_log)
+
+    def undo(self, mark: int) -> None:
+        assert self.undo_log is not None
+        log = self.undo_log
+        while self._undo_base + len(log) > mark:
+            self._undo(log.pop())
+
+    def forget(self, mark: int) -> None:
+        assert self.undo_log is not None
+        del self.undo_log[: mark - self._undo_base]
+        self._undo_base = mark
+
+    def _undo(self, entry: Tuple[Any, ...]) -> None:
+        raise NotImplementedError
+
+
+class FIFO(QueueDiscipline):
+    def __init__(self) -> None:
+        self.items: Deque[Item] = deque()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def push(self, arrival_time: float, entity: Any) -> None:
+        self.items.append((arrival_time, entity))
+        if self.undo_log is not None:
+            self.undo_log.append(("push",))
+
+    def pop(self, now: float) -> Optional[Item]:
+        if not self.items:
+            return None
+        item = self.items.popleft()
+        if self.undo_log is not None:
+            self.undo_log.append(("pop", item))
+        return item
+
+    def get_state(self) -> Any:
+        return deque(self.items)
+
+    def set_state(self, state: Any) -> None:
+        self.items = state
+
+    def _undo(self, entry: Tuple[Any, ...]) -> None:
+        if entry[0] == "push":
+            self.items.pop()
+        else:
+            self.items.appendleft(entry[1])
+
+
+class LIFO(FIFO):
+    def pop(self, now: float) -> Optional[Item]:
+        if not self.items:
+            return None
+        item = self.items.pop()
+        if self.undo_log is not None:
+            self.undo_log.append(("pop", item))
+        return item
+
+    def _undo(self, entry: Tuple[Any, ...]) -> None:
+        if entry[0] == "push":
+            self.items.pop()
+        else:
+            self.items.append(entry[1])
+
+
+class Keyed(QueueDiscipline):
+    """
+    A heap of (key, sequence number, arrival time, entity): the smallest key first, then the first to arrive.
+    """
+
+    def __init__(self, key: Callable[[Any], float]) -> None:
+        self.key = key
+        self.heap: List[Tuple[float, int, float, Any]] = []
+        self.sequence = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def push(self, arrival_time: float, entity: Any) -> None:
+        entry = (self.key(entity), self.sequence, arrival_time, entity)
+        heapq.heappush(self.heap, entry)
+        self.sequence += 1
+        if self.undo_log is not None:
+            self.undo_log.append(("push", entry))
+
+    def pop(self, now: float) -> Optional[Item]:
+        if not self.heap:
+            return None
+        entry = heapq.heappop(self.heap)
+        if self.undo_log is not None:
+            self.undo_log.append(("pop", entry))
+        return (entry[2], entry[3])
+
+    def get_state(self) -> Any:
+        return (list(self.heap), self.sequence)
+
+    def set_state(self, state: Any) -> None:
+        self.heap, self.sequence = state
+
+    def _undo(self, entry: Tuple[Any, ...]) -> None:
+        if entry[0] == "push":
+            # Only on a rollback: find the entry by its unique sequence number, O(n)
+            self.heap.remove(entry[1])
+            heapq.heapify(self.heap)
+            self.sequence -= 1
+        else:
+            heapq.heappush(self.heap, entry[1])
+
+
+class Random(QueueDiscipline):
+    def __init__(self, rng: np.random.Generator) -> None:
+        self.rng = rng
+        self.items: List[Item] = []
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def push(self, arrival_time: float, entity: Any) -> None:
+        self.items.append((arrival_time, entity))
+        if self.undo_log is not None:
+            self.undo_log.append(("push",))
+
+    def pop(self, now: float) -> Optional[Item]:
+        items = self.items
+        if not items:
+            return None
+        rng_state = self.rng.bit_generator.state if self.undo_log is not None else None
+        # Swap the chosen item with the last one, then remove the last one
+        i = int(self.rng.integers(len(items)))
+        items[i], items[-1] = items[-1], items[i]
+        item = items.pop()
+        if self.undo_log is not None:
+            self.undo_log.append(("pop", i, item, rng_state))
+        return item
+
+    def get_state(self) -> Any:
+        return (list(self.items), self.rng.bit_generator.state)
+
+    def set_state(self, state: Any) -> None:
+        self.items, self.rng.bit_generator.state = state
+
+    def _undo(self, entry: Tuple[Any, ...]) -> None:
+        if entry[0] == "push":
+            self.items.pop()
+            return
+        # Put the item back where it was and rewind the random stream
+        _, i, item, rng_state = entry
+        items = self.items
+        items.append(item)
+        items[i], items[-1] = items[-1], items[i]
+        self.rng.bit_generator.state = rng_state
+
+    def reseed(self, rng: np.random.Generator) -> None:
+        self.rng = rng
+
+
+class RoundRobin(QueueDiscipline):
+    """
+    One entity of every class in turn, in arrival order within a class.
+    """
+
+    def __init__(self) -> None:
+        self.lines: Dict[Any, Deque[Item]] = {}
+        self.turns: Deque[Any] = deque()  # the classes with entities waiting, the next one first
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def push(self, arrival_time: float, entity: Any) -> None:
+        entity_class = getattr(entity, "entity_class", 0)
+        line = self.lines.get(entity_class)
+        new = line is None
+        if line is None:
+            line = self.lines[entity_class] = deque()
+            self.turns.append(entity_class)
+        line.append((arrival_time, entity))
+        self.count += 1
+        if self.undo_log is not None:
+            self.undo_log.append(("push", entity_class, new))
+
+    def pop(self, now: float) -> Optional[Item]:
+        if not self.turns:
+            return None
+        entity_class = self.turns.popleft()
+        line = self.lines[entity_class]
+        item = line.popleft()
+        if line:
+            self.turns.append(entity_class)
+        else:
+            del self.lines[entity_class]
+        self.count -= 1
+        if self.undo_log is not None:
+            self.undo_log.append(("pop", entity_class, item))
+        return item
+
+    def get_state(self) -> Any:
+        return ({entity_class: deque(line) for entity_class, line in self.lines.items()}, deque(self.turns), self.count)
+
+    def set_state(self, state: Any) -> None:
+        self.lines, self.turns, self.count = state
+
+    def _undo(self, entry: Tuple[Any, ...]) -> None:
+        kind, entity_class = entry[0], entry[1]
+        if kind == "push":
+            self.lines[entity_class].pop()
+            if entry[2]:
+                del self.lines[entity_class]
+                self.turns.pop()
+        else:
+            line = self.lines.get(entity_class)
+            if line is None:
+                line = self.lines[entity_class] = deque()
+            else:
+                self.turns.pop()  # the class went to the back of the turns
+            line.appendleft(entry[2])
+            self.turns.appendleft(entity_class)
+        self.count += 1 if kind == "pop" else -1
+
+
+class CriticalRatio(FIFO):
+    def pop(self, now: float) -> Optional[Item]:
+        items = self.items
+        if not items:
+            return None
+        best, best_ratio = 0, math.inf
+        for i, (_, entity) in enumerate(items):
+            ratio = critical_ratio(entity, now)
+            if ratio < best_ratio:
+                best, best_ratio = i, ratio
+        item = items[best]
+        del items[best]
+        if self.undo_log is not None:
+            self.undo_log.append(("pop", best, item))
+        return item
+
+    def _undo(self, entry: Tuple[Any, ...]) -> None:
+        if entry[0] == "push":
+            self.items.pop()
+        else:
+            self.items.insert(entry[1], entry[2])
+
+
+def critical_ratio(entity: Any, now: float) -> float:
+    slack = getattr(entity, "due_date", math.inf) - now
+    processing_time = getattr(entity, "processing_time", 0.0)
+    if processing_time <= 0.0:
+        # Nothing left to do: only the sign of the slack matters
+        return math.copysign(math.inf, slack) if slack else 0.0
+    return slack / processing_time
+
+
+def create_discipline(queue_type: str, rng: np.random.Generator) -> QueueDiscipline:
+    """
+    The waiting line of a QueueType value, e.g. "FIFO".
+
+    Args:
+        rng (np.random.Generator): The random stream of the Random discipline
+    """
+    if queue_type == "FIFO":
+        return FIFO()
+    if queue_type == "LIFO":
+        return LIFO()
+    if queue_type == "Priority":
+        return Keyed(lambda entity: getattr(entity, "priority", 0.0))
+    if queue_type == "SPT":
+        return Keyed(lambda entity: getattr(entity, "processing_time", 0.0))
+    if queue_type == "LPT":
+        return Keyed(lambda entity: -getattr(entity, "processing_time", 0.0))
+    if queue_type == "EDD":
+        return Keyed(lambda entity: getattr(entity, "due_date", math.inf))
+    if queue_type == "Random":
+        return Random(rng)
+    if queue_type == "RoundRobin":
+        return RoundRobin()
+    if queue_type == "CR":
+        return CriticalRatio()
+    raise ValueError(f"Unknown queue type: {queue_type}")
@@ -0,0 +1,24 @@
+"""
+remote_actor.py
+
+Placeholder for an actor that lives in another logical process (see parallel.py).
+
+It is registered under the id of the remote actor, so that references to it resolve, and the event loop of the
+logical process sends the events for it to its location instead of dispatching them.
+"""
+from typing import Any
+
+from abdes1.actors import Actor, Message
+from abdes1.core import ActorSystem
+
+
+class RemoteActor(Actor):
+    def __init__(self, id: str, location: Any, actor_system: ActorSystem) -> None:
+        super().__init__(id, actor_system)
+        self.location = location
+
+    async def run(self) -> None:
+        pass
+
+    async def receive(self, message: Message) -> None:
+        raise Exception(f"Actor '{self.id}' runs in logical process {self.location}, its messages must be sent there")
@@ -0,0 +1,115 @@
+"""
+replications.py
+
+Independent replications of a simulation, run in parallel.
+
+Every replication builds the topology from the same configuration with its own master seed, runs it with the
+synchronous kernel in a worker process and returns its summary statistics (see StatsActor.summary). Every
+replication writes its files to its own directory, <output_dir>/seed-<seed>/.
+
+    results = run_replications(config, seeds=range(1, 101), output_dir="runs")
+    for name, ci in results.confidence_intervals().items():
+        print(f"{name}: {ci.mean:.3f} +/- {ci.half_width:.3f}")
+"""
+from __future__ import annotations
+import asyncio
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from abdes1.des.checkpoint import Checkpoint
+
+from abdes1.des.des_event_loop import DE_EventLoop
+from abdes1.des.stats_actor import StatsActor
+from abdes1.des.topology import actor_configs, build_actor_system
+from abdes1.utils.logger import configure_logging
+from abdes1.utils.statistics import ConfidenceInterval, confidence_interval
+
+Summary = Dict[str, float]
+
+
+def replication_config(config: Dict[str, Any], run_dir: str, plot: bool = False) -> Dict[str, Any]:
+    """
+    Return a copy of the configuration with the output files of the stats actors moved to run_dir.
+    """
+    config = copy.deepcopy(config)
+    stats = [dict(stats_config, output_path=os.path.join(run_dir, os.path.basename(stats_config["output_path"])), plot=plot) for stats_config in actor_configs(config, "Stats")]
+    if stats:
+        config["Stats"] = stats if isinstance(config["Stats"], list) else stats[0]
+    return config
+
+
+def run_replication(config: Dict[str, Any], seed: int, output_dir: str, plot: bool = False, checkpoint: Optional[Checkpoint] = None) -> Summary:
+    """
+    Run one replication and return its summary: "events" and "end_time", and the summary of every stats actor
+    with the actor id as prefix, e.g. "stats.mean_queue_depth".
+
+    With a checkpoint, the replication continues from the checkpoint with its seed instead of starting at time 0.
+    """
+    run_dir = os.path.join(output_dir, f"seed-{seed}")
+    os.makedirs(run_dir, exist_ok=True)
+
+    event_loop = DE_EventLoop(synchronous=True)
+    if checkpoint is not None:
+        from abdes1.des.checkpoint import restore_checkpoint
+
+        actor_system = restore_checkpoint(checkpoint, replication_config(config, run_dir, plot), event_loop, seed=seed)
+    else:
+        actor_system = build_actor_system(replication_config(config, run_dir, plot), event_loop, seed=seed)
+    asyncio.run(actor_system.run())
+
+    summary: Summary = {"events": event_loop.event_count, "end_time": event_loop.current_time}
+    for actor in actor_system.list_actors():
+        if isinstance(actor, StatsActor):
+            summary.update({f"{actor.id}.{name}": value for name, value in actor.summary().items()})
+    return summary
+
+
+class ReplicationResults:
+    def __init__(self, seeds: List[int], summaries: List[Summary]) -> None:
+        self.seeds = seeds
+        self.summaries = summaries
+
+    def values(self, name: str) -> List[float]:
+        return [summary[name] for summary in self.summaries if name in summary]
+
+    def confidence_intervals(self, level: float = 0.95) -> Dict[str, ConfidenceInterval]:
+        """
+        Mean and confidence interval half width over the replications, for every summary statistic.
+        """
+        names = dict.fromkeys(name for summary in self.summaries for name in summary)
+        return {name: confidence_interval(self.values(name), level) for name in names}
+
+
+def run_replications(
+    config: Dict[str, Any],
+    seeds: Iterable[int],
+    output_dir: str,
+    max_workers: Optional[int] = None,
+    plot: bool = False,
+    log_level: Optional[str] = "WARNING",
+    checkpoint: Optional[Checkpoint] = None,
+) -> ReplicationResults:
+    """
+    Run one replication per seed in a process pool.
+
+    Args:
+        config (Dict[str, Any]): The topology configuration (see topology.py)
+        seeds (Iterable[int]): One master seed per replication
+        output_dir (str): Parent directory of the run directories
+        max_workers (int): Number of worker processes. Defaults to the number of CPUs.
+        plot (bool): Plot the queue depths of every replication
+        log_level (str): Log level in the worker processes
+        checkpoint (Checkpoint): Start every replication from this checkpoint (see checkpoint.py), e.g. after a
+            warm-up period that then runs only once
+    """
+    seeds = list(seeds)
+    if len(set(seeds)) != len(seeds):
+        raise ValueError("Replication seeds must be unique")
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=configure_logging, initargs=(log_level,)) as pool:
+        futures = [pool.submit(run_replication, config, seed, output_dir, plot, checkpoint) for seed in seeds]
+        summaries = [future.result() for future in futures]
+    return ReplicationResults(seeds, summaries)
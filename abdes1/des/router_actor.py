@@ -0,0 +1,153 @@
+"""
+router_actor.py
+
+Provides an implementation of a router: it sends every entity it receives on to one of its destinations, at once.
+Routers connect queues, servers and stations into open and closed queueing networks (e.g. Jackson networks); a
+server or a station sends its departures to a router with its destination setting.
+
+Policies:
+- "probabilistic": destination i with probability probabilities[i], drawn in O(1) with an alias table (see
+  AliasTable in utils/distributions.py). If the probabilities add up to less than 1, the entity leaves the
+  network with the remaining probability.
+- "round-robin": the destinations in turn
+- "jsq": join the shortest queue, the destination with the fewest entities in it (waiting or in service)
+- "least-loaded": the destination with the fewest entities per server (see capacities)
+
+jsq and least-loaded keep the loads in an indexed heap (see utils/indexed_heap.py): O(1) to find the destination,
+O(log n) to update a load. The router counts the entities it sent to a destination and the departures the
+destination records ("sojourn-time" metric, see QueueActor and StationActor), so it must be the only router that
+feeds its destinations, and run in the same process: use the sequential or the conservative kernel.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, TYPE_CHECKING
+
+from abdes1.core import ActorSystem, Address, Event, MetricRecord
+from abdes1.actors import Message
+from abdes1.des import DE_Actor
+from abdes1.utils.indexed_heap import IndexedHeap
+
+if TYPE_CHECKING:
+    from abdes1.utils.distributions import AliasTable
+
+POLICIES = ("probabilistic", "round-robin", "jsq", "least-loaded")
+
+
+class RouterActor(DE_Actor):
+    state_fields = ("choice", "turn", "loads", "counts")
+
+    def __init__(
+        self,
+        id: str,
+        destinations: List[str],
+        entity_name: str,
+        actor_system: ActorSystem,
+        policy: str = "probabilistic",
+        probabilities: Optional[List[float]] = None,
+        capacities: Optional[List[float]] = None,
+    ) -> None:
+        """
+        Args:
+            destinations (List[str]): Ids of the actors the entities are sent to
+            policy (str): One of POLICIES
+            probabilities (List[float]): Routing probabilities of the probabilistic policy. Defaults to uniform.
+            capacities (List[float]): Servers per destination for least-loaded. Defaults to the number of servers
+                of the destination actor (e.g. a StationActor), else 1.
+        """
+        super().__init__(id, actor_system)
+        if not destinations:
+            raise ValueError(f"Router '{id}' needs at least one destination")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown routing policy: {policy}. Valid policies are: {', '.join(POLICIES)}")
+        if probabilities is not None and (policy != "probabilistic" or len(probabilities) != len(destinations)):
+            raise ValueError("Routing probabilities need the probabilistic policy and one probability per destination")
+        if capacities is not None and (policy != "least-loaded" or len(capacities) != len(destinations)):
+            raise ValueError("Capacities need the least-loaded policy and one capacity per destination")
+        self.id = id
+        self.destinations = destinations
+        self.entity_name = entity_name
+        self.policy = policy
+        self.capacities = capacities
+        self.destination_addresses: List[Optional[Address]] = [None] * len(destinations)  # resolved in resolve_references()
+
+        self.choice: Optional[AliasTable] = None
+        self.turn = 0
+        self.loads: Optional[IndexedHeap] = None
+        self.counts = [0] * len(destinations)  # entities in every destination, for jsq and least-loaded
+        if policy == "probabilistic":
+            from abdes1.utils.distributions import AliasTable
+
+            weights = list(probabilities) if probabilities is not None else [1.0 / len(destinations)] * len(destinations)
+            leave = 1.0 - sum(weights)
+            if leave < -1e-9:
+                raise ValueError(f"Routing probabilities add up to more than 1: {sum(weights)}")
+            if leave > 1e-9:
+                weights.append(leave)  # the last outcome leaves the network
+            self.choice = AliasTable(actor_system.random_streams.stream(id), weights)
+        elif policy in ("jsq", "least-loaded"):
+            self.loads = IndexedHeap([0.0] * len(destinations))
+            self._index = {destination: i for i, destination in enumerate(destinations)}
+            actor_system.metrics.subscribe("sojourn-time", self.on_departure)
+        self.register_handler(entity_name, self.on_entity)
+
+    def resolve_references(self) -> None:
+        self.destination_addresses = [self.actor_system.resolve(destination) for destination in self.destinations]
+        if self.policy == "least-loaded" and self.capacities is None:
+            self.capacities = [float(getattr(self.actor_system.find_actor(destination), "servers", 1)) for destination in self.destinations]
+
+    def peers(self) -> List[str]:
+        return list(self.destinations)
+
+    async def run(self) -> None:
+        await super().run()
+
+    # --- Message handlers
+
+    # Registered for the configured entity name in __init__
+    async def on_entity(self, message: Message) -> None:
+        i = self._route()
+        if i == len(self.destinations):
+            self.logger.debug(f"{self.entity_name.capitalize()} '{message.content}' leaves the network")
+            return
+        if self.loads is not None:
+            self.counts[i] += 1
+            self._update_load(i)
+        forward = Message(
+            type=self.entity_name,
+            from_id=self.id,
+            to_id=self.destinations[i],
+            content=message.content,
+            from_address=self.address,
+            to_address=self.destination_addresses[i],
+        )
+        self.actor_system.schedule_event(Event(time=message.time, message=forward))
+
+    # --- Metric subscribers
+
+    def on_departure(self, record: MetricRecord) -> None:
+        i = self._index.get(record.source)
+        if i is not None and self.counts[i] > 0:
+            self.counts[i] -= 1
+            self._update_load(i)
+
+    # --- Internal stuff
+
+    def _route(self) -> int:
+        """
+        Index of the destination of the next entity, len(destinations) if it leaves the network.
+        """
+        if self.choice is not None:
+            return int(self.choice.next())
+        if self.loads is not None:
+            return self.loads.minimum()
+        i = self.turn
+        self.turn = (i + 1) % len(self.destinations)
+        return i
+
+    def _update_load(self, i: int) -> None:
+        assert self.loads is not None
+        if self.policy == "least-loaded":
+            assert self.capacities is not None
+            self.loads.update(i, self.counts[i] / self.capacities[i])
+        else:
+            self.loads.update(i, self.counts[i])
@@ -9,21 +9,16 @@ A server actor is an actor that behaves like a service:
 - it indicates to the queue that it is ready to work on the next task
 
 In an M/M/1 queueing system, there is only one server.
+
+With a destination, e.g. a router (see router_actor.py), the served entity is sent on to it when its service is
+done. Without one, the entity leaves the system.
 """
-import random
-from typing import TypedDict
-from math import log
+from typing import Any, Dict, List, Optional, TypedDict
 
-from abdes1.core import ActorSystem, Event
+from abdes1.core import ActorSystem, Address, Event
 from abdes1.actors import Message
 from abdes1.des import DE_Actor
 
-r = random.Random(222)
-
-
-def next_exponential(rate: float) -> float:
-    return float(-1 / rate * (log(1.0 - r.random())))
-
 
 class ServerActorArgs(TypedDict):
     id: str
@@ -31,46 +26,70 @@ class ServerActorArgs(TypedDict):
 
 
 class ServerActor(DE_Actor):
+    state_fields = ("service_time",)
+
     def __init__(
         self,
         id: str,
         service_rate: float,
         entity_name: str,
         actor_system: ActorSystem,
+        service_time: Optional[Dict[str, Any]] = None,
+        min_service_time: float = 0.0,
+        destination: Optional[str] = None,
     ) -> None:
+        """
+        Args:
+            service_time (Dict[str, Any]): Distribution of the service time (see utils/distributions.py).
+                Defaults to exponential with service_rate.
+            min_service_time (float): Constant part of every service time (e.g. a setup time), added to the draw.
+                It is the lookahead of the server for the parallel kernel.
+            destination (str): Id of the actor the served entities are sent to, e.g. a router
+        """
+        from abdes1.utils.distributions import create_distribution
+
         super().__init__(id, actor_system)
         self.servce_rate = service_rate
+        self.service_time = create_distribution(
+            service_time if service_time is not None else {"type": "exponential", "rate": service_rate},
+            actor_system.random_streams.stream(id),
+        )
+        if min_service_time < 0:
+            raise ValueError(f"min_service_time must be >= 0, got {min_service_time}")
+        self.min_service_time = min_service_time
         self.entity_name = entity_name
         self.id = id
+        self.destination = destination
+        self.destination_address: Optional[Address] = None  # resolved in resolve_references()
+        self.register_handler(entity_name, self.on_entity)
 
-    async def run(self) -> None:
-        await super().run()
+    def resolve_references(self) -> None:
+        if self.destination is not None:
+            self.destination_address = self.actor_system.resolve(self.destination)
 
-    # --- Override Actor medhods
+    def peers(self) -> List[str]:
+        return [self.destination] if self.destination is not None else []
 
-    # A message is sent to this actor
-    async def receive(self, message: Message) -> None:
-        # TODO Validate message format
-        # TODO Validate sender?
-        # Validate message is for this actor
+    @property
+    def lookahead(self) -> float:
+        return self.min_service_time + self.service_time.minimum
 
-        if message.type == self.entity_name:
-            self.logger.debug(
-                f"Message received from '{message.from_id}': {self.entity_name.capitalize} '{message.content}' ready to be served!",
-            )
-        else:
-            raise Exception(
-                f"Invalid message type: {message.type}. Valid message types are: 'arrival', 'server-ready'",
-            )
+    async def run(self) -> None:
+        await super().run()
 
-        await super().receive(message)
+    # --- Message handlers
 
     # Entity arrives
     # Server processes entity
     # When done, server schedules an event with a message "server-ready" to actor 'queue'
-    async def process_message(self, message: Message) -> None:
-        # Calculate random service time from service rate
-        service_time = next_exponential(self.servce_rate)
+    # Registered for the configured entity name in __init__
+    async def on_entity(self, message: Message) -> None:
+        self.logger.debug(
+            f"Message received from '{message.from_id}': {self.entity_name.capitalize} '{message.content}' ready to be served!",
+        )
+
+        # Draw a random service time
+        service_time = self.min_service_time + self.service_time.next()
 
         self.logger.debug(
             f"{self.entity_name.capitalize} {message.content} service time: {service_time:.2f}",
@@ -86,10 +105,29 @@ class ServerActor(DE_Actor):
         # (Actually, this is a future event because all this happens instantly in the server)
         event = Event(
             time=future_event_time,
-            message=Message(type="server-ready", from_id=self.id, to_id=message.from_id, content=message.content),  # TODO: Should the server be configured with the queue id?
+            # TODO: Should the server be configured with the queue id?
+            message=Message(
+                type="server-ready",
+                from_id=self.id,
+                to_id=message.from_id,
+                content=message.content,
+                from_address=self.address,
+                to_address=message.from_address,
+            ),
         )
 
         self.actor_system.schedule_event(event)
-        message.processed = True
+
+        if self.destination is not None:
+            # After the "server-ready": the queue takes its next entity first, e.g. before a feedback arrival
+            departure = Message(
+                type=self.entity_name,
+                from_id=self.id,
+                to_id=self.destination,
+                content=message.content,
+                from_address=self.address,
+                to_address=self.destination_address,
+            )
+            self.actor_system.schedule_event(Event(time=future_event_time, message=departure))
 
     # --- Internal stuff
@@ -0,0 +1,144 @@
+"""
+station_actor.py
+
+Provides an implementation of a multi-server station: c identical servers with one shared waiting line (M/M/c,
+M/G/c with a service time distribution).
+
+A station is a single actor, whatever the number of servers:
+- the waiting line is a queue discipline (see queue_disciplines.py), FIFO by default
+- the idle servers are a stack of server indices: an arrival takes one in O(1), a server that finds the line
+  empty pushes itself back in O(1)
+- a service completion is an event the station schedules for itself, "service-complete", with the index of the
+  server as content. The server takes the next entity off the line at once, there is no "server-ready" round trip.
+
+With a destination, e.g. a router (see router_actor.py), the served entities are sent on to it. Without one,
+they leave the system.
+
+The station records the same metrics as a queue actor: "queue-depth", "wait-time", "sojourn-time", and
+"server-busy" as the fraction of busy servers, so the utilization of the stats actor is the station utilization.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from abdes1.core import ActorSystem, Address, Event
+from abdes1.actors import Message, handler
+from abdes1.des import DE_Actor
+from abdes1.des.queue_actor import QueueType
+from abdes1.des.queue_disciplines import QueueDiscipline, create_discipline
+
+
+class StationActor(DE_Actor):
+    state_fields = ("queue", "idle", "in_service", "busy", "service_time")
+    own_streams = ("queue",)
+
+    def __init__(
+        self,
+        id: str,
+        servers: int,
+        service_rate: float,
+        entity_name: str,
+        actor_system: ActorSystem,
+        type: QueueType = QueueType.FIFO,
+        service_time: Optional[Dict[str, Any]] = None,
+        min_service_time: float = 0.0,
+        destination: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            servers (int): Number of servers, c
+            service_rate (float): Service rate of one server
+            type (QueueType): Discipline of the waiting line, e.g. "FIFO"
+            service_time (Dict[str, Any]): Distribution of the service time (see utils/distributions.py).
+                Defaults to exponential with service_rate.
+            min_service_time (float): Constant part of every service time, added to the draw
+            destination (str): Id of the actor the served entities are sent to, e.g. a router
+        """
+        from abdes1.utils.distributions import create_distribution
+
+        super().__init__(id, actor_system)
+        if servers < 1:
+            raise ValueError(f"A station needs at least one server, got {servers}")
+        if min_service_time < 0:
+            raise ValueError(f"min_service_time must be >= 0, got {min_service_time}")
+        self.id = id
+        self.servers = servers
+        self.entity_name = entity_name
+        self.type = QueueType(type)
+        self.queue: QueueDiscipline = create_discipline(self.type.value, actor_system.random_streams.stream(self.stream_name("queue")))
+        self.service_time = create_distribution(
+            service_time if service_time is not None else {"type": "exponential", "rate": service_rate},
+            actor_system.random_streams.stream(id),
+        )
+        self.min_service_time = min_service_time
+        self.idle: List[int] = list(range(servers - 1, -1, -1))  # a stack: server 0 is taken first
+        self.in_service: List[Optional[Tuple[float, Any]]] = [None] * servers  # (arrival time, entity) per server
+        self.busy = 0
+        self.destination = destination
+        self.destination_address: Optional[Address] = None  # resolved in resolve_references()
+        self.register_handler(entity_name, self.on_entity)
+
+    def resolve_references(self) -> None:
+        if self.destination is not None:
+            self.destination_address = self.actor_system.resolve(self.destination)
+
+    def peers(self) -> List[str]:
+        return [self.destination] if self.destination is not None else []
+
+    @property
+    def lookahead(self) -> float:
+        # Completions and departures are a service time ahead
+        return self.min_service_time + self.service_time.minimum
+
+    async def run(self) -> None:
+        await super().run()
+
+    # --- Message handlers
+
+    # Registered for the configured entity name in __init__
+    async def on_entity(self, message: Message) -> None:
+        assert message.time is not None
+        if self.idle:
+            self.busy += 1
+            self.actor_system.metrics.record("server-busy", self.busy / self.servers, self.id)
+            self._start_service(self.idle.pop(), message.time, message.content)
+        else:
+            self.queue.push(message.time, message.content)
+        self.actor_system.metrics.record("queue-depth", len(self.queue), self.id)
+
+    @handler("service-complete")
+    async def on_service_complete(self, message: Message) -> None:
+        server: int = message.content
+        done = self.in_service[server]
+        assert done is not None and message.time is not None
+        self.actor_system.metrics.record("sojourn-time", message.time - done[0], self.id)
+
+        result = self.queue.pop(message.time)
+        if result is None:
+            self.in_service[server] = None
+            self.idle.append(server)
+            self.busy -= 1
+            self.actor_system.metrics.record("server-busy", self.busy / self.servers, self.id)
+        else:
+            # The server stays busy
+            self._start_service(server, *result)
+        self.actor_system.metrics.record("queue-depth", len(self.queue), self.id)
+
+    # --- Internal stuff
+
+    def _start_service(self, server: int, arrival_time: float, entity: Any) -> None:
+        now = self.actor_system.event_loop.current_time
+        self.actor_system.metrics.record("wait-time", now - arrival_time, self.id)
+        self.in_service[server] = (arrival_time, entity)
+        done = now + self.min_service_time + self.service_time.next()
+        message = Message(type="service-complete", from_id=self.id, to_id=self.id, content=server, from_address=self.address, to_address=self.address)
+        self.actor_system.schedule_event(Event(time=done, message=message))
+        if self.destination is not None:
+            # Scheduled with the completion, a service time ahead (see lookahead), and dispatched after it
+            departure = Message(
+                type=self.entity_name,
+                from_id=self.id,
+                to_id=self.destination,
+                content=entity,
+                from_address=self.address,
+                to_address=self.destination_address,
+            )
+            self.actor_system.schedule_event(Event(time=done, message=departure))
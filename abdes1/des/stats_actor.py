@@ -5,7 +5,7 @@ Provides an implementation of a statistics actor.
 
 - collect metrics from the simulation
 - calculate statistics
-- plot the results
+- plot the results, downsampled, in a worker process (see plotting.py)
 
 Depending on the message type, it will perform certain tasks?
 - "start-simulation"
@@ -13,105 +13,353 @@ Depending on the message type, it will perform certain tasks?
 - "customer-queued"
 - "customer-dequeued"
 - "server-ready"
-- "queue-depth"
 - ?
 
+Metrics such as "queue-depth" are not messages: the stats actor subscribes to them on the metrics channel
+of the actor system (see abdes1/core/metrics.py).
+
+All statistics are streaming (see abdes1/utils/statistics.py): the memory of the stats actor does not grow
+with the length of the run.
+- "queue-depth": time-weighted mean and maximum
+- "server-busy": utilization, the time-weighted mean per server
+- "wait-time" and "sojourn-time": mean, standard deviation, maximum and P-square quantile estimates
+
+The queue depths are written to the output as they come in:
+- to a columnar store (see abdes1/utils/column_store.py): typed arrays flushed in chunks, which plotting and
+  analysis map into memory. This is the format of any output path that does not end in ".csv".
+- to a CSV file, if the output path ends in ".csv"
+read_queue_depths reads either one.
+
+Steady state (optional): for one metric, e.g. the wait time, the stats actor keeps batch means of 5
+observations (coalesced to stay bounded), detects the end of the warm-up period with MSER-5 and computes a
+batch means confidence interval for the steady state mean without the warm-up. With a target relative half
+width, it stops the simulation as soon as the interval is that narrow, and saves the stats. Configure it with
+
+    "steady_state": {"metric": "wait-time", "relative_half_width": 0.05, "level": 0.95}
 """
 # import random
-from typing import List
-import logging
+from __future__ import annotations
+import copy
+import os
+from multiprocessing.process import BaseProcess
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Optional, TextIO, Tuple
+
+from abdes1.core import ActorSystem, MetricRecord  # , Event
+from abdes1.actors import Actor, Message, handler
+from abdes1.utils.statistics import BatchMeans, ConfidenceInterval, P2Quantile, RunningStatistics, TimeWeightedStatistics, batch_means_interval, mser
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from abdes1.utils.column_store import ColumnWriter
+
+QUANTILES = (0.5, 0.9, 0.99)
+FILE_BUFFER_SIZE = 1 << 20
+
+
+def read_queue_depths(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Times and queue depths written by a stats actor. From a columnar store, the arrays map the files without a copy.
+    """
+    import numpy as np
+
+    from abdes1.utils.column_store import is_column_store, read_columns
+
+    if is_column_store(path):
+        columns = read_columns(path, ["time", "queue_depth"])
+        return columns["time"], columns["queue_depth"]
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    return data[:, 0], data[:, 1].astype(np.int64)
+
+
+class _CsvOutput:
+    """
+    Queue depths as CSV lines, through a large file buffer.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: Optional[TextIO] = None
+        self._started = False
+
+    def write(self, time: float, depth: int) -> None:
+        file = self._file if self._file is not None else self._open()
+        file.write(f"{time},{depth}\n")
+
+    def close(self) -> None:
+        file = self._file if self._file is not None else self._open()
+        file.close()
+        self._file = None
+
+    def size(self) -> int:
+        if self._file is not None:
+            self._file.flush()
+        return os.path.getsize(self.path) if self._started and os.path.exists(self.path) else 0
+
+    def resume(self, size: int) -> None:
+        if size and os.path.exists(self.path) and os.path.getsize(self.path) >= size:
+            with open(self.path, "r+") as file:
+                file.truncate(size)
+            self._started = True
+
+    def _open(self) -> TextIO:
+        if self._started:
+            self._file = open(self.path, "a", buffering=FILE_BUFFER_SIZE)
+        else:
+            self._file = open(self.path, "w", buffering=FILE_BUFFER_SIZE)
+            self._file.write("time,queue_depth\n")
+            self._started = True
+        return self._file
+
+
+class _ColumnOutput:
+    """
+    Queue depths in a columnar store, created on the first write.
+    """
+
+    COLUMNS = {"time": "<f8", "queue_depth": "<i8"}
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._writer: Optional[ColumnWriter] = None
+        self._resume_rows = 0
+
+    def write(self, time: float, depth: int) -> None:
+        writer = self._writer if self._writer is not None else self._open()
+        writer.append(time, depth)
 
-# Don't let matplotlib use my logger but instead reate a new logger object for matplotlib
-mpl_logger = logging.getLogger("matplotlib")
-mpl_logger.setLevel(logging.WARNING)
-mpl_handler = logging.StreamHandler()
-mpl_formatter = logging.Formatter("%(levelname)s: %(message)s")
-mpl_handler.setFormatter(mpl_formatter)
-mpl_logger.addHandler(mpl_handler)
-import matplotlib.pyplot as plt
+    def close(self) -> None:
+        writer = self._writer if self._writer is not None else self._open()
+        writer.close()
+        self._writer = None
+        self._resume_rows = writer.rows
 
-from abdes1.core import ActorSystem  # , Event
-from abdes1.actors import Actor, Message
+    def size(self) -> int:
+        if self._writer is None:
+            return self._resume_rows
+        self._writer.flush()
+        return self._writer.rows
+
+    def resume(self, size: int) -> None:
+        self._resume_rows = size
+
+    def _open(self) -> ColumnWriter:
+        from abdes1.utils.column_store import ColumnWriter
+
+        self._writer = ColumnWriter(self.path, self.COLUMNS, resume_rows=self._resume_rows)
+        return self._writer
+
+
+class DurationStatistics:
+    """
+    Streaming statistics of a duration, e.g. the wait time: mean, standard deviation, extremes and quantiles.
+    """
+
+    def __init__(self) -> None:
+        self.running = RunningStatistics()
+        self.quantiles = [P2Quantile(p) for p in QUANTILES]
+
+    def __copy__(self) -> "DurationStatistics":
+        clone = DurationStatistics.__new__(DurationStatistics)
+        clone.running = copy.copy(self.running)
+        clone.quantiles = [copy.copy(quantile) for quantile in self.quantiles]
+        return clone
+
+    def add(self, value: float) -> None:
+        self.running.add(value)
+        for quantile in self.quantiles:
+            quantile.add(value)
+
+    def summary(self, name: str) -> Dict[str, float]:
+        running = self.running
+        if running.count == 0:
+            return {}
+        summary = {f"mean_{name}": running.mean, f"std_{name}": running.std, f"max_{name}": running.maximum}
+        summary.update({f"p{round(quantile.p * 100)}_{name}": quantile.value for quantile in self.quantiles})
+        return summary
+
+
+class SteadyState(NamedTuple):
+    warmup: int  # observations discarded as warm-up
+    interval: ConfidenceInterval  # of the steady state mean
 
 
 class StatsActor(Actor):
+    state_fields = ("queue_depth", "wait_time", "sojourn_time", "busy", "batch_means")
+
     def __init__(
         self,
         id: str,
         output_path: str,
         actor_system: ActorSystem,
+        plot: bool = True,
+        steady_state: Optional[Dict[str, Any]] = None,
     ) -> None:
+        """
+        Args:
+            output_path (str): Columnar store (a directory) for the queue depths, or a CSV file if it ends in ".csv".
+                The plot is written next to it as queue_depth_<name>.png
+            plot (bool): Plot the queue depths when the stats are saved, in a worker process
+            steady_state (Dict[str, Any]): Warm-up detection and sequential stopping:
+                metric (str): Metric to analyze, default "wait-time"
+                relative_half_width (float): Stop once the half width of the interval is at most this fraction of
+                    the mean. Without it, the run is not stopped early.
+                level (float): Confidence level, default 0.95
+                batches (int): Number of batches of the confidence interval, default 20
+                check_every (int): Observations between two checks, default 1000
+        """
         super().__init__(id, actor_system)
         self.id = id
-        self.queue_depths: List[int] = []
-        self.arrival_times: List[float] = []
-        self.service_times: List[float] = []
-        self.wait_times: List[float] = []
+        # Streaming statistics only: memory does not grow with the length of the run
+        self.queue_depth = TimeWeightedStatistics()
+        self.wait_time = DurationStatistics()
+        self.sojourn_time = DurationStatistics()
+        self.busy: Dict[str, TimeWeightedStatistics] = {}  # per server
+        self.steady_state = dict(steady_state) if steady_state is not None else None
+        self.batch_means: Optional[BatchMeans] = None
         self.output_path = output_path
+        self.plot = plot
+        self.plot_process: Optional[BaseProcess] = None
+        # The queue depths go straight to the output as they come in
+        self._output = _CsvOutput(output_path) if output_path.endswith(".csv") else _ColumnOutput(output_path)
+        # Metrics come in on the side-band channel, not as messages
+        actor_system.metrics.subscribe("queue-depth", self.on_queue_depth)
+        actor_system.metrics.subscribe("wait-time", self.on_wait_time)
+        actor_system.metrics.subscribe("sojourn-time", self.on_sojourn_time)
+        actor_system.metrics.subscribe("server-busy", self.on_server_busy)
+        if self.steady_state is not None:
+            unknown = set(self.steady_state) - {"metric", "relative_half_width", "level", "batches", "check_every"}
+            if unknown:
+                raise ValueError(f"Unknown steady_state settings: {', '.join(sorted(unknown))}")
+            self.steady_state.setdefault("metric", "wait-time")
+            self.batch_means = BatchMeans()
+            actor_system.metrics.subscribe(self.steady_state["metric"], self.on_steady_state_metric)
 
     async def run(self) -> None:
         await super().run()
 
-    # --- Override Actor medhods
-
-    # A message is sent to this actor
-    async def receive(self, message: Message) -> None:
-        # TODO Validate message type and format
-        # TODO Validate sender?
-        # Validate message is for this actor?
-
-        await super().receive(message)
-
-    # Entity arrives
-    # Server processes entity
-    # When done, server sends message to queue "server-ready"
-    async def process_message(self, message: Message) -> None:
-        # Aggregate metrics
-        if message.type == "queue-depth":
-            self.logger.debug(
-                f"Metric received from '{message.from_id}': Queue depth updated at {message.time}!",
-            )
-            queue_depth = int(message.content if message.content is not None else 0)
-            self.queue_depths.append(queue_depth)
-            self.arrival_times.append(message.time if message.time is not None else 0.0)
-
-        if message.type == "save-stats":
+    # --- Metric subscribers
+
+    def on_queue_depth(self, record: MetricRecord) -> None:
+        depth = int(record.value)
+        self.queue_depth.update(record.time, depth)
+        self._output.write(record.time, depth)
+
+    def on_wait_time(self, record: MetricRecord) -> None:
+        self.wait_time.add(record.value)
+
+    def on_sojourn_time(self, record: MetricRecord) -> None:
+        self.sojourn_time.add(record.value)
+
+    def on_server_busy(self, record: MetricRecord) -> None:
+        busy = self.busy.get(record.source)
+        if busy is None:
+            busy = self.busy[record.source] = TimeWeightedStatistics()
+        busy.update(record.time, record.value)
+
+    def on_steady_state_metric(self, record: MetricRecord) -> None:
+        batch_means = self.batch_means
+        assert batch_means is not None and self.steady_state is not None
+        batch_means.add(record.value)
+        if self.steady_state.get("relative_half_width") is None or batch_means.count % self.steady_state.get("check_every", 1000):
+            return
+        result = self.steady_state_estimate()
+        if result is None:
+            return
+        interval = result.interval
+        if interval.half_width <= self.steady_state["relative_half_width"] * abs(interval.mean):
+            self.logger.info(f"Steady state mean {interval.mean:.4f} +/- {interval.half_width:.4f} after {batch_means.count} observations: stopping")
+            self.actor_system.event_loop.stop()
             self.save_stats()
+            if self.plot:
+                self.plot_stats()
+
+    # --- Message handlers
+
+    @handler("save-stats")
+    async def on_save_stats(self, message: Message) -> None:
+        self.save_stats()
+        if self.plot:
             self.plot_stats()
 
-        # Calculate statistics
+    # --- Results
 
-        # Plot results
+    def steady_state_estimate(self) -> Optional[SteadyState]:
+        """
+        Warm-up and steady state confidence interval of the steady state metric, or None while the warm-up does not
+        seem to be over (MSER truncates half of the batches) or there are too few batches.
+        """
+        if self.batch_means is None or self.steady_state is None:
+            return None
+        means = self.batch_means.means
+        batches = self.steady_state.get("batches", 20)
+        if len(means) < 2 * batches:
+            return None
+        truncate = mser(means)
+        if truncate >= len(means) // 2:
+            return None
+        interval = batch_means_interval(means[truncate:], batches, self.steady_state.get("level", 0.95))
+        return SteadyState(truncate * self.batch_means.batch_size, interval)
 
-        # self.actor_system.schedule_event_from_now(event)
+    def summary(self) -> Dict[str, float]:
+        """
+        Summary statistics of the run, e.g. to compare replications.
+        """
+        queue_depth = self.queue_depth
+        if queue_depth.count == 0:
+            return {"observations": 0}
+        # The queue depth is a step function of time: weighed with the time until the next change
+        summary: Dict[str, float] = {
+            "observations": queue_depth.count,
+            "mean_queue_depth": queue_depth.mean(),
+            "max_queue_depth": queue_depth.maximum,
+            "last_time": queue_depth.last_time,  # type: ignore
+        }
+        if self.busy:
+            # Up to the last queue depth change, like the mean queue depth
+            summary["utilization"] = sum(busy.mean(until=queue_depth.last_time) for busy in self.busy.values()) / len(self.busy)
+        summary.update(self.wait_time.summary("wait_time"))
+        summary.update(self.sojourn_time.summary("sojourn_time"))
+        if self.steady_state is not None and (estimate := self.steady_state_estimate()) is not None:
+            name = self.steady_state["metric"].replace("-", "_")
+            summary["warmup_observations"] = estimate.warmup
+            summary[f"steady_mean_{name}"] = estimate.interval.mean
+            summary[f"steady_half_width_{name}"] = estimate.interval.half_width
+        return summary
+
+    # --- Checkpoints
+
+    def save_state(self) -> Dict[str, Any]:
+        state = super().save_state()
+        busy = state["busy"] = dict(self.busy)
+        for source, statistics in busy.items():
+            busy[source] = copy.copy(statistics)
+        # The output so far (bytes of the CSV file, rows of the store) belongs to the checkpoint
+        state["output_size"] = self._output.size()
+        return state
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        output_size = state.pop("output_size")
+        super().restore_state(state)
+        # Continue the output of the checkpointed run if it is there, e.g. when restored with the same configuration.
+        # Otherwise the new output starts at the checkpoint.
+        self._output.resume(output_size)
 
     # --- Internal stuff
 
     def save_stats(self) -> None:
-        # Write the arrival times and queue depths to a file
-        with open("mm1_actors.csv", "w") as file:
-            file.write("time,queue_depth\n")
-            for i in range(len(self.arrival_times)):
-                file.write(f"{self.arrival_times[i]},{self.queue_depths[i]}\n")
-
-    def plot_stats(self) -> None:
-        with open("mm1_actors.csv", "r") as file:
-            lines = file.readlines()[1:]  # Skip the header line
-            data = [line.strip().split(",") for line in lines]
-            times = [float(row[0]) for row in data]
-            depths = [int(row[1]) for row in data]
-
-        plt.title("M/M/1 Queue Simulation (Actors)")  # type: ignore
-        plt.xlabel("Time (seconds)")  # type: ignore
-        plt.ylabel("Queue Depth")  # type: ignore
-        plt.grid(True)  # type: ignore
-        plt.tight_layout()  # type: ignore
-        plt.plot(  # type: ignore
-            times,
-            depths,
-            marker=None,
-            linestyle="-",
-            linewidth=0.5,
-            color="black",
-        )
-        plt.savefig("queue_depth_mm1_actors.png")  # type: ignore
+        # The queue depths are written as they come in: complete the output
+        self._output.close()
+
+    def plot_stats(self, wait: bool = False) -> None:
+        """
+        Plot the queue depths in a worker process, downsampled (see abdes1/des/plotting.py).
+
+        Args:
+            wait (bool): Wait for the plot to be written
+        """
+        from abdes1.des.plotting import start_plot
+
+        self.plot_process = start_plot(self.output_path)
+        if wait:
+            self.plot_process.join()
@@ -0,0 +1,172 @@
+"""
+sweep.py
+
+Parameter sweeps with a result cache.
+
+A sweep runs a base configuration at a number of points. A point sets parameters, addressed by dotted paths into
+the configuration, e.g. {"Server.service_rate": 2.0, "DE_Arrivals.event_rate": 1.5}. Points come from a full grid
+(grid) or from a Latin hypercube design (latin_hypercube). Every point runs once per seed, as a replication
+(see replications.py), in a process pool.
+
+The summary of every run is cached on disk under a key that hashes the normalized configuration of the point,
+the seed and the abdes1 version. Runs that are in the cache are not run again, so an interrupted sweep resumes
+where it stopped and re-running an unchanged sweep only reads the cache.
+"""
+from __future__ import annotations
+import copy
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from abdes1 import __version__
+from abdes1.des.replications import Summary, run_replication
+from abdes1.utils.logger import configure_logging
+
+Point = Dict[str, Any]
+
+
+def set_path(config: Dict[str, Any], path: str, value: Any) -> None:
+    """
+    Set the value at a dotted path, e.g. "Server.service_rate". Integer segments index lists, e.g. "Stats.0.plot".
+    """
+    keys = path.split(".")
+    node: Any = config
+    for key in keys[:-1]:
+        node = node[int(key)] if isinstance(node, list) else node[key]
+    last = keys[-1]
+    if isinstance(node, list):
+        node[int(last)] = value
+    elif last not in node:
+        raise KeyError(f"Unknown configuration path: {path}")
+    else:
+        node[last] = value
+
+
+def apply_point(config: Dict[str, Any], point: Point) -> Dict[str, Any]:
+    """
+    Return a copy of the configuration with the parameters of the point set.
+    """
+    config = copy.deepcopy(config)
+    for path, value in point.items():
+        set_path(config, path, value)
+    return config
+
+
+def grid(parameters: Dict[str, Sequence[Any]]) -> List[Point]:
+    """
+    All combinations of the parameter values, e.g. grid({"Server.service_rate": [1.8, 2.0], "DE_Arrivals.event_rate": [1.0, 1.5]}).
+    """
+    paths = list(parameters)
+    return [dict(zip(paths, values)) for values in itertools.product(*(parameters[path] for path in paths))]
+
+
+def latin_hypercube(ranges: Dict[str, Tuple[float, float]], n: int, seed: Optional[int] = None) -> List[Point]:
+    """
+    n points such that the range of every parameter is split into n equal strata and every stratum holds exactly
+    one point, at a random position within the stratum.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for path, (low, high) in ranges.items():
+        strata = (rng.permutation(n) + rng.random(n)) / n
+        columns[path] = (low + strata * (high - low)).tolist()
+    return [{path: columns[path][i] for path in ranges} for i in range(n)]
+
+
+def normalize(config: Dict[str, Any]) -> str:
+    return json.dumps(config, sort_keys=True, separators=(",", ":"))
+
+
+def cache_key(config: Dict[str, Any], seed: int) -> str:
+    return hashlib.sha256(f"{normalize(config)}|{seed}|{__version__}".encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    One JSON file per run, <directory>/<key[:2]>/<key>.json, written atomically.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Summary]:
+        try:
+            with open(self.path(key), "r") as file:
+                summary: Summary = json.load(file)
+            return summary
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, summary: Summary) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(summary, file)
+        os.replace(temporary, path)
+
+
+class SweepResult(NamedTuple):
+    point: Point
+    seed: int
+    summary: Summary
+    cached: bool
+
+
+def run_sweep(
+    config: Dict[str, Any],
+    points: Iterable[Point],
+    seeds: Iterable[int],
+    output_dir: str,
+    cache_dir: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    log_level: Optional[str] = "WARNING",
+) -> List[SweepResult]:
+    """
+    Run every point with every seed, skipping the runs that are in the cache.
+
+    Args:
+        config (Dict[str, Any]): The base configuration
+        points (Iterable[Point]): The points, e.g. from grid() or latin_hypercube()
+        seeds (Iterable[int]): The seeds every point runs with
+        output_dir (str): Every run writes its files to <output_dir>/<key[:16]>/seed-<seed>/
+        cache_dir (str): Directory of the result cache. Defaults to <output_dir>/cache.
+        max_workers (int): Number of worker processes. Defaults to the number of CPUs.
+        log_level (str): Log level in the worker processes
+    Returns:
+        One result per point and seed, in the order of the points and seeds
+    """
+    seeds = list(seeds)
+    cache = ResultCache(cache_dir if cache_dir is not None else os.path.join(output_dir, "cache"))
+    runs = [(point, apply_point(config, point), seed) for point in points for seed in seeds]
+    keys = [cache_key(point_config, seed) for _, point_config, seed in runs]
+    summaries: List[Optional[Summary]] = [cache.get(key) for key in keys]
+    cached = [summary is not None for summary in summaries]
+
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    error: Optional[Exception] = None
+    if missing:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=configure_logging, initargs=(log_level,)) as pool:
+            futures = {pool.submit(run_replication, runs[i][1], runs[i][2], os.path.join(output_dir, keys[i][:16])): i for i in missing}
+            # Cache every run as soon as it is done, so an interrupted sweep keeps its finished runs. A failed run
+            # does not stop the others: the first error is raised once they are all done and cached.
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    summaries[i] = future.result()
+                except Exception as exception:
+                    error = error or exception
+                    continue
+                cache.put(keys[i], summaries[i])  # type: ignore
+    if error is not None:
+        raise error
+
+    return [SweepResult(point, seed, summary, hit) for (point, _, seed), summary, hit in zip(runs, summaries, cached)]  # type: ignore
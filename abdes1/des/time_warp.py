@@ -0,0 +1,411 @@
+"""
+time_warp.py
+
+Optimistic parallel discrete event simulation (Time Warp).
+
+The actors of a topology are partitioned over logical processes (LPs), one operating system process each, as in
+the conservative kernel (see parallel.py). Unlike the conservative kernel, an LP does not wait until an event is
+safe: it dispatches its events as fast as it can and repairs the damage when a message from another LP arrives
+in its past (a straggler). This needs no lookahead, so it also works for feedback networks where the conservative
+kernel stalls, e.g. a queue and a server with exponential service times in different LPs.
+
+State saving
+    Before an actor handles an event, the LP saves the state of the actor (Actor.mark_state). The state of
+    an actor is made of the attributes in its class attribute state_fields, e.g. the queue of a QueueActor or
+    the random stream of a ServerActor. Only the target actor of the event is saved, and incrementally where
+    it matters: a waiting line keeps an undo log of its pushes and pops (see queue_disciplines.py), so saving
+    it is a mark in the log, O(1) however long the line is, and a rollback takes back the operations since the
+    mark. The other fields are copied, as for a checkpoint: counters, the buffer position and state of a random
+    stream, and the per-server lists of a station, O(servers).
+
+Rollback and anti-messages
+    A straggler rolls the LP back: the events handled after it are undone, latest first. Undoing an event
+    restores the state of its actor, cancels the events it scheduled in the LP, drops the metrics it recorded
+    and sends an anti-message for every message it sent to another LP. The undone events go back into the
+    future event list and are handled again, after the straggler. An anti-message annihilates its message: it
+    is cancelled if it is still pending, or rolled back first if it has been handled.
+
+GVT and fossil collection
+    Every gvt_interval seconds the coordinator computes the global virtual time (GVT), the time before which
+    nothing can be rolled back anymore. The LPs stop dispatching and report the time of their next event and
+    the number of messages they sent and received, until two rounds of reports agree and every message sent
+    has been received: then no message is in flight and GVT is the smallest reported time. The LPs then throw
+    away the saved states of the events before GVT (fossil collection), which bounds their memory, and send the
+    metrics those events recorded to the coordinator. Only these committed metrics reach the stats actors.
+    The undo logs are trimmed to the oldest event that can still be undone.
+
+Event handlers must not have side effects outside the state fields of their actor, and events must not be
+cancelled (EventHandle.cancel), as cancellations are not undone. The results are the same as those of the
+sequential kernel, as long as no two events that depend on each other's order have the same time.
+"""
+from __future__ import annotations
+import asyncio
+import itertools
+import math
+import multiprocessing
+import queue
+import time as wall_time
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+from abdes1.actors import Message
+from abdes1.core import Event, MetricRecord
+from abdes1.des.des_event_loop import DE_EventLoop
+from abdes1.des.parallel import COORDINATOR, ParallelResult, build_lp_system, check_partition, replay
+from abdes1.des.remote_actor import RemoteActor
+from abdes1.des.topology import build_actor_system
+
+EventKey = Tuple[float, int, int]  # (time, priority, sequence number): the order of events in all LPs
+
+
+class _Processed:
+    """
+    An event an LP has handled and may have to undo.
+    """
+
+    __slots__ = ("key", "event", "actor", "state", "records", "messages", "scheduled", "sent")
+
+    def __init__(self, key: EventKey, event: Event, actor: Any, state: Dict[str, Any], records: int, messages: int) -> None:
+        self.key = key
+        self.event = event
+        self.actor = actor
+        self.state = state  # state of the actor before the event (Actor.mark_state)
+        self.records = records  # number of metric records before the event
+        self.messages = messages  # number of messages for the coordinator before the event
+        self.scheduled: List[Event] = []  # events scheduled in this LP
+        self.sent: List[Tuple[int, int]] = []  # (LP, sequence number) of the messages sent to other LPs
+
+
+class TW_EventLoop(DE_EventLoop):
+    def __init__(self, lp: int, lp_count: int, inboxes: List[Any], coordinator: Any, until: float, optimism: Optional[float] = None) -> None:
+        super().__init__(synchronous=True)
+        self.lp = lp
+        self.until = until
+        self.optimism = optimism
+        self.inboxes = inboxes
+        self.coordinator = coordinator
+        # Sequence numbers are unique over all LPs, so every event has the same key everywhere
+        self._sequence = itertools.count(lp, lp_count)
+        self.history: List[_Processed] = []
+        self.received: Dict[int, Event] = {}  # events from other LPs that can still be annihilated, by sequence number
+        self.records: List[MetricRecord] = []
+        self.coordinator_messages: List[Tuple[float, int, int, Message]] = []
+        self.gvt = 0.0
+        self.finished = False
+        self._current: Optional[_Processed] = None
+        # Statistics
+        self.sent_count = 0
+        self.received_count = 0
+        self.rolled_back = 0
+        self.anti_messages = 0
+
+    # --- Sending
+
+    def _push(self, event: Event) -> None:
+        message = event.message
+        to_address = message.to_address
+        target = to_address.actor if to_address is not None else self.actor_system.find_actor(message.to_id)
+        if isinstance(target, RemoteActor):
+            self._send(target, event)
+            return
+        super()._push(event)
+        if self._current is not None:
+            self._current.scheduled.append(event)
+
+    def _send(self, target: RemoteActor, event: Event) -> None:
+        assert event.time is not None
+        event.dispatched = True
+        message = event.message
+        remote_message = Message(type=message.type, content=message.content, from_id=message.from_id, to_id=message.to_id)
+        seq = next(self._sequence)
+        if target.location == COORDINATOR:
+            # Dropped on rollback, sent when committed
+            if event.time <= self.until:
+                self.coordinator_messages.append((event.time, event.priority, seq, remote_message))
+            return
+        self.sent_count += 1
+        self.inboxes[target.location].put(("event", event.time, event.priority, seq, remote_message))
+        if self._current is not None:
+            self._current.sent.append((target.location, seq))
+
+    # --- Receiving
+
+    def _receive(self, block: bool) -> None:
+        inbox = self.inboxes[self.lp]
+        try:
+            item = inbox.get() if block else inbox.get_nowait()
+            while True:
+                if item[0] == "gvt?":
+                    self._report_gvt()
+                else:
+                    self._handle(item)
+                if self.finished:
+                    return
+                item = inbox.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _handle(self, item: Tuple[Any, ...]) -> None:
+        self.received_count += 1
+        if item[0] == "event":
+            _, time, priority, seq, message = item
+            # A straggler: undo everything after it
+            self._rollback((time, priority, seq))
+            event = Event(time=time, message=message, priority=priority)
+            self.received[seq] = event
+            self.future_event_list.push((time, priority, seq, event))
+        else:
+            _, seq = item
+            event = self.received.pop(seq)
+            if event.dispatched:
+                self._rollback((event.time, event.priority, seq))  # type: ignore
+            self.future_event_list.cancel(event)
+
+    # --- GVT
+
+    def _next_time(self) -> float:
+        if not self.future_event_list:
+            return math.inf
+        time = self.future_event_list.peek()[0]
+        return time if time <= self.until else math.inf
+
+    def _report_gvt(self) -> None:
+        """
+        Stop dispatching and report until the coordinator has the GVT. Messages that come in meanwhile are handled,
+        they may roll the LP back, but no event is dispatched.
+        """
+        inbox = self.inboxes[self.lp]
+        while True:
+            self.coordinator.put(("report", self.lp, self.sent_count, self.received_count, self._next_time()))
+            while True:
+                item = inbox.get()
+                if item[0] == "gvt?":
+                    break
+                if item[0] == "gvt":
+                    self._fossil_collect(item[1])
+                    return
+                self._handle(item)
+
+    def _fossil_collect(self, gvt: float) -> None:
+        """
+        Forget the events before GVT, they are never undone, and send their metrics and messages to the coordinator.
+        """
+        self.gvt = gvt
+        history = self.history
+        committed = 0
+        while committed < len(history) and history[committed].key[0] < gvt:
+            self.received.pop(history[committed].key[2], None)
+            committed += 1
+        del history[:committed]
+
+        # The undo logs only need to go back to the oldest event of their actor that can still be undone
+        oldest: Dict[str, _Processed] = {}
+        for processed in history:
+            oldest.setdefault(processed.actor.id, processed)
+        for actor in self.actor_system.list_actors():
+            processed = oldest.get(actor.id)
+            actor.forget_state(processed.state if processed is not None else None)
+
+        records = history[0].records if history else len(self.records)
+        messages = history[0].messages if history else len(self.coordinator_messages)
+        for processed in history:
+            processed.records -= records
+            processed.messages -= messages
+        self.coordinator.put(("commit", self.lp, self.records[:records], self.coordinator_messages[:messages]))
+        del self.records[:records]
+        del self.coordinator_messages[:messages]
+        # Events after the horizon do not count, so GVT is infinite once all events up to the horizon are committed
+        if math.isinf(gvt):
+            self.finished = True
+
+    # --- Rollback
+
+    def _rollback(self, key: EventKey) -> None:
+        """
+        Undo the events with a key >= key, latest first.
+        """
+        history = self.history
+        while history and history[-1].key >= key:
+            self._undo(history.pop())
+
+    def _undo(self, processed: _Processed) -> None:
+        self.rolled_back += 1
+        processed.actor.undo_state(processed.state)
+        del self.records[processed.records :]
+        del self.coordinator_messages[processed.messages :]
+        for event in processed.scheduled:
+            if not event.cancelled:
+                self.future_event_list.cancel(event)
+        for lp, seq in processed.sent:
+            self.anti_messages += 1
+            self.sent_count += 1
+            self.inboxes[lp].put(("anti", seq))
+
+        event = processed.event
+        event.dispatched = False
+        event.message.processed = False
+        self.event_count -= 1
+        self.future_event_list.push((*processed.key, event))
+
+    # --- Dispatching
+
+    def _runnable(self) -> bool:
+        time = self._next_time()
+        return time < math.inf and (self.optimism is None or time <= self.gvt + self.optimism)
+
+    async def _dispatch_next(self) -> None:
+        time, priority, seq, event = self.future_event_list.pop()
+        event.dispatched = True
+        self.event_count += 1
+        message = event.message
+        to_address = message.to_address
+        target_actor = to_address.actor if to_address is not None else self.actor_system.find_actor(message.to_id)
+        if target_actor is None:
+            self.logger.warning(f"Error: Actor '{message.to_id}' not found")
+            return
+
+        state = target_actor.mark_state()
+        self._current = _Processed((time, priority, seq), event, target_actor, state, len(self.records), len(self.coordinator_messages))
+        self.history.append(self._current)
+        self.current_time = time
+        message.time = time
+        try:
+            await target_actor.receive(message)
+        finally:
+            self._current = None
+
+    async def run(self) -> None:
+        self.logger.info(f"Logical process {self.lp} running optimistically until {self.until}")
+        for actor in self.actor_system.list_actors():
+            actor.start_undo_logs()
+        while not self.finished:
+            runnable = self._runnable()
+            self._receive(block=not runnable)
+            if runnable and not self.finished and self._runnable():
+                await self._dispatch_next()
+        self.logger.info(f"Logical process {self.lp} finished: {self.event_count} events, {self.rolled_back} rolled back")
+
+
+def _run_lp(
+    lp: int,
+    lp_count: int,
+    config: Dict[str, Any],
+    partition: Dict[str, int],
+    seed: Optional[int],
+    until: float,
+    optimism: Optional[float],
+    metric_names: List[str],
+    inboxes: List[Any],
+    coordinator: Any,
+) -> None:
+    try:
+        event_loop = TW_EventLoop(lp, lp_count, inboxes, coordinator, until, optimism)
+        build_lp_system(config, partition, lp, event_loop, seed, metric_names, event_loop.records)
+        asyncio.run(event_loop.run())
+        summary = {
+            "events": event_loop.event_count,
+            "rolled_back": event_loop.rolled_back,
+            "anti_messages": event_loop.anti_messages,
+            "remote_messages": event_loop.sent_count - event_loop.anti_messages,
+        }
+        coordinator.put(("done", lp, summary))
+    except BaseException:
+        coordinator.put(("error", lp, traceback.format_exc()))
+
+
+def _get(coordinator: Any, kinds: Tuple[str, ...], timeout: Optional[float]) -> Tuple[Any, ...]:
+    item = coordinator.get(timeout=timeout)
+    if item[0] == "error":
+        raise Exception(f"Logical process {item[1]} failed:\n{item[2]}")
+    if item[0] not in kinds:
+        raise Exception(f"Expected {' or '.join(kinds)} from a logical process, got '{item[0]}'")
+    return item  # type: ignore
+
+
+def _compute_gvt(inboxes: List[Any], coordinator: Any, timeout: Optional[float]) -> float:
+    """
+    Ask the LPs for reports until two rounds agree and all messages sent have been received.
+    """
+    previous = None
+    while True:
+        for inbox in inboxes:
+            inbox.put(("gvt?",))
+        reports = {}
+        for _ in inboxes:
+            _, lp, sent, received, next_time = _get(coordinator, ("report",), timeout)
+            reports[lp] = (sent, received, next_time)
+        counts = {lp: report[:2] for lp, report in reports.items()}
+        if counts == previous and sum(sent for sent, _ in counts.values()) == sum(received for _, received in counts.values()):
+            return min(report[2] for report in reports.values())
+        previous = counts
+
+
+def run_time_warp(
+    config: Dict[str, Any],
+    partition: Dict[str, int],
+    until: float = math.inf,
+    seed: Optional[int] = None,
+    gvt_interval: float = 0.05,
+    optimism: Optional[float] = None,
+    timeout: Optional[float] = None,
+) -> ParallelResult:
+    """
+    Run a topology over logical processes with the Time Warp kernel.
+
+    Args:
+        config (Dict[str, Any]): The topology configuration (see topology.py)
+        partition (Dict[str, int]): Actor id -> LP number, for every actor except the stats actors
+        until (float): Simulation time horizon. By default the run ends when no LP has events left.
+        seed (int): Master seed of the random streams
+        gvt_interval (float): Seconds between GVT computations. Shorter means less memory and more synchronization.
+        optimism (float): Do not dispatch events more than this much simulation time after GVT. Bounds the work a
+            rollback can undo. Unbounded by default.
+        timeout (float): Seconds to wait for a reply from an LP
+    """
+    lps = check_partition(build_actor_system(config, DE_EventLoop(synchronous=True), seed=seed), config, partition)
+    coordinator_system = build_actor_system({"Stats": config["Stats"]} if "Stats" in config else {}, DE_EventLoop(synchronous=True), seed=seed)
+    metric_names = coordinator_system.metrics.names()
+
+    context = multiprocessing.get_context("spawn")
+    inboxes = [context.Queue() for _ in lps]
+    coordinator = context.Queue()
+    processes = [
+        context.Process(
+            target=_run_lp,
+            args=(lp, len(lps), config, partition, seed, until, optimism, metric_names, inboxes, coordinator),
+            name=f"abdes1-tw-{lp}",
+            daemon=True,
+        )
+        for lp in lps
+    ]
+    for process in processes:
+        process.start()
+
+    records: Dict[int, List[MetricRecord]] = {lp: [] for lp in lps}
+    messages: List[Tuple[float, int, int, Message]] = []
+    lp_summaries: Dict[int, Dict[str, int]] = {}
+    try:
+        gvt = 0.0
+        while not math.isinf(gvt):
+            wall_time.sleep(gvt_interval)
+            gvt = _compute_gvt(inboxes, coordinator, timeout)
+            for inbox in inboxes:
+                inbox.put(("gvt", gvt))
+            # Every LP commits, and once GVT is infinite it is done: one more message each
+            expected = 2 * len(lps) if math.isinf(gvt) else len(lps)
+            for _ in range(expected):
+                item = _get(coordinator, ("commit", "done"), timeout)
+                if item[0] == "done":
+                    lp_summaries[item[1]] = item[2]
+                    continue
+                _, lp, lp_records, lp_messages = item
+                records[lp].extend(lp_records)
+                messages.extend(lp_messages)
+    finally:
+        for process in processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+
+    asyncio.run(replay(coordinator_system, [records[lp] for lp in lps], messages))
+    return ParallelResult(coordinator_system, lp_summaries)
@@ -0,0 +1,113 @@
+"""
+topology.py
+
+Build a DES actor system from a configuration (see examples/mm1_actors/mm1_actors_config.json).
+
+Every top-level section of the configuration maps to an actor class. The section holds the constructor
+arguments of one actor, or a list of them for several actors of the same class:
+
+    "Queue"       -> QueueActor
+    "Server"      -> ServerActor
+    "Station"     -> StationActor (c servers with a shared line, no "server-ready" events)
+    "Router"      -> RouterActor (sends entities on to one of its destinations, for queueing networks)
+    "DE_Arrivals" -> Generator
+    "Stats"       -> StatsActor
+
+The initial events are scheduled as well: a "server-ready" for every queue, then a "start" for every generator.
+"""
+from __future__ import annotations
+import json
+from typing import Any, Dict, List, Optional, Type
+
+from abdes1.actors import Message
+from abdes1.core import ActorProtocol, ActorSystem, Event, EventLoopProtocol
+from abdes1.des.des_event_loop import DE_EventLoop
+from abdes1.des.generator import Generator
+from abdes1.des.queue_actor import QueueActor, QueueType
+from abdes1.des.remote_actor import RemoteActor
+from abdes1.des.router_actor import RouterActor
+from abdes1.des.server_actor import ServerActor
+from abdes1.des.station_actor import StationActor
+from abdes1.des.stats_actor import StatsActor
+
+ACTOR_CLASSES: Dict[str, Type[ActorProtocol]] = {
+    "Queue": QueueActor,
+    "Server": ServerActor,
+    "Station": StationActor,
+    "Router": RouterActor,
+    "DE_Arrivals": Generator,
+    "Stats": StatsActor,
+}
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        config: Dict[str, Any] = json.load(f)
+    return config
+
+
+def actor_configs(config: Dict[str, Any], section: str) -> List[Dict[str, Any]]:
+    """
+    Return the constructor arguments of the actors in a section, [] if the section is missing.
+    """
+    value = config.get(section)
+    if value is None:
+        return []
+    return [dict(v) for v in value] if isinstance(value, list) else [dict(value)]
+
+
+def build_actor_system(
+    config: Dict[str, Any],
+    event_loop: Optional[EventLoopProtocol] = None,
+    seed: Optional[int] = None,
+    remote: Optional[Dict[str, Any]] = None,
+    initial_events: bool = True,
+) -> ActorSystem:
+    """
+    Register the actors of the configuration and schedule the initial events.
+
+    Args:
+        config (Dict[str, Any]): The configuration
+        event_loop (EventLoopProtocol): The event loop. Defaults to a synchronous DE_EventLoop.
+        seed (int): Master seed of the random streams
+        remote (Dict[str, Any]): Actors that run elsewhere (see parallel.py): actor id -> location. They are
+            registered as RemoteActor placeholders and get no initial events.
+        initial_events (bool): Schedule the events that start the simulation. Off to restore a checkpoint.
+    """
+    unknown = [section for section in config if section not in ACTOR_CLASSES]
+    if unknown:
+        raise ValueError(f"Unknown configuration sections: {', '.join(unknown)}. Valid sections are: {', '.join(ACTOR_CLASSES)}")
+
+    actor_system = ActorSystem(event_loop if event_loop is not None else DE_EventLoop(synchronous=True), seed=seed)
+
+    remote = remote or {}
+    for section, actor_class in ACTOR_CLASSES.items():
+        for kwargs in actor_configs(config, section):
+            if kwargs["id"] in remote:
+                actor_system.register_actor(RemoteActor, id=kwargs["id"], location=remote[kwargs["id"]])
+                continue
+            if actor_class is QueueActor:
+                kwargs["type"] = QueueType(kwargs["type"])
+            elif actor_class is Generator:
+                # Optional in the configuration: without a duration, the generator stops after num_arrivals
+                kwargs.setdefault("duration", None)
+            actor_system.register_actor(actor_class, **kwargs)
+
+    if not initial_events:
+        return actor_system
+
+    # Schedule an initial event 'server-ready' so that the servers can start processing
+    for queue in actor_configs(config, "Queue"):
+        if queue["id"] in remote:
+            continue
+        message = Message(type="server-ready", from_id="topology", to_id=queue["id"], content=None, time=0.0)
+        actor_system.schedule_event(Event(time=0.0, message=message))
+
+    # Schedule an initial event to start the simulation
+    for generator in actor_configs(config, "DE_Arrivals"):
+        if generator["id"] in remote:
+            continue
+        message = Message(type="start", from_id="topology", to_id=generator["id"], content=None, time=0.0)
+        actor_system.schedule_event(Event(time=0.0, message=message))
+
+    return actor_system
@@ -0,0 +1,180 @@
+"""
+column_store.py
+
+Columnar time series store: a directory with one raw binary file per column and a meta.json.
+
+    <path>/meta.json        {"format": "abdes1-columns", "version": 1, "rows": 1234, "generation": 3, "columns": {"time": "<f8", ...}}
+    <path>/time.bin         1234 little-endian float64
+    <path>/queue_depth.bin  1234 little-endian int64
+
+The writer fills typed NumPy arrays of chunk_size rows and appends every full chunk to the column files, so its
+memory does not depend on the number of rows, and the data is on disk while the run goes on. meta.json is
+rewritten (atomically) after every chunk: readers see the rows up to the last flush.
+
+The column files are plain arrays, so read_columns maps them into memory (np.memmap): no parsing, no copy.
+
+Every writer that starts or truncates a store counts up its generation and removes the data derived from the
+previous one, e.g. the plot pyramid (see downsampling.py). Derived data records the generation it was built from.
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+FORMAT = "abdes1-columns"
+VERSION = 1
+CHUNK_SIZE = 65536
+DERIVED = ("pyramid",)  # subdirectories with data derived from the store
+
+
+class ColumnWriter:
+    def __init__(self, path: str, columns: Dict[str, str], chunk_size: int = CHUNK_SIZE, resume_rows: int = 0) -> None:
+        """
+        Args:
+            path (str): Directory of the store. Created if needed; an existing store is replaced, and its derived data removed.
+            columns (Dict[str, str]): Column name -> NumPy dtype, e.g. {"time": "<f8", "queue_depth": "<i8"}
+            chunk_size (int): Rows kept in memory before they are appended to the files
+            resume_rows (int): Keep the first resume_rows rows of an existing store and append after them (e.g. when
+                a checkpoint is restored). If the store has fewer rows, a new store is started.
+        """
+        self.path = path
+        self.columns = {name: np.dtype(dtype).newbyteorder("<") for name, dtype in columns.items()}
+        self.chunk_size = chunk_size
+        self._chunks = [np.empty(chunk_size, dtype=dtype) for dtype in self.columns.values()]
+        self._filled = 0
+        os.makedirs(path, exist_ok=True)
+        self.generation = self._stored_generation() + 1
+        for name in DERIVED:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+        self.rows = 0
+        mode = "wb"
+        if resume_rows > 0 and self._stored_rows() >= resume_rows:
+            self.rows = resume_rows
+            mode = "r+b"
+        self._files = []
+        for name, dtype in self.columns.items():
+            file = open(self._column_path(name), mode)
+            file.truncate(self.rows * dtype.itemsize)
+            file.seek(0, os.SEEK_END)
+            self._files.append(file)
+        self._write_meta()
+
+    def append(self, *values: Any) -> None:
+        """
+        Append one row, one value per column in the order of the columns.
+        """
+        i = self._filled
+        for chunk, value in zip(self._chunks, values):
+            chunk[i] = value
+        self._filled = i + 1
+        if self._filled == self.chunk_size:
+            self.flush()
+
+    def extend(self, *arrays: np.ndarray) -> None:
+        """
+        Append many rows at once, one array per column in the order of the columns.
+        """
+        self.flush()
+        for file, array, dtype in zip(self._files, arrays, self.columns.values()):
+            file.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+            file.flush()
+        self.rows += len(arrays[0]) if arrays else 0
+        self._write_meta()
+
+    def flush(self) -> None:
+        """
+        Append the rows in memory to the column files and update meta.json.
+        """
+        if self._filled:
+            for file, chunk in zip(self._files, self._chunks):
+                file.write(chunk[: self._filled].tobytes())
+                file.flush()
+            self.rows += self._filled
+            self._filled = 0
+        self._write_meta()
+
+    def close(self) -> None:
+        self.flush()
+        for file in self._files:
+            file.close()
+        self._files = []
+
+    @property
+    def size(self) -> int:
+        """
+        Number of rows, including the ones not flushed yet.
+        """
+        return self.rows + self._filled
+
+    # --- Internal stuff
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _stored_rows(self) -> int:
+        try:
+            meta = read_meta(self.path)
+        except (FileNotFoundError, ValueError):
+            return 0
+        if meta["columns"] != {name: dtype.str for name, dtype in self.columns.items()}:
+            return 0
+        return int(meta["rows"])
+
+    def _stored_generation(self) -> int:
+        try:
+            return int(read_meta(self.path).get("generation", 0))
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_meta(self) -> None:
+        meta = {"format": FORMAT, "version": VERSION, "rows": self.rows, "generation": self.generation, "columns": {name: dtype.str for name, dtype in self.columns.items()}}
+        temporary = os.path.join(self.path, f"meta.json.{os.getpid()}.tmp")
+        with open(temporary, "w") as file:
+            json.dump(meta, file)
+        os.replace(temporary, os.path.join(self.path, "meta.json"))
+
+
+def is_column_store(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, "meta.json"))
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, "meta.json"), "r") as file:
+        meta: Dict[str, Any] = json.load(file)
+    if meta.get("format") != FORMAT or meta.get("version") != VERSION:
+        raise ValueError(f"{path} is not an {FORMAT} store of version {VERSION}")
+    return meta
+
+
+def read_columns(path: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Map the columns of a store into memory, read-only. Only the flushed rows are included.
+
+    Args:
+        path (str): Directory of the store
+        columns (List[str]): The columns to map. Defaults to all columns.
+    """
+    meta = read_meta(path)
+    rows = meta["rows"]
+    result: Dict[str, np.ndarray] = {}
+    for name in columns if columns is not None else list(meta["columns"]):
+        dtype = np.dtype(meta["columns"][name])
+        if rows == 0:
+            # np.memmap cannot map an empty file
+            result[name] = np.empty(0, dtype=dtype)
+        else:
+            result[name] = np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype, mode="r", shape=(rows,))
+    return result
+
+
+def write_columns(path: str, columns: Dict[str, np.ndarray]) -> None:
+    """
+    Write whole arrays as a store in one go, e.g. derived data such as pre-aggregates.
+    """
+    writer = ColumnWriter(path, {name: array.dtype.str for name, array in columns.items()}, chunk_size=1)
+    writer.extend(*columns.values())
+    writer.close()
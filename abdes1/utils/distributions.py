@@ -0,0 +1,300 @@
+"""
+distributions.py
+
+Random variates for interarrival and service times.
+
+A distribution draws its variates from a NumPy generator in batches of buffer_size and hands them out one at a
+time with next(). Drawing a batch is one NumPy call, and next() is a list index in between.
+
+Distributions are usually created from a specification in the configuration:
+
+    {"type": "exponential", "rate": 1.8}
+    {"type": "erlang", "k": 3, "rate": 1.8}
+    {"type": "hyperexponential", "probabilities": [0.4, 0.6], "rates": [1.0, 3.0]}
+    {"type": "lognormal", "mu": 0.0, "sigma": 0.5}
+    {"type": "weibull", "shape": 1.5, "scale": 1.0}
+    {"type": "empirical", "values": [0.5, 1.0, 2.0], "probabilities": [0.2, 0.5, 0.3]}
+    {"type": "deterministic", "value": 1.0}
+"""
+from __future__ import annotations
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+BUFFER_SIZE = 1024
+
+
+class Distribution:
+    def __init__(self, rng: Optional[np.random.Generator], buffer_size: int = BUFFER_SIZE) -> None:
+        self.rng = rng
+        self.buffer_size = buffer_size
+        self._buffer: List[float] = []
+        self._index = 0
+
+    def next(self) -> float:
+        """
+        Return the next variate.
+        """
+        i = self._index
+        if i == len(self._buffer):
+            self._buffer = self._draw(self.buffer_size).tolist()
+            i = 0
+        self._index = i + 1
+        return self._buffer[i]  # type: ignore
+
+    def get_state(self) -> Tuple[List[float], int, Optional[Dict[str, Any]]]:
+        """
+        State of the distribution: the buffer, the position in it and the state of the random stream, so the
+        same variates can be drawn again after set_state (e.g. after a rollback).
+        """
+        # A refill replaces the buffer, it is never modified in place, so it needs no copy
+        return (self._buffer, self._index, self.rng.bit_generator.state if self.rng is not None else None)
+
+    def set_state(self, state: Tuple[List[float], int, Optional[Dict[str, Any]]]) -> None:
+        self._buffer, self._index, rng_state = state
+        if rng_state is not None:
+            assert self.rng is not None
+            self.rng.bit_generator.state = rng_state
+
+    def reseed(self, rng: np.random.Generator) -> None:
+        """
+        Draw from another random stream from now on, e.g. to fork a restored checkpoint into replications.
+        """
+        self.rng = rng
+        self._buffer = []
+        self._index = 0
+
+    @property
+    def mean(self) -> float:
+        raise NotImplementedError
+
+    @property
+    def minimum(self) -> float:
+        """
+        Lower bound of the variates.
+        """
+        return 0.0
+
+    def _draw(self, n: int) -> np.ndarray:
+        """
+        Draw n variates in one call. Override this method.
+        """
+        raise NotImplementedError
+
+
+class Exponential(Distribution):
+    def __init__(self, rng: np.random.Generator, rate: float, buffer_size: int = BUFFER_SIZE) -> None:
+        super().__init__(rng, buffer_size)
+        if rate <= 0:
+            raise ValueError(f"Exponential rate must be > 0, got {rate}")
+        self.rate = rate
+
+    @property
+    def mean(self) -> float:
+        return 1.0 / self.rate
+
+    def _draw(self, n: int) -> np.ndarray:
+        assert self.rng is not None
+        return self.rng.exponential(1.0 / self.rate, n)
+
+
+class Erlang(Distribution):
+    def __init__(self, rng: np.random.Generator, k: int, rate: float, buffer_size: int = BUFFER_SIZE) -> None:
+        """
+        Sum of k exponential phases with rate k * rate each, so the mean is 1 / rate (as in the E_k queueing models).
+        """
+        super().__init__(rng, buffer_size)
+        if k < 1 or rate <= 0:
+            raise ValueError(f"Erlang needs k >= 1 and rate > 0, got k={k}, rate={rate}")
+        self.k = k
+        self.rate = rate
+
+    @property
+    def mean(self) -> float:
+        return 1.0 / self.rate
+
+    def _draw(self, n: int) -> np.ndarray:
+        assert self.rng is not None
+        return self.rng.gamma(self.k, 1.0 / (self.k * self.rate), n)
+
+
+class HyperExponential(Distribution):
+    def __init__(self, rng: np.random.Generator, probabilities: Sequence[float], rates: Sequence[float], buffer_size: int = BUFFER_SIZE) -> None:
+        """
+        Exponential with rate rates[i] with probability probabilities[i].
+        """
+        super().__init__(rng, buffer_size)
+        if len(probabilities) != len(rates) or not rates:
+            raise ValueError("HyperExponential needs as many probabilities as rates")
+        if not math.isclose(sum(probabilities), 1.0) or min(probabilities) < 0 or min(rates) <= 0:
+            raise ValueError("HyperExponential probabilities must sum to 1 and rates must be > 0")
+        self.probabilities = np.asarray(probabilities, dtype=float)
+        self.scales = 1.0 / np.asarray(rates, dtype=float)
+
+    @property
+    def mean(self) -> float:
+        return float(np.dot(self.probabilities, self.scales))
+
+    def _draw(self, n: int) -> np.ndarray:
+        assert self.rng is not None
+        phases = self.rng.choice(len(self.scales), size=n, p=self.probabilities)
+        return self.rng.exponential(1.0, n) * self.scales[phases]
+
+
+class LogNormal(Distribution):
+    def __init__(self, rng: np.random.Generator, mu: float, sigma: float, buffer_size: int = BUFFER_SIZE) -> None:
+        """
+        exp(N(mu, sigma^2)): mu and sigma are the mean and standard deviation of the underlying normal distribution.
+        """
+        super().__init__(rng, buffer_size)
+        if sigma <= 0:
+            raise ValueError(f"LogNormal sigma must be > 0, got {sigma}")
+        self.mu = mu
+        self.sigma = sigma
+
+    @property
+    def mean(self) -> float:
+        return math.exp(self.mu + self.sigma**2 / 2)
+
+    def _draw(self, n: int) -> np.ndarray:
+        assert self.rng is not None
+        return self.rng.lognormal(self.mu, self.sigma, n)
+
+
+class Weibull(Distribution):
+    def __init__(self, rng: np.random.Generator, shape: float, scale: float = 1.0, buffer_size: int = BUFFER_SIZE) -> None:
+        super().__init__(rng, buffer_size)
+        if shape <= 0 or scale <= 0:
+            raise ValueError(f"Weibull shape and scale must be > 0, got shape={shape}, scale={scale}")
+        self.shape = shape
+        self.scale = scale
+
+    @property
+    def mean(self) -> float:
+        return self.scale * math.gamma(1 + 1 / self.shape)
+
+    def _draw(self, n: int) -> np.ndarray:
+        assert self.rng is not None
+        return self.scale * self.rng.weibull(self.shape, n)
+
+
+class Empirical(Distribution):
+    def __init__(
+        self,
+        rng: np.random.Generator,
+        values: Sequence[float],
+        probabilities: Optional[Sequence[float]] = None,
+        buffer_size: int = BUFFER_SIZE,
+    ) -> None:
+        """
+        Draw from observed values, with the given probabilities or uniformly.
+        """
+        super().__init__(rng, buffer_size)
+        if not values:
+            raise ValueError("Empirical distribution needs at least one value")
+        if probabilities is not None and len(probabilities) != len(values):
+            raise ValueError("Empirical distribution needs as many probabilities as values")
+        self.values = np.asarray(values, dtype=float)
+        self.probabilities = None if probabilities is None else np.asarray(probabilities, dtype=float)
+
+    @property
+    def mean(self) -> float:
+        if self.probabilities is None:
+            return float(self.values.mean())
+        return float(np.dot(self.values, self.probabilities))
+
+    @property
+    def minimum(self) -> float:
+        return float(self.values.min())
+
+    def _draw(self, n: int) -> np.ndarray:
+        assert self.rng is not None
+        return self.rng.choice(self.values, size=n, p=self.probabilities)
+
+
+class Deterministic(Distribution):
+    def __init__(self, rng: Optional[np.random.Generator], value: float, buffer_size: int = BUFFER_SIZE) -> None:
+        super().__init__(rng, buffer_size)
+        self.value = float(value)
+
+    def next(self) -> float:
+        return self.value
+
+    @property
+    def mean(self) -> float:
+        return self.value
+
+    @property
+    def minimum(self) -> float:
+        return self.value
+
+    def _draw(self, n: int) -> np.ndarray:
+        return np.full(n, self.value)
+
+
+class AliasTable(Distribution):
+    """
+    Draw the index of an outcome with the given weights in O(1), whatever the number of outcomes, with Walker's
+    alias method (Vose's construction): one uniform column and one biased coin per variate. Used to pick a branch
+    of a router (see abdes1/des/router_actor.py).
+    """
+
+    def __init__(self, rng: np.random.Generator, weights: Sequence[float], buffer_size: int = BUFFER_SIZE) -> None:
+        super().__init__(rng, buffer_size)
+        w = np.asarray(weights, dtype=float)
+        if len(w) == 0 or np.any(w < 0) or w.sum() <= 0:
+            raise ValueError(f"Alias table needs non-negative weights with a positive sum, got {list(weights)}")
+        n = len(w)
+        scaled = w * (n / w.sum())
+        self.probability = np.ones(n)  # of keeping the column, else its alias
+        self.alias = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            s, g = small.pop(), large.pop()
+            self.probability[s] = scaled[s]
+            self.alias[s] = g
+            # The large outcome gives the rest of the column to the small one
+            scaled[g] -= 1.0 - scaled[s]
+            (small if scaled[g] < 1.0 else large).append(g)
+        # The columns left in small or large are full, up to rounding errors: they keep probability 1
+
+    @property
+    def mean(self) -> float:
+        # The probability of an outcome: its own column kept, plus the columns that alias to it
+        n = len(self.alias)
+        weights = (np.bincount(self.alias, weights=1.0 - self.probability, minlength=n) + self.probability) / n
+        return float(np.dot(np.arange(n), weights))
+
+    def _draw(self, n: int) -> np.ndarray:
+        assert self.rng is not None
+        columns = self.rng.integers(len(self.alias), size=n)
+        return np.where(self.rng.random(n) < self.probability[columns], columns, self.alias[columns])
+
+
+DISTRIBUTIONS: Dict[str, Type[Distribution]] = {
+    "exponential": Exponential,
+    "erlang": Erlang,
+    "hyperexponential": HyperExponential,
+    "lognormal": LogNormal,
+    "weibull": Weibull,
+    "empirical": Empirical,
+    "deterministic": Deterministic,
+}
+
+
+def create_distribution(spec: Dict[str, Any], rng: np.random.Generator) -> Distribution:
+    """
+    Create a distribution from a specification, e.g. {"type": "exponential", "rate": 1.8}.
+
+    Args:
+        spec (Dict[str, Any]): "type" selects the distribution, the other keys are its parameters
+        rng (np.random.Generator): The random stream to draw from
+    """
+    parameters = dict(spec)
+    kind = parameters.pop("type", None)
+    distribution_class = DISTRIBUTIONS.get(str(kind).lower())
+    if distribution_class is None:
+        raise ValueError(f"Unknown distribution type: {kind}. Valid types are: {', '.join(DISTRIBUTIONS)}")
+    return distribution_class(rng, **parameters)
@@ -0,0 +1,154 @@
+"""
+downsampling.py
+
+Reduce a long time series to what a plot can show.
+
+- min_max: per pixel column the minimum and the maximum, an envelope that keeps every spike
+- lttb: Largest-Triangle-Three-Buckets, a subset of the points that keeps the visual shape of the line
+- Pyramid: min/max pre-aggregates at coarser and coarser resolutions, so that a time window, e.g. a zoom, is
+  plotted from the coarsest level that still has enough buckets in the window, without a scan of the series
+
+The times must be sorted, as they are in the output of a stats actor.
+
+A pyramid of a columnar store (see column_store.py) can be saved inside the store, one store per level:
+
+    <path>/pyramid/pyramid.json   {"rows": 1234, "generation": 3, "factor": 16, "levels": 2}
+    <path>/pyramid/level-1/       time, minimum, maximum of every 16 rows
+    <path>/pyramid/level-2/       ... of every 256 rows
+
+A saved pyramid is only used for the generation of the store it was built from (see column_store.py).
+"""
+from __future__ import annotations
+import json
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from abdes1.utils.column_store import read_columns, read_meta, write_columns
+
+FACTOR = 16  # rows per bucket of the next level
+MIN_BUCKETS = 1024  # no coarser levels below this number of buckets
+
+Envelope = Tuple[np.ndarray, np.ndarray, np.ndarray]  # time, minimum, maximum per pixel column
+
+
+def min_max(times: np.ndarray, minimum: np.ndarray, maximum: np.ndarray, buckets: int, start: Optional[float] = None, end: Optional[float] = None) -> Envelope:
+    """
+    Minimum and maximum per pixel column: the range [start, end] is split into buckets columns of equal width.
+    The empty columns are left out.
+
+    Args:
+        times (np.ndarray): Sorted times
+        minimum, maximum (np.ndarray): Values at the times. Pass the same array twice for a raw series, or the
+            minimum and maximum of pre-aggregated buckets.
+        buckets (int): Number of columns, e.g. the width of the plot in pixels
+        start, end (float): Time range. Defaults to the first and the last time.
+    """
+    if len(times) == 0:
+        return times, minimum, maximum
+    start = float(times[0]) if start is None else start
+    end = float(times[-1]) if end is None else end
+    edges = np.linspace(start, end, buckets + 1)[1:-1]
+    # Column c has the rows bounds[c]:bounds[c + 1]
+    bounds = np.concatenate(([0], np.searchsorted(times, edges, side="left"), [len(times)]))
+    starts = bounds[:-1][bounds[:-1] < bounds[1:]]
+    return np.asarray(times[starts]), np.minimum.reduceat(minimum, starts), np.maximum.reduceat(maximum, starts)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013) to threshold points. The first and the last
+    point are kept; from every bucket in between, the point that forms the largest triangle with the point kept in
+    the previous bucket and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.asarray(x), np.asarray(y)
+    xf = np.asarray(x, dtype=np.float64)
+    yf = np.asarray(y, dtype=np.float64)
+    # Bucket i has the rows edges[i]:edges[i + 1]; the last edge is the last point
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        average_x = xf[stop:next_stop].mean()
+        average_y = yf[stop:next_stop].mean()
+        areas = np.abs((xf[a] - average_x) * (yf[start:stop] - yf[a]) - (xf[a] - xf[start:stop]) * (average_y - yf[a]))
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+    return np.asarray(x[indices]), np.asarray(y[indices])
+
+
+class Pyramid:
+    """
+    Min/max pre-aggregates of a time series. Level 0 is the series itself, level k has buckets of factor**k rows.
+    """
+
+    def __init__(self, times: np.ndarray, values: np.ndarray, factor: int = FACTOR, min_buckets: int = MIN_BUCKETS) -> None:
+        self.factor = factor
+        self.rows = len(times)
+        self.levels: List[Envelope] = [(times, values, values)]
+        while len(self.levels[-1][0]) > min_buckets * factor:
+            self.levels.append(self._coarsen(self.levels[-1]))
+
+    def window(self, start: float, end: float, buckets: int) -> Envelope:
+        """
+        Envelope of the time window [start, end] in buckets pixel columns, from the coarsest level that has at
+        least buckets buckets in the window.
+        """
+        for times, minimum, maximum in reversed(self.levels):
+            # The bucket that starts before the window overlaps with it
+            first = max(int(np.searchsorted(times, start, side="right")) - 1, 0)
+            last = int(np.searchsorted(times, end, side="right"))
+            if last - first >= buckets or times is self.levels[0][0]:
+                break
+        return min_max(times[first:last], minimum[first:last], maximum[first:last], buckets, start, end)
+
+    # --- Persistence, inside a columnar store
+
+    def save(self, path: str) -> None:
+        directory = os.path.join(path, "pyramid")
+        os.makedirs(directory, exist_ok=True)
+        for level, (times, minimum, maximum) in enumerate(self.levels[1:], start=1):
+            write_columns(os.path.join(directory, f"level-{level}"), {"time": times, "minimum": minimum, "maximum": maximum})
+        temporary = os.path.join(directory, f"pyramid.json.{os.getpid()}.tmp")
+        with open(temporary, "w") as file:
+            meta = {"rows": self.rows, "generation": read_meta(path).get("generation", 0), "factor": self.factor, "levels": len(self.levels) - 1}
+            json.dump(meta, file)
+        os.replace(temporary, os.path.join(directory, "pyramid.json"))
+
+    @classmethod
+    def load(cls, path: str, times: np.ndarray, values: np.ndarray) -> Optional["Pyramid"]:
+        """
+        The pyramid saved in the store, on top of its series, or None if there is none or it is out of date.
+        """
+        directory = os.path.join(path, "pyramid")
+        try:
+            with open(os.path.join(directory, "pyramid.json"), "r") as file:
+                meta = json.load(file)
+        except FileNotFoundError:
+            return None
+        store = read_meta(path)
+        if meta["rows"] != len(times) or meta["rows"] != store["rows"] or meta.get("generation") != store.get("generation", 0):
+            return None
+        pyramid = cls.__new__(cls)
+        pyramid.factor = meta["factor"]
+        pyramid.rows = meta["rows"]
+        pyramid.levels = [(times, values, values)]
+        for level in range(1, meta["levels"] + 1):
+            columns = read_columns(os.path.join(directory, f"level-{level}"))
+            pyramid.levels.append((columns["time"], columns["minimum"], columns["maximum"]))
+        return pyramid
+
+    # --- Internal stuff
+
+    def _coarsen(self, level: Envelope) -> Envelope:
+        times, minimum, maximum = level
+        starts = np.arange(0, len(times), self.factor)
+        return np.asarray(times[starts]), np.minimum.reduceat(minimum, starts), np.maximum.reduceat(maximum, starts)
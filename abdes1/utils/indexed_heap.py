@@ -0,0 +1,74 @@
+"""
+indexed_heap.py
+
+A binary min-heap of the items 0..n-1, keyed on a number per item, that knows where every item is: the item with
+the smallest key in O(1), a change of the key of any item in O(log n). Equal keys go to the lowest item.
+"""
+from typing import Any, List, Tuple
+
+
+class IndexedHeap:
+    def __init__(self, keys: List[float]) -> None:
+        n = len(keys)
+        self.keys = list(keys)
+        self.heap = list(range(n))  # items in heap order
+        self.position = list(range(n))  # where every item is in the heap
+        for i in reversed(range(n // 2)):
+            self._sift_down(i)
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def minimum(self) -> int:
+        """
+        The item with the smallest key.
+        """
+        return self.heap[0]
+
+    def update(self, item: int, key: float) -> None:
+        old = self.keys[item]
+        self.keys[item] = key
+        if key < old:
+            self._sift_up(self.position[item])
+        elif key > old:
+            self._sift_down(self.position[item])
+
+    # --- Checkpoints (see Actor.save_state)
+
+    def get_state(self) -> Tuple[List[float], List[int], List[int]]:
+        return (list(self.keys), list(self.heap), list(self.position))
+
+    def set_state(self, state: Any) -> None:
+        self.keys, self.heap, self.position = state
+
+    # --- Internal stuff
+
+    def _less(self, a: int, b: int) -> bool:
+        keys = self.keys
+        return keys[a] < keys[b] or (keys[a] == keys[b] and a < b)
+
+    def _swap(self, i: int, j: int) -> None:
+        heap, position = self.heap, self.position
+        heap[i], heap[j] = heap[j], heap[i]
+        position[heap[i]] = i
+        position[heap[j]] = j
+
+    def _sift_up(self, i: int) -> None:
+        while i > 0:
+            parent = (i - 1) // 2
+            if not self._less(self.heap[i], self.heap[parent]):
+                return
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i: int) -> None:
+        n = len(self.heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < n and self._less(self.heap[child], self.heap[smallest]):
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
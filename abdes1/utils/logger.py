@@ -2,13 +2,16 @@
 logger.py
 
 Make console output more consistent during initial development.
+
+Importing this module does not touch the logging configuration or the file system. Loggers write to the console;
+they also write to a log file if one is set with configure_logging() or the LOGGING_FILE environment variable.
 """
 import logging
 import os
 
 from copy import copy
 from logging import Logger
-from typing import Any, TYPE_CHECKING, Tuple
+from typing import Any, Optional, TYPE_CHECKING, Tuple
 from collections.abc import MutableMapping
 
 
@@ -19,14 +22,27 @@ else:
 
 
 loglevel = os.environ.get("LOGGING_LEVEL_DEFAULT") or "DEBUG"
-logging.basicConfig(
-    level=loglevel,
-    format="%(asctime)s [%(levelname)-8s] %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(filename="myapp.log", mode="w"),
-    ],
-)
+log_file: Optional[str] = None  # set by configure_logging()
+
+
+def configure_logging(level: Optional[str] = None, filename: Optional[str] = None) -> None:
+    """
+    Configure the root logger and the log file of the ALoggers created after this call.
+
+    Call this from the main program, not from library code.
+
+    Args:
+        level (str): Default log level, used when LOGGING_LEVEL_DEFAULT is not set
+        filename (str): Log file, truncated by this call. Overrides LOGGING_FILE.
+    """
+    global loglevel, log_file
+    if level is not None:
+        loglevel = level
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    if filename is not None:
+        log_file = filename
+        handlers.append(logging.FileHandler(filename=filename, mode="w"))
+    logging.basicConfig(level=os.environ.get("LOGGING_LEVEL_DEFAULT") or loglevel, format="%(asctime)s [%(levelname)-8s] %(message)s", handlers=handlers, force=True)
 
 
 class Color:
@@ -90,17 +106,19 @@ class ALogger:
             console_handler.setFormatter(ColoredFormatter(console_format))
             logger.addHandler(console_handler)
 
-            file_handler = logging.FileHandler("myapp.log")
-            file_formatter = logging.Formatter("%(asctime)s [%(levelname)-8s] [%(source)-10s] %(message)s")
-            file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
+            filename = log_file or os.environ.get("LOGGING_FILE")
+            if filename:
+                file_handler = logging.FileHandler(filename)
+                file_formatter = logging.Formatter("%(asctime)s [%(levelname)-8s] [%(source)-10s] %(message)s")
+                file_handler.setFormatter(file_formatter)
+                logger.addHandler(file_handler)
 
         self.logger = LoggerAdapter(logger, {"source": source})
 
-        self.warning(f"Loglevel for source '{self.source}' set to {loglevel}")
+        self.warning(f"Loglevel for source '{self.source}' set to {self._get_logging_level()}")
 
     def _get_logging_level(self) -> str:
-        return os.environ.get(f"LOGGING_LEVEL_{self.source.upper().replace('-', '')}") or os.environ.get("LOGGING_LEVEL_DEFAULT") or "DEBUG"
+        return os.environ.get(f"LOGGING_LEVEL_{self.source.upper().replace('-', '')}") or os.environ.get("LOGGING_LEVEL_DEFAULT") or loglevel
 
     def debug(self, message: str) -> None:
         self.logger.debug(message)
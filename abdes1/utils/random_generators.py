@@ -1,10 +1,52 @@
-# import random
+"""
+random_generators.py
 
+Independent, reproducible random number streams.
 
-# def exponential_random_variable(mean):
-#     return random.expovariate(1.0 / mean)
-#     # return -mean * random.log(random.random())
+All streams of a simulation derive from one master seed. The stream of an actor is derived from the master seed
+and the SHA-256 digest of the actor id, so it does not depend on the order in which actors are created, and adding an actor
+does not change the draws of the others. Two actor systems with different master seeds, e.g. two replications
+in one process, share no state.
 
+NumPy is imported when the first stream is created, not with this module.
+"""
+from __future__ import annotations
+import hashlib
+import secrets
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
-# def normal_random_variable(mean, stddev):
-#     return random.gauss(mean, stddev)
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def _spawn_key(name: str) -> Tuple[int, ...]:
+    """
+    The SHA-256 digest of name as eight uint32 words: distinct names collide with negligible probability.
+    """
+    digest = hashlib.sha256(name.encode()).digest()
+    return tuple(int.from_bytes(digest[i:i + 4], "little") for i in range(0, len(digest), 4))
+
+
+class RandomStreams:
+    def __init__(self, seed: Optional[int] = None) -> None:
+        """
+        Args:
+            seed (int): Master seed. Without a seed, fresh entropy is used; it is available as RandomStreams.seed
+                so the run can be reproduced.
+        """
+        # 128 bits of fresh entropy, as np.random.SeedSequence draws them
+        self.seed: int = secrets.randbits(128) if seed is None else seed
+        self._streams: Dict[str, np.random.Generator] = {}
+
+    def stream(self, name: str) -> np.random.Generator:
+        """
+        Return the random number generator for name, e.g. an actor id. The same name returns the same generator.
+        """
+        rng = self._streams.get(name)
+        if rng is None:
+            import numpy as np
+
+            seed_sequence = np.random.SeedSequence(self.seed, spawn_key=_spawn_key(name))
+            rng = np.random.Generator(np.random.PCG64(seed_sequence))
+            self._streams[name] = rng
+        return rng
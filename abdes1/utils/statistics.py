@@ -1,6 +1,347 @@
+import copy
+import math
+from typing import List, NamedTuple, Optional, Sequence
+
+
 def mean(values):
     return sum(values) / len(values) if values else 0
 
 def variance(values):
     m = mean(values)
     return sum((x - m) ** 2 for x in values) / len(values) if values else 0
+
+
+def sample_variance(values: Sequence[float]) -> float:
+    """
+    Unbiased sample variance (divides by n - 1).
+    """
+    n = len(values)
+    if n < 2:
+        return 0.0
+    m = mean(values)
+    return sum((x - m) ** 2 for x in values) / (n - 1)
+
+
+def _beta_continued_fraction(a: float, b: float, x: float) -> float:
+    # Continued fraction of the incomplete beta function, modified Lentz's method
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((a + m2 - 1.0) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1.0))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+    return h
+
+
+def regularized_incomplete_beta(a: float, b: float, x: float) -> float:
+    """
+    I_x(a, b), the CDF of the beta distribution.
+    """
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_front) * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _beta_continued_fraction(b, a, 1.0 - x) / b
+
+
+def student_t_cdf(t: float, df: float) -> float:
+    tail = 0.5 * regularized_incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+    return 1.0 - tail if t > 0 else tail
+
+
+def student_t_ppf(p: float, df: float) -> float:
+    """
+    Quantile of Student's t distribution with df degrees of freedom, by bisection on the CDF.
+    """
+    if not 0.0 < p < 1.0:
+        raise ValueError(f"p must be in (0, 1), got {p}")
+    if p < 0.5:
+        return -student_t_ppf(1.0 - p, df)
+    low, high = 0.0, 1.0
+    while student_t_cdf(high, df) < p:
+        low, high = high, high * 2.0
+    for _ in range(100):
+        middle = (low + high) / 2.0
+        if student_t_cdf(middle, df) < p:
+            low = middle
+        else:
+            high = middle
+        if high - low < 1e-12 * max(1.0, high):
+            break
+    return (low + high) / 2.0
+
+
+class ConfidenceInterval(NamedTuple):
+    mean: float
+    half_width: float
+    n: int
+
+    @property
+    def low(self) -> float:
+        return self.mean - self.half_width
+
+    @property
+    def high(self) -> float:
+        return self.mean + self.half_width
+
+
+def confidence_interval(values: Sequence[float], level: float = 0.95) -> ConfidenceInterval:
+    """
+    Student t confidence interval for the mean of independent observations, e.g. one value per replication.
+    The half width is NaN for fewer than two observations.
+    """
+    n = len(values)
+    m = mean(values)
+    if n < 2:
+        return ConfidenceInterval(m, math.nan, n)
+    half_width = student_t_ppf(0.5 + level / 2.0, n - 1) * math.sqrt(sample_variance(values) / n)
+    return ConfidenceInterval(m, half_width, n)
+
+
+# --- Streaming statistics: O(1) memory, one value at a time
+
+
+class RunningStatistics:
+    """
+    Count, mean, variance, minimum and maximum of a stream of values (Welford's algorithm).
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def variance(self) -> float:
+        """
+        Unbiased sample variance, as sample_variance.
+        """
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class TimeWeightedStatistics:
+    """
+    Time average of a piecewise constant signal, e.g. a queue depth or a busy flag: every value holds until the
+    next update. The average runs from the first update to the last one, or to until.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.start: Optional[float] = None
+        self.last_time: Optional[float] = None
+        self.value = 0.0
+        self.area = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def update(self, time: float, value: float) -> None:
+        if self.last_time is None:
+            self.start = time
+        else:
+            self.area += self.value * (time - self.last_time)
+        self.last_time = time
+        self.value = value
+        self.count += 1
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def mean(self, until: Optional[float] = None) -> float:
+        if self.last_time is None or self.start is None:
+            return math.nan
+        area = self.area
+        end = self.last_time
+        if until is not None and until > end:
+            area += self.value * (until - end)
+            end = until
+        duration = end - self.start
+        return area / duration if duration > 0 else self.value
+
+
+class P2Quantile:
+    """
+    Estimate of the p-quantile of a stream of values with five markers (the P-square algorithm of Jain and
+    Chlamtac, 1985). Exact for up to five values.
+    """
+
+    def __init__(self, p: float) -> None:
+        if not 0.0 < p < 1.0:
+            raise ValueError(f"p must be in (0, 1), got {p}")
+        self.p = p
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self._desired = [1.0, 1.0 + 2.0 * p, 1.0 + 4.0 * p, 3.0 + 2.0 * p, 5.0]
+        self._increments = [0.0, p / 2.0, p, (1.0 + p) / 2.0, 1.0]
+
+    def __copy__(self) -> "P2Quantile":
+        # Snapshots (Actor.save_state) copy shallowly: the markers must not be shared
+        clone = P2Quantile.__new__(P2Quantile)
+        clone.__dict__.update({name: copy.copy(value) for name, value in self.__dict__.items()})
+        return clone
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        positions = self._positions
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            positions[i] += 1.0
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+
+        # Move the middle markers towards their desired positions
+        for i in range(1, 4):
+            d = desired[i] - positions[i]
+            if (d >= 1.0 and positions[i + 1] - positions[i] > 1.0) or (d <= -1.0 and positions[i - 1] - positions[i] < -1.0):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q = self._heights
+        n = self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float:
+        if self.count == 0:
+            return math.nan
+        if self.count <= 5:
+            return self._heights[min(len(self._heights) - 1, int(self.p * len(self._heights)))]
+        return self._heights[2]
+
+
+# --- Output analysis: warm-up truncation and batch means
+
+
+def mser(values: Sequence[float]) -> int:
+    """
+    MSER truncation point: the number of leading values to drop so that the remaining values have the smallest
+    squared standard error of their mean, sum((x - mean)^2) / (n - d)^2. Only the first half is considered.
+    Applied to batch means of 5 observations this is MSER-5 (White, 1997).
+
+    A result of len(values) // 2 means the transient may not be over yet.
+    """
+    n = len(values)
+    best, best_d = math.inf, 0
+    suffix_sum = 0.0
+    suffix_squares = 0.0
+    # Walk from the end so that the sums over values[d:] are available for every d
+    for d in range(n - 1, -1, -1):
+        suffix_sum += values[d]
+        suffix_squares += values[d] * values[d]
+        if d > n // 2:
+            continue
+        k = n - d
+        statistic = max(suffix_squares - suffix_sum * suffix_sum / k, 0.0) / (k * k)
+        if statistic <= best:
+            best, best_d = statistic, d
+    return best_d
+
+
+class BatchMeans:
+    """
+    Means of consecutive batches of batch_size observations, in bounded memory: once there are max_batches
+    batches, neighbours are merged and the batch size doubles.
+    """
+
+    def __init__(self, batch_size: int = 5, max_batches: int = 1024) -> None:
+        if max_batches < 2 or max_batches % 2:
+            raise ValueError(f"max_batches must be even and at least 2, got {max_batches}")
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.means: List[float] = []
+        self.count = 0  # observations
+        self._sum = 0.0
+        self._batch_count = 0
+
+    def __copy__(self) -> "BatchMeans":
+        clone = BatchMeans.__new__(BatchMeans)
+        clone.__dict__.update(self.__dict__)
+        clone.means = list(self.means)
+        return clone
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self._sum += value
+        self._batch_count += 1
+        if self._batch_count == self.batch_size:
+            self.means.append(self._sum / self.batch_size)
+            self._sum = 0.0
+            self._batch_count = 0
+            if len(self.means) == self.max_batches:
+                means = self.means
+                self.means = [(means[i] + means[i + 1]) / 2.0 for i in range(0, len(means), 2)]
+                self.batch_size *= 2
+
+
+def batch_means_interval(means: Sequence[float], batches: int = 20, level: float = 0.95) -> ConfidenceInterval:
+    """
+    Confidence interval for the steady state mean from batch means: consecutive means are grouped into (at most)
+    batches equal groups, large enough to be nearly independent. Leftover means at the start are dropped.
+    """
+    k = len(means)
+    m = min(batches, k)
+    if m == 0:
+        return ConfidenceInterval(math.nan, math.nan, 0)
+    size = k // m
+    start = k - m * size
+    groups = [sum(means[start + i * size : start + (i + 1) * size]) / size for i in range(m)]
+    return confidence_interval(groups, level)
@@ -38,7 +38,9 @@ from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
 from abdes1 import ActorSystem, Event, Message
+from abdes1.core import TraceRecorder, create_future_event_list
 from abdes1.des import DE_EventLoop, QueueActor, QueueType, ServerActor, StatsActor, Generator
+from abdes1.utils.logger import configure_logging
 
 # create a config schema
 # from typing import TypedDict
@@ -67,6 +69,7 @@ class ArrivalsConfig:
     destination: str
     entity_name: str
     duration: Optional[float] = None
+    window: Optional[int] = None
 
 
 @dataclass
@@ -93,7 +96,15 @@ def get_metrics() -> Tuple[list[float], List[int]]:
     return (time_series, queue_depths)
 
 
-async def main(config_file: Optional[Path]) -> None:
+async def main(
+    config_file: Optional[Path],
+    synchronous: bool = False,
+    future_event_list: str = "heap",
+    batch: bool = False,
+    trace: Optional[str] = None,
+    window: Optional[int] = None,
+    seed: Optional[int] = 333,
+) -> None:
     # Load environment variables from the global .env file
     load_dotenv()
 
@@ -101,6 +112,9 @@ async def main(config_file: Optional[Path]) -> None:
     env_path = Path(__file__).resolve().parent / ".env"
     load_dotenv(env_path)
 
+    # The library does not create a log file by itself
+    configure_logging(filename="myapp.log")
+
     if config_file is None:
         print("Please provide a configuration file.")
         # generate configuration hardcoded instead
@@ -131,12 +145,16 @@ async def main(config_file: Optional[Path]) -> None:
         # read the configuration from a file
         queue_config, server_config, load_generator_config, stats_config = load_config(str(config_file))
 
+    if window is not None:
+        load_generator_config.window = window
+
     # Create an instance of the actor system
 
     # We are creating a Discrete Event Simulation.
     # Use the DE_EventLoop
-    event_loop = DE_EventLoop()
-    actor_system = ActorSystem(event_loop=event_loop)
+    trace_recorder = TraceRecorder(trace) if trace is not None else None
+    event_loop = DE_EventLoop(synchronous=synchronous, future_event_list=create_future_event_list(future_event_list), batch=batch, trace=trace_recorder)
+    actor_system = ActorSystem(event_loop=event_loop, seed=seed)
 
     # Create an instance of the queue
     # kind: fifo, lifo, priority, ...
@@ -195,14 +213,23 @@ async def main(config_file: Optional[Path]) -> None:
     # Stop the simulation
     await simulation_task
 
+    if trace_recorder is not None:
+        trace_recorder.close()
+
     # simulation_task.cancel()
 
-    print("Simulation completed.")
+    print(f"Simulation completed: {event_loop.event_count} events dispatched, simulation time {event_loop.current_time:.2f}.")
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description="A script that accepts a config file.")
     parser.add_argument("--config", required=False, help="Path to the configuration file.")
+    parser.add_argument("--synchronous", action="store_true", help="Run the synchronous kernel (stops when there are no more events).")
+    parser.add_argument("--future-event-list", default="heap", choices=["heap", "calendar", "ladder"], help="Future event list implementation.")
+    parser.add_argument("--batch", action="store_true", help="Dispatch events with the same timestamp in batches per actor.")
+    parser.add_argument("--trace", required=False, help="Record a binary trace of all dispatched events to this file.")
+    parser.add_argument("--seed", type=int, default=333, help="Master seed of the random streams.")
+    parser.add_argument("--window", type=int, required=False, help="Stream arrivals, keeping at most this many scheduled ahead.")
     return parser.parse_args()
 
 
@@ -210,9 +237,9 @@ if __name__ == "__main__":
     args = parse_args()
     config_file = Path(__file__).parent / "mm1_actors_config.json"
     if args.config and Path.exists(args.config):
-        asyncio.run(main(Path(args.config)))
+        asyncio.run(main(Path(args.config), args.synchronous, args.future_event_list, args.batch, args.trace, args.window, args.seed))
     elif Path.exists(config_file):
-        asyncio.run(main(config_file))
+        asyncio.run(main(config_file, args.synchronous, args.future_event_list, args.batch, args.trace, args.window, args.seed))
     else:
         print(f"File not found: {args.config}")
-        asyncio.run(main(None))
+        asyncio.run(main(None, args.synchronous, args.future_event_list, args.batch, args.trace, args.window, args.seed))
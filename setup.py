@@ -14,15 +14,14 @@ setup(
     # packages=find_packages('src'),
     # package_dir={'': 'src'},
     install_requires=[
-        # List your project's dependencies here
-        # e.g., 'numpy>=1.18.5',
+        'numpy',
     ],
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.10',
     extras_require={
         'dev': [
             # List additional dependencies for development here
@@ -0,0 +1,28 @@
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+
+@pytest.fixture
+def quiet_logging(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Log warnings and errors only, for tests with thousands of customers: debug logging would take most of the time.
+    """
+    monkeypatch.setenv("LOGGING_LEVEL_DEFAULT", "WARNING")
+
+
+def mm1_config(tmp_path: Path, output: str = "mm1.csv", **overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    An M/M/1 queue with rho = 0.5, written to tmp_path / output. overrides update the sections, e.g.
+    mm1_config(tmp_path, Server={"min_service_time": 0.1}, DE_Arrivals={"num_arrivals": 50}).
+    """
+    config: Dict[str, Dict[str, Any]] = {
+        "Queue": {"id": "queue", "type": "FIFO", "server": "server", "entity_name": "customer"},
+        "Server": {"id": "server", "service_rate": 2.0, "entity_name": "customer"},
+        "DE_Arrivals": {"id": "arrivals", "event_rate": 1.0, "num_arrivals": 100, "destination": "queue", "entity_name": "customer"},
+        "Stats": {"id": "stats", "output_path": str(tmp_path / output), "plot": False},
+    }
+    for section, values in overrides.items():
+        config[section].update(values)
+    return config
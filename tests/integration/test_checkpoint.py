@@ -0,0 +1,85 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from abdes1.des.checkpoint import fork_checkpoint, load_checkpoint, restore_checkpoint, save_checkpoint
+from abdes1.des.stats_actor import StatsActor, read_queue_depths
+from abdes1.des.topology import build_actor_system
+from tests.integration.conftest import mm1_config
+
+
+# Arrivals generated in windows: a checkpoint has some of them still to come
+OVERRIDES: Dict[str, Dict[str, Any]] = {"DE_Arrivals": {"window": 8}}
+
+
+def stats_of(actor_system: Any) -> StatsActor:
+    stats = actor_system.find_actor("stats")
+    assert isinstance(stats, StatsActor)
+    return stats
+
+
+def test_restored_run_continues_exactly(tmp_path: Path) -> None:
+    config = mm1_config(tmp_path, **OVERRIDES)
+    full = build_actor_system(mm1_config(tmp_path, "full.csv", **OVERRIDES), seed=5)
+    asyncio.run(full.run())
+
+    first = build_actor_system(config, seed=5)
+    asyncio.run(first.run(until=40.0))
+    assert first.event_loop.current_time == 40.0
+    save_checkpoint(first, str(tmp_path / "warm.ckpt"))
+
+    restored = restore_checkpoint(load_checkpoint(str(tmp_path / "warm.ckpt")), config)
+    assert restored.event_loop.current_time == 40.0
+    asyncio.run(restored.run())
+
+    assert stats_of(restored).summary() == stats_of(full).summary()
+    # Restored with the same configuration, the CSV file of the first part is continued
+    assert (tmp_path / "mm1.csv").read_text() == (tmp_path / "full.csv").read_text()
+    assert restored.event_loop.event_count == full.event_loop.event_count  # type: ignore
+
+
+def test_restored_run_continues_the_column_store(tmp_path: Path) -> None:
+    config = mm1_config(tmp_path, "mm1", **OVERRIDES)
+    full = build_actor_system(mm1_config(tmp_path, "full", **OVERRIDES), seed=5)
+    asyncio.run(full.run())
+
+    first = build_actor_system(config, seed=5)
+    asyncio.run(first.run(until=40.0))
+    checkpoint = save_checkpoint(first, str(tmp_path / "warm.ckpt"))
+    restored = restore_checkpoint(checkpoint, config)
+    asyncio.run(restored.run())
+
+    times, depths = read_queue_depths(str(tmp_path / "mm1"))
+    full_times, full_depths = read_queue_depths(str(tmp_path / "full"))
+    assert times.tolist() == full_times.tolist()
+    assert depths.tolist() == full_depths.tolist()
+
+
+def test_forks_share_the_past_and_differ_afterwards(tmp_path: Path) -> None:
+    config = mm1_config(tmp_path, **OVERRIDES)
+    first = build_actor_system(config, seed=5)
+    asyncio.run(first.run(until=40.0))
+    checkpoint = save_checkpoint(first, str(tmp_path / "warm.ckpt"))
+    observations = stats_of(first).queue_depth.count
+
+    forks = [fork_checkpoint(checkpoint, mm1_config(tmp_path, f"fork-{seed}.csv", **OVERRIDES), seeds=[seed])[0] for seed in (1, 2)]
+    for fork in forks:
+        assert stats_of(fork).queue_depth.count == observations
+        asyncio.run(fork.run())
+    assert stats_of(forks[0]).summary() != stats_of(forks[1]).summary()
+    # The forks write to their own files, from the checkpoint on
+    assert (tmp_path / "fork-1.csv").read_text() != (tmp_path / "fork-2.csv").read_text()
+
+
+def test_restore_rejects_other_actors(tmp_path: Path) -> None:
+    config = mm1_config(tmp_path, **OVERRIDES)
+    first = build_actor_system(config, seed=5)
+    asyncio.run(first.run(until=10.0))
+    checkpoint = save_checkpoint(first, str(tmp_path / "warm.ckpt"))
+
+    config["Server"]["id"] = "other-server"
+    config["Queue"]["server"] = "other-server"
+    with pytest.raises(ValueError):
+        restore_checkpoint(checkpoint, config)
@@ -0,0 +1,44 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from abdes1.des.des_event_loop import DE_EventLoop
+from abdes1.des.parallel import LookaheadError, check_lookahead, run_parallel
+from abdes1.des.stats_actor import StatsActor
+from abdes1.des.topology import build_actor_system
+from tests.integration.conftest import mm1_config
+
+
+# A constant part of the service time: the lookahead of the server
+OVERRIDES: Dict[str, Dict[str, Any]] = {"Server": {"min_service_time": 0.1}, "DE_Arrivals": {"num_arrivals": 50}}
+
+
+def test_parallel_run_matches_sequential_run(tmp_path: Path) -> None:
+    config = mm1_config(tmp_path, **OVERRIDES)
+    sequential = build_actor_system(mm1_config(tmp_path, "sequential.csv", **OVERRIDES), DE_EventLoop(synchronous=True), seed=7)
+    asyncio.run(sequential.run())
+    expected = sequential.find_actor("stats")
+    assert isinstance(expected, StatsActor)
+
+    # The server in its own LP: the queue and the server talk across LPs in both directions
+    result = run_parallel(config, {"arrivals": 0, "queue": 0, "server": 1}, until=100.0, seed=7, timeout=60.0)
+    stats = result.actor_system.find_actor("stats")
+    assert isinstance(stats, StatsActor)
+
+    assert stats.summary() == expected.summary()
+    assert (tmp_path / "mm1.csv").read_text() == (tmp_path / "sequential.csv").read_text()
+    assert sum(summary["events"] for summary in result.lp_summaries.values()) == 3 + 3 * 50 - 1
+    assert result.lp_summaries[1]["remote_messages"] == 50
+
+
+def test_zero_lookahead_cycle_is_rejected(tmp_path: Path) -> None:
+    check_lookahead({0: {1: 0.0}, 1: {0: 0.5}})
+    with pytest.raises(LookaheadError):
+        check_lookahead({0: {1: 0.0}, 1: {2: 0.0}, 2: {0: 0.0}})
+
+    config = mm1_config(tmp_path, **OVERRIDES)
+    config["Server"]["min_service_time"] = 0.0
+    with pytest.raises(LookaheadError):
+        run_parallel(config, {"arrivals": 0, "queue": 0, "server": 1}, until=100.0, seed=7)
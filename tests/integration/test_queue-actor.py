@@ -31,12 +31,15 @@ async def test_queue_can_enqueue() -> None:
         ),
     )
 
+    # The queue's server must exist when the actor system starts
+    s.register_actor(Actor, id="dummy-server")
+
     event_loop = asyncio.get_event_loop()
     event_loop.create_task(s.run())
 
     actors = s.list_actors()
     assert actors[0].id == "q"
-    assert len(actors) == 1
+    assert len(actors) == 2
 
     a = s.find_actor("q")
     assert a is not None
@@ -0,0 +1,59 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from abdes1.des import QueueType
+from abdes1.des.checkpoint import create_checkpoint, fork_checkpoint
+from abdes1.des.topology import build_actor_system
+from tests.integration.conftest import mm1_config
+
+ATTRIBUTES = {
+    "priority": {"type": "empirical", "values": [0, 1, 2], "probabilities": [0.2, 0.3, 0.5]},
+    "processing_time": {"type": "exponential", "rate": 2.0},
+    "due_in": {"type": "exponential", "rate": 0.5},
+    "entity_class": {"type": "empirical", "values": [0, 1], "probabilities": [0.5, 0.5]},
+}
+
+
+def discipline_config(tmp_path: Path, queue_type: str, attributes: bool = True) -> Dict[str, Any]:
+    arrivals: Dict[str, Any] = {"event_rate": 1.8, "num_arrivals": 300}
+    if attributes:
+        arrivals["attributes"] = ATTRIBUTES
+    return mm1_config(tmp_path, f"{queue_type}.csv", Queue={"type": queue_type}, DE_Arrivals=arrivals)
+
+
+def run(config: Dict[str, Any]) -> Dict[str, float]:
+    actor_system = build_actor_system(config, seed=4)
+    asyncio.run(actor_system.run())
+    return actor_system.find_actor("stats").summary()  # type: ignore
+
+
+@pytest.mark.parametrize("queue_type", [queue_type.value for queue_type in QueueType])
+def test_every_discipline_serves_every_customer(tmp_path: Path, queue_type: str) -> None:
+    summary = run(discipline_config(tmp_path, queue_type))
+    fifo = run(discipline_config(tmp_path, "FIFO"))
+    # The same arrivals and service times: only the order differs, so the queue depths and the work are the same
+    assert summary["mean_queue_depth"] == pytest.approx(fifo["mean_queue_depth"])
+    assert summary["utilization"] == pytest.approx(fifo["utilization"])
+    assert summary["mean_wait_time"] == pytest.approx(fifo["mean_wait_time"])
+
+
+def test_attributes_do_not_change_the_arrivals(tmp_path: Path) -> None:
+    assert run(discipline_config(tmp_path, "FIFO")) == run(discipline_config(tmp_path, "FIFO", attributes=False))
+
+
+@pytest.mark.usefixtures("quiet_logging")
+def test_attributes_do_not_change_the_arrivals_of_a_fork(tmp_path: Path) -> None:
+    def fork(attributes: bool) -> Dict[str, float]:
+        config = discipline_config(tmp_path, "FIFO", attributes=attributes)
+        # Arrivals generated as the run goes on, more than one buffer of interarrival times after the fork
+        config["DE_Arrivals"].update(num_arrivals=1500, window=10)
+        actor_system = build_actor_system(config, seed=4)
+        asyncio.run(actor_system.run(until=50.0))
+        continuation = fork_checkpoint(create_checkpoint(actor_system), config, seeds=[7])[0]
+        asyncio.run(continuation.run())
+        return continuation.find_actor("stats").summary()  # type: ignore
+
+    assert fork(True) == fork(False)
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from abdes1.des.replications import run_replications
+
+CONFIG = {
+    "Queue": {"id": "queue", "type": "FIFO", "server": "server", "entity_name": "customer"},
+    "Server": {"id": "server", "service_rate": 2.0, "entity_name": "customer"},
+    "DE_Arrivals": {"id": "arrivals", "event_rate": 1.0, "num_arrivals": 50, "destination": "queue", "entity_name": "customer"},
+    "Stats": {"id": "stats", "output_path": "mm1.csv"},
+}
+
+
+def test_replications_run_in_parallel_with_separate_outputs(tmp_path: Path) -> None:
+    results = run_replications(CONFIG, seeds=[1, 2, 3], output_dir=str(tmp_path), max_workers=2)
+
+    assert results.seeds == [1, 2, 3]
+    assert [summary["events"] for summary in results.summaries] == [3 + 3 * 50] * 3
+    # Different seeds, different runs
+    assert len(set(results.values("stats.mean_queue_depth"))) == 3
+    for seed in (1, 2, 3):
+        assert (tmp_path / f"seed-{seed}" / "mm1.csv").exists()
+
+    ci = results.confidence_intervals()["stats.mean_queue_depth"]
+    assert ci.n == 3
+    assert ci.low < ci.mean < ci.high
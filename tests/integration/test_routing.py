@@ -0,0 +1,106 @@
+import asyncio
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from abdes1.core import MetricRecord
+from abdes1.des.topology import build_actor_system
+
+
+pytestmark = pytest.mark.usefixtures("quiet_logging")
+
+
+def station(id: str, servers: int = 1, service_rate: float = 1.0, **kwargs: Any) -> Dict[str, Any]:
+    return {"id": id, "servers": servers, "service_rate": service_rate, "entity_name": "customer", **kwargs}
+
+
+def network(tmp_path: Path, router: Dict[str, Any], stations: List[Dict[str, Any]], event_rate: float = 1.0, num_arrivals: int = 3000) -> Dict[str, Any]:
+    return {
+        "Station": stations,
+        "Router": {"id": "router", "entity_name": "customer", **router},
+        "DE_Arrivals": {"id": "arrivals", "event_rate": event_rate, "num_arrivals": num_arrivals, "destination": "router", "entity_name": "customer", "window": 100},
+        "Stats": {"id": "stats", "output_path": str(tmp_path / "network"), "plot": False},
+    }
+
+
+def run(config: Dict[str, Any], until: Any = None) -> Any:
+    actor_system = build_actor_system(config, seed=8)
+    departures: Counter = Counter()
+
+    def count(record: MetricRecord) -> None:
+        departures[record.source] += 1
+
+    actor_system.metrics.subscribe("sojourn-time", count)
+    asyncio.run(actor_system.run(until=until))
+    return actor_system, departures
+
+
+def test_probabilistic_branching(tmp_path: Path) -> None:
+    router = {"destinations": ["a", "b", "c"], "probabilities": [0.5, 0.3, 0.1]}
+    _, departures = run(network(tmp_path, router, [station("a"), station("b"), station("c")], event_rate=0.5))
+    # The remaining 0.1 leaves the network at the router
+    assert departures["a"] / 3000 == pytest.approx(0.5, abs=0.04)
+    assert departures["b"] / 3000 == pytest.approx(0.3, abs=0.04)
+    assert departures["c"] / 3000 == pytest.approx(0.1, abs=0.03)
+    assert sum(departures.values()) < 3000
+
+
+def test_round_robin(tmp_path: Path) -> None:
+    router = {"destinations": ["a", "b", "c"], "policy": "round-robin"}
+    _, departures = run(network(tmp_path, router, [station("a"), station("b"), station("c")], num_arrivals=300))
+    assert departures == {"a": 100, "b": 100, "c": 100}
+
+
+def test_join_the_shortest_queue_waits_less_than_random(tmp_path: Path) -> None:
+    stations = [station("a"), station("b")]
+    random_routing, _ = run(network(tmp_path, {"destinations": ["a", "b"]}, stations, event_rate=1.6))
+    jsq, departures = run(network(tmp_path, {"destinations": ["a", "b"], "policy": "jsq"}, stations, event_rate=1.6))
+    assert jsq.find_actor("stats").summary()["mean_wait_time"] < 0.75 * random_routing.find_actor("stats").summary()["mean_wait_time"]
+    assert sum(departures.values()) == 3000
+    # Everyone has left: the router counts nobody in the stations any more
+    assert jsq.find_actor("router").counts == [0, 0]
+
+
+def test_least_loaded_uses_the_capacity_of_stations(tmp_path: Path) -> None:
+    router = {"destinations": ["small", "large"], "policy": "least-loaded"}
+    actor_system, departures = run(network(tmp_path, router, [station("small", servers=1), station("large", servers=3)], event_rate=3.0))
+    assert actor_system.find_actor("router").capacities == [1.0, 3.0]
+    assert departures["large"] > 2 * departures["small"]
+
+
+def test_jackson_feedback_queue(tmp_path: Path) -> None:
+    # Half of the served customers come back: the arrival rate at the queue is 1 / (1 - 0.5) = 2, rho = 0.5
+    config = {
+        "Queue": {"id": "queue", "type": "FIFO", "server": "server", "entity_name": "customer"},
+        "Server": {"id": "server", "service_rate": 4.0, "entity_name": "customer", "destination": "router"},
+        "Router": {"id": "router", "entity_name": "customer", "destinations": ["queue"], "probabilities": [0.5]},
+        "DE_Arrivals": {"id": "arrivals", "event_rate": 1.0, "num_arrivals": 2000, "destination": "queue", "entity_name": "customer", "window": 100},
+        "Stats": {"id": "stats", "output_path": str(tmp_path / "jackson"), "plot": False},
+    }
+    actor_system, departures = run(config)
+    summary = actor_system.find_actor("stats").summary()
+    assert summary["utilization"] == pytest.approx(0.5, abs=0.05)
+    # M/M/1 with rho = 0.5: mean number waiting rho^2 / (1 - rho)
+    assert summary["mean_queue_depth"] == pytest.approx(0.5, rel=0.3)
+    assert departures["queue"] / 2000 == pytest.approx(2.0, rel=0.1)
+
+
+def test_closed_network_keeps_its_population(tmp_path: Path) -> None:
+    config = {
+        "Station": [station("a", destination="router"), station("b", servers=2, destination="a")],
+        "Router": {"id": "router", "entity_name": "customer", "destinations": ["a", "b"], "probabilities": [0.3, 0.7]},
+        "DE_Arrivals": {"id": "arrivals", "event_rate": 10.0, "num_arrivals": 6, "destination": "a", "entity_name": "customer"},
+        "Stats": {"id": "stats", "output_path": str(tmp_path / "closed"), "plot": False},
+    }
+    actor_system, departures = run(config, until=500.0)
+    a, b = actor_system.find_actor("a"), actor_system.find_actor("b")
+    assert a.busy + len(a.queue) + b.busy + len(b.queue) == 6
+    # Station a serves about one customer per unit of time
+    assert departures["a"] > 300
+
+
+def test_unknown_policy_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        build_actor_system({"Router": {"id": "router", "entity_name": "customer", "destinations": ["a"], "policy": "shortest"}})
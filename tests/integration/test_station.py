@@ -0,0 +1,71 @@
+import asyncio
+import math
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from abdes1.des.station_actor import StationActor
+from abdes1.des.topology import build_actor_system
+
+
+pytestmark = pytest.mark.usefixtures("quiet_logging")
+
+
+def station_config(tmp_path: Path, servers: int, event_rate: float, num_arrivals: int) -> Dict[str, Any]:
+    return {
+        "Station": {"id": "server", "servers": servers, "service_rate": 1.0, "entity_name": "customer"},
+        "DE_Arrivals": {"id": "arrivals", "event_rate": event_rate, "num_arrivals": num_arrivals, "destination": "server", "entity_name": "customer", "window": 100},
+        "Stats": {"id": "stats", "output_path": str(tmp_path / "station"), "plot": False},
+    }
+
+
+def run(config: Dict[str, Any], seed: int = 2) -> Any:
+    actor_system = build_actor_system(config, seed=seed)
+    asyncio.run(actor_system.run())
+    return actor_system
+
+
+def erlang_c_wait(servers: int, arrival_rate: float, service_rate: float) -> float:
+    # Mean wait in the line of an M/M/c queue
+    a = arrival_rate / service_rate
+    rho = a / servers
+    top = a**servers / math.factorial(servers) / (1 - rho)
+    p_wait = top / (sum(a**k / math.factorial(k) for k in range(servers)) + top)
+    return p_wait / (servers * service_rate - arrival_rate)
+
+
+def test_one_server_station_is_the_mm1_queue(tmp_path: Path) -> None:
+    mm1 = {
+        "Queue": {"id": "queue", "type": "FIFO", "server": "server", "entity_name": "customer"},
+        "Server": {"id": "server", "service_rate": 1.0, "entity_name": "customer"},
+        "DE_Arrivals": {"id": "arrivals", "event_rate": 0.8, "num_arrivals": 500, "destination": "queue", "entity_name": "customer", "window": 100},
+        "Stats": {"id": "stats", "output_path": str(tmp_path / "mm1"), "plot": False},
+    }
+    queue = run(mm1).find_actor("stats").summary()
+    station = run(station_config(tmp_path, servers=1, event_rate=0.8, num_arrivals=500)).find_actor("stats").summary()
+    # The same arrivals and the same service times, in the same order
+    for name in ("mean_wait_time", "max_wait_time", "mean_sojourn_time", "max_sojourn_time"):
+        assert station[name] == pytest.approx(queue[name])
+
+
+def test_mmc_wait_matches_erlang_c(tmp_path: Path) -> None:
+    summary = run(station_config(tmp_path, servers=5, event_rate=4.0, num_arrivals=8000)).find_actor("stats").summary()
+    assert summary["mean_wait_time"] == pytest.approx(erlang_c_wait(5, 4.0, 1.0), rel=0.25)
+    assert summary["utilization"] == pytest.approx(0.8, abs=0.03)
+
+
+def test_large_pool_is_one_actor(tmp_path: Path) -> None:
+    actor_system = run(station_config(tmp_path, servers=2000, event_rate=1800.0, num_arrivals=3000))
+    station = actor_system.find_actor("server")
+    assert isinstance(station, StationActor)
+    assert [actor.id for actor in actor_system.list_actors()] == ["server", "arrivals", "stats"]
+    # Everyone has been served and every server is idle again
+    assert station.busy == 0 and len(station.idle) == 2000 and len(station.queue) == 0
+    # arrivals and completions, one start, the refills of the window and save-stats
+    assert actor_system.event_loop.event_count == 2 * 3000 + 1 + 3000 // 100 - 1 + 1  # type: ignore
+
+
+def test_station_needs_a_server() -> None:
+    with pytest.raises(ValueError):
+        build_actor_system({"Station": {"id": "pool", "servers": 0, "service_rate": 1.0, "entity_name": "customer"}})
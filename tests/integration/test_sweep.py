@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+from abdes1.des.sweep import apply_point, cache_key, grid, latin_hypercube, run_sweep
+
+CONFIG = {
+    "Queue": {"id": "queue", "type": "FIFO", "server": "server", "entity_name": "customer"},
+    "Server": {"id": "server", "service_rate": 2.0, "entity_name": "customer"},
+    "DE_Arrivals": {"id": "arrivals", "event_rate": 1.0, "num_arrivals": 30, "destination": "queue", "entity_name": "customer"},
+    "Stats": {"id": "stats", "output_path": "mm1.csv"},
+}
+
+
+def test_designs() -> None:
+    points = grid({"Server.service_rate": [2.0, 3.0], "DE_Arrivals.event_rate": [0.5, 1.0, 1.5]})
+    assert len(points) == 6
+    assert points[1] == {"Server.service_rate": 2.0, "DE_Arrivals.event_rate": 1.0}
+
+    n = 8
+    points = latin_hypercube({"Server.service_rate": (2.0, 4.0), "DE_Arrivals.event_rate": (0.0, 1.0)}, n, seed=1)
+    # One point per stratum in every dimension
+    assert sorted(int((p["Server.service_rate"] - 2.0) / 2.0 * n) for p in points) == list(range(n))
+    assert sorted(int(p["DE_Arrivals.event_rate"] * n) for p in points) == list(range(n))
+
+    with pytest.raises(KeyError):
+        apply_point(CONFIG, {"Server.sevrice_rate": 1.0})
+
+
+def test_cache_key_ignores_key_order() -> None:
+    reordered = {section: dict(reversed(list(values.items()))) for section, values in reversed(list(CONFIG.items()))}
+    assert cache_key(CONFIG, 1) == cache_key(reordered, 1)
+    assert cache_key(CONFIG, 1) != cache_key(CONFIG, 2)
+
+
+def test_sweep_reuses_cached_results(tmp_path: Path) -> None:
+    points = grid({"Server.service_rate": [2.0, 3.0]})
+    first = run_sweep(CONFIG, points, seeds=[1, 2], output_dir=str(tmp_path), max_workers=2)
+    assert [(r.point["Server.service_rate"], r.seed, r.cached) for r in first] == [(2.0, 1, False), (2.0, 2, False), (3.0, 1, False), (3.0, 2, False)]
+
+    # One more point: only its runs are new
+    second = run_sweep(CONFIG, points + [{"Server.service_rate": 4.0}], seeds=[1, 2], output_dir=str(tmp_path), max_workers=2)
+    assert [r.cached for r in second] == [True] * 4 + [False] * 2
+    assert [r.summary for r in second[:4]] == [r.summary for r in first]
+
+
+def test_sweep_caches_the_runs_that_do_not_fail(tmp_path: Path) -> None:
+    points = [{"Queue.type": "FIFO"}, {"Queue.type": "Nope"}, {"Queue.type": "LIFO"}]
+    # A generator of seeds: every point runs with both
+    with pytest.raises(ValueError):
+        run_sweep(CONFIG, points, seeds=(seed for seed in [1, 2]), output_dir=str(tmp_path), max_workers=2)
+
+    results = run_sweep(CONFIG, [points[0], points[2]], seeds=(seed for seed in [1, 2]), output_dir=str(tmp_path), max_workers=2)
+    assert [(r.point["Queue.type"], r.seed, r.cached) for r in results] == [("FIFO", 1, True), ("FIFO", 2, True), ("LIFO", 1, True), ("LIFO", 2, True)]
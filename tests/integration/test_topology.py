@@ -0,0 +1,77 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from abdes1.__main__ import main
+from abdes1.des import DE_EventLoop
+from abdes1.des.topology import build_actor_system
+
+CONFIG = {
+    "Queue": {"id": "queue", "type": "FIFO", "server": "server", "entity_name": "customer"},
+    "Server": {"id": "server", "service_rate": 1.8, "entity_name": "customer"},
+    "DE_Arrivals": {"id": "arrivals", "event_rate": 1.8, "num_arrivals": 20, "destination": "queue", "entity_name": "customer"},
+    "Stats": {"id": "stats", "output_path": "mm1_actors.csv"},
+}
+
+
+async def test_build_and_run_mm1(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    event_loop = DE_EventLoop(synchronous=True)
+    actor_system = build_actor_system(CONFIG, event_loop)
+    assert [actor.id for actor in actor_system.list_actors()] == ["queue", "server", "arrivals", "stats"]
+
+    await actor_system.run()
+
+    # server-ready + start + save-stats, and per customer: arrival, start of service, server-ready
+    assert event_loop.event_count == 3 + 3 * 20
+    assert (tmp_path / "mm1_actors.csv").exists()
+    # Plotted in a worker process
+    plot_process = actor_system.find_actor("stats").plot_process  # type: ignore
+    plot_process.join(timeout=8)
+    assert plot_process.exitcode == 0
+    assert (tmp_path / "queue_depth_mm1_actors.png").exists()
+
+
+def test_plot_a_window_of_a_column_store(tmp_path: Path) -> None:
+    config = dict(CONFIG, Stats={"id": "stats", "output_path": str(tmp_path / "mm1"), "plot": False})
+    actor_system = build_actor_system(config, seed=1)
+    asyncio.run(actor_system.run())
+
+    main(["plot", str(tmp_path / "mm1"), "--window", "2:6", "--pixels", "50"])
+    assert (tmp_path / "queue_depth_mm1_2-6.png").exists()
+    assert (tmp_path / "mm1" / "pyramid" / "pyramid.json").exists()
+
+
+def test_unknown_section_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        build_actor_system({**CONFIG, "Sevrer": {}})
+
+
+def test_import_has_no_side_effects(tmp_path: Path) -> None:
+    code = "import sys, abdes1, abdes1.des, abdes1.des.topology; assert 'matplotlib' not in sys.modules and 'numpy' not in sys.modules"
+    root = Path(__file__).resolve().parents[2]
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env={"PYTHONPATH": str(root)}, check=True)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.usefixtures("quiet_logging")
+async def test_stats_actor_stops_the_run_at_the_target_precision(tmp_path: Path) -> None:
+    config = {
+        "Queue": {"id": "queue", "type": "FIFO", "server": "server", "entity_name": "customer"},
+        "Server": {"id": "server", "service_rate": 2.0, "entity_name": "customer"},
+        "DE_Arrivals": {"id": "arrivals", "event_rate": 1.0, "num_arrivals": 1000000, "destination": "queue", "entity_name": "customer", "window": 100},
+        "Stats": {"id": "stats", "output_path": str(tmp_path / "mm1.csv"), "plot": False, "steady_state": {"metric": "wait-time", "relative_half_width": 0.15}},
+    }
+    actor_system = build_actor_system(config, seed=3)
+    await actor_system.run()
+
+    # Stopped long before the million customers
+    assert actor_system.event_loop.event_count < 300000  # type: ignore
+    summary = actor_system.find_actor("stats").summary()  # type: ignore
+    assert summary["steady_half_width_wait_time"] <= 0.15 * summary["steady_mean_wait_time"]
+    # M/M/1 with rho = 0.5: the mean wait in the queue is rho / (mu - lambda) = 0.5
+    assert abs(summary["steady_mean_wait_time"] - 0.5) < 0.15
+    assert (tmp_path / "mm1.csv").exists()
@@ -1,4 +1,4 @@
-# import pytest
+import pytest
 
 from abdes1.actors import Actor
 from abdes1.core import ActorSystem, EventLoop
@@ -15,3 +15,23 @@ def test_actors() -> None:
     assert actor1 in actors
     assert actor2 in actors
     assert len(actors) == 2
+
+
+def test_registry_rejects_duplicate_ids() -> None:
+    actor_system = ActorSystem(EventLoop())
+    actor_system.register_actor(Actor, id="actor1")
+    with pytest.raises(ValueError):
+        actor_system.register_actor(Actor, id="actor1")
+    assert len(actor_system.list_actors()) == 1
+
+
+def test_resolve_returns_the_registered_address() -> None:
+    actor_system = ActorSystem(EventLoop())
+    actor_system.register_actor(Actor, id="actor1")
+    actor1 = actor_system.find_actor("actor1")
+    address = actor_system.resolve("actor1")
+    assert address.actor is actor1
+    assert actor1 is not None and actor1.address is address
+    with pytest.raises(ValueError):
+        actor_system.resolve("nobody")
+    assert actor_system.find_actor("nobody") is None
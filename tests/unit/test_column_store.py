@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import numpy as np
+
+from abdes1.utils.column_store import ColumnWriter, read_columns, read_meta
+
+COLUMNS = {"time": "<f8", "queue_depth": "<i8"}
+
+
+def test_rows_are_flushed_in_chunks(tmp_path: Path) -> None:
+    path = str(tmp_path / "store")
+    writer = ColumnWriter(path, COLUMNS, chunk_size=4)
+    for i in range(10):
+        writer.append(i * 0.5, i)
+    # Two full chunks are on disk, the last two rows are still in memory
+    assert read_meta(path)["rows"] == 8
+    assert writer.size == 10
+    writer.close()
+
+    columns = read_columns(path)
+    assert isinstance(columns["time"], np.memmap)
+    assert columns["time"].tolist() == [i * 0.5 for i in range(10)]
+    assert columns["queue_depth"].dtype == np.int64
+    assert columns["queue_depth"].tolist() == list(range(10))
+
+
+def test_empty_store(tmp_path: Path) -> None:
+    path = str(tmp_path / "store")
+    ColumnWriter(path, COLUMNS).close()
+    assert len(read_columns(path)["time"]) == 0
+
+
+def test_resume_truncates_to_the_rows_kept(tmp_path: Path) -> None:
+    path = str(tmp_path / "store")
+    writer = ColumnWriter(path, COLUMNS, chunk_size=3)
+    for i in range(7):
+        writer.append(float(i), i)
+    writer.close()
+
+    writer = ColumnWriter(path, COLUMNS, chunk_size=3, resume_rows=5)
+    writer.append(50.0, 50)
+    writer.close()
+    assert read_columns(path)["queue_depth"].tolist() == [0, 1, 2, 3, 4, 50]
+
+    # Not enough rows to resume from: a new store
+    writer = ColumnWriter(path, COLUMNS, resume_rows=100)
+    writer.append(1.0, 1)
+    writer.close()
+    assert read_columns(path)["queue_depth"].tolist() == [1]
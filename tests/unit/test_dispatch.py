@@ -0,0 +1,51 @@
+from typing import List
+
+import pytest
+
+from abdes1.actors import Message, UnknownMessageType, handler
+from abdes1.core import ActorSystem, Event
+from abdes1.des import DE_Actor, DE_EventLoop
+
+
+class PingActor(DE_Actor):
+    def __init__(self, id: str, actor_system: ActorSystem) -> None:
+        super().__init__(id, actor_system)
+        self.log: List[str] = []
+        self.register_handler("customer", self.on_customer)
+
+    @handler("ping")
+    async def on_ping(self, message: Message) -> None:
+        self.log.append(f"ping {message.content}")
+
+    async def on_customer(self, message: Message) -> None:
+        self.log.append(f"customer {message.content}")
+
+
+class PingPongActor(PingActor):
+    @handler("pong")
+    async def on_pong(self, message: Message) -> None:
+        self.log.append(f"pong {message.content}")
+
+
+async def test_handlers_are_inherited_and_registered_per_instance() -> None:
+    s = ActorSystem(DE_EventLoop(synchronous=True))
+    s.register_actor(PingPongActor, id="pp")
+    for t, content in [("ping", "1"), ("pong", "2"), ("customer", "3")]:
+        s.schedule_event(Event(time=1.0, message=Message(type=t, from_id="pytest", to_id="pp", content=content)))
+
+    await s.run()
+
+    actor = s.find_actor("pp")
+    assert isinstance(actor, PingPongActor)
+    assert actor.log == ["ping 1", "pong 2", "customer 3"]
+    assert PingActor.handler_table == {"ping": "on_ping"}
+
+
+async def test_unknown_message_type_is_rejected() -> None:
+    s = ActorSystem(DE_EventLoop(synchronous=True))
+    s.register_actor(PingActor, id="p")
+    actor = s.find_actor("p")
+    assert actor is not None
+
+    with pytest.raises(UnknownMessageType):
+        await actor.receive(Message(type="pong", from_id="pytest", to_id="p", content=None))
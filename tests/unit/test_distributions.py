@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from abdes1.utils.distributions import AliasTable, create_distribution
+from abdes1.utils.random_generators import RandomStreams
+
+SPECS = [
+    {"type": "exponential", "rate": 2.0},
+    {"type": "erlang", "k": 3, "rate": 2.0},
+    {"type": "hyperexponential", "probabilities": [0.25, 0.75], "rates": [0.5, 4.0]},
+    {"type": "lognormal", "mu": 0.0, "sigma": 0.5},
+    {"type": "weibull", "shape": 1.5, "scale": 2.0},
+    {"type": "empirical", "values": [0.5, 1.0, 2.0], "probabilities": [0.2, 0.5, 0.3]},
+    {"type": "deterministic", "value": 1.5},
+]
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=[spec["type"] for spec in SPECS])
+def test_sample_mean_matches_distribution_mean(spec: dict) -> None:
+    distribution = create_distribution(spec, RandomStreams(1).stream("test"))
+    n = 20000
+    sample_mean = sum(distribution.next() for _ in range(n)) / n
+    assert sample_mean == pytest.approx(distribution.mean, rel=0.05)
+    assert distribution.next() >= distribution.minimum
+
+
+def test_streams_are_reproducible_and_independent_of_creation_order() -> None:
+    a = RandomStreams(42)
+    b = RandomStreams(42)
+    b.stream("server")
+    assert a.stream("arrivals").random(5).tolist() == b.stream("arrivals").random(5).tolist()
+    assert a.stream("server").random() != a.stream("arrivals").random()
+    assert RandomStreams(43).stream("arrivals").random() != RandomStreams(42).stream("arrivals").random()
+
+
+def test_names_with_the_same_crc32_get_different_streams() -> None:
+    streams = RandomStreams(42)
+    # zlib.crc32 maps both names to 1306201125
+    assert streams.stream("plumless").random(5).tolist() != streams.stream("buckeroo").random(5).tolist()
+
+
+def test_unknown_distribution_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        create_distribution({"type": "pareto"}, RandomStreams(1).stream("test"))
+
+
+def test_set_state_replays_the_same_variates() -> None:
+    distribution = create_distribution({"type": "exponential", "rate": 2.0}, RandomStreams(1).stream("test"))
+    distribution.buffer_size = 4
+    distribution.next()
+    state = distribution.get_state()
+    # Past the end of the buffer, so the random stream is drawn from again
+    first = [distribution.next() for _ in range(10)]
+    distribution.set_state(state)
+    assert [distribution.next() for _ in range(10)] == first
+
+
+def test_alias_table_draws_with_the_weights() -> None:
+    weights = [5.0, 0.0, 1.0, 2.0, 2.0] * 40
+    table = AliasTable(RandomStreams(1).stream("test"), weights)
+    n = 200000
+    counts = np.bincount([table.next() for _ in range(n)], minlength=len(weights))
+    expected = np.asarray(weights) / sum(weights) * n
+    assert counts[1] == 0
+    assert np.abs(counts - expected).max() < 6 * np.sqrt(expected.max())
+
+
+def test_alias_table_mean_is_the_weighted_index() -> None:
+    weights = [5.0, 0.0, 1.0, 2.0, 2.0] * 40
+    table = AliasTable(RandomStreams(1).stream("test"), weights)
+    assert table.mean == pytest.approx(np.dot(np.arange(len(weights)), weights) / sum(weights))
+
+
+def test_alias_table_rejects_bad_weights() -> None:
+    with pytest.raises(ValueError):
+        AliasTable(RandomStreams(1).stream("test"), [0.0, 0.0])
@@ -0,0 +1,99 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from abdes1.utils.column_store import ColumnWriter, read_columns
+from abdes1.utils.downsampling import Pyramid, lttb, min_max
+
+
+def random_walk(n: int, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.maximum(np.cumsum(rng.choice([-1, 1], n)), 0).astype(np.int64)
+
+
+def test_min_max_keeps_the_extremes_of_every_column() -> None:
+    times = np.arange(100, dtype=np.float64)
+    values = random_walk(100)
+    x, low, high = min_max(times, values, values, 10)
+    assert len(x) == 10
+    assert x.tolist() == [float(10 * i) for i in range(10)]
+    assert low.tolist() == [values[10 * i : 10 * i + 10].min() for i in range(10)]
+    assert high.tolist() == [values[10 * i : 10 * i + 10].max() for i in range(10)]
+
+
+def test_min_max_leaves_out_empty_columns() -> None:
+    times = np.array([0.0, 1.0, 9.0, 10.0])
+    values = np.array([1, 2, 3, 4])
+    x, low, high = min_max(times, values, values, 10)
+    assert x.tolist() == [0.0, 1.0, 9.0]
+    assert high.tolist() == [1, 2, 4]
+
+
+def test_lttb_keeps_the_ends_and_the_peak() -> None:
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[437] = 50.0
+    sampled_x, sampled_y = lttb(x, y, 20)
+    assert len(sampled_x) == 20
+    assert sampled_x[0] == 0.0 and sampled_x[-1] == 999.0
+    assert 50.0 in sampled_y.tolist()
+    assert np.all(np.diff(sampled_x) > 0)
+
+
+def test_pyramid_window_reads_a_coarse_level(tmp_path: Path) -> None:
+    n = 100_000
+    values = random_walk(n)
+    path = str(tmp_path / "store")
+    writer = ColumnWriter(path, {"time": "<f8", "queue_depth": "<i8"})
+    writer.extend(np.arange(n, dtype=np.float64), values)
+    writer.close()
+    columns = read_columns(path)
+    times, values = columns["time"], columns["queue_depth"]
+
+    pyramid = Pyramid(times, values, factor=4, min_buckets=100)
+    assert [len(level[0]) for level in pyramid.levels] == [n, 25_000, 6_250, 1_563, 391]
+    x, low, high = pyramid.window(0.0, float(n), 100)
+    assert len(x) == 100
+    assert high.max() == values.max() and low.min() == values.min()
+
+    # A zoom gets the raw rows if no level has enough buckets in the window
+    x, low, high = pyramid.window(500.0, 549.0, 100)
+    assert x.tolist() == list(range(500, 550))
+    assert high.tolist() == values[500:550].tolist()
+
+    pyramid.save(path)
+    loaded = Pyramid.load(path, times, values)
+    assert loaded is not None
+    for level, loaded_level in zip(pyramid.levels, loaded.levels):
+        for array, loaded_array in zip(level, loaded_level):
+            assert np.array_equal(array, loaded_array)
+    # Out of date once the series has more rows
+    assert Pyramid.load(path, times[:-1], values[:-1]) is None
+
+
+def test_rerun_into_the_same_store_drops_the_pyramid(tmp_path: Path) -> None:
+    # Two runs with different seeds and the same number of rows, e.g. a station run with another seed
+    n = 4000
+    path = str(tmp_path / "store")
+
+    def run(seed: int) -> Pyramid:
+        writer = ColumnWriter(path, {"time": "<f8", "queue_depth": "<i8"})
+        writer.extend(np.arange(n, dtype=np.float64), random_walk(n, seed))
+        writer.close()
+        columns = read_columns(path)
+        return Pyramid(columns["time"], columns["queue_depth"], factor=4, min_buckets=100)
+
+    run(1).save(path)
+    shutil.copytree(tmp_path / "store" / "pyramid", tmp_path / "saved")
+    second = run(2)
+    assert not (tmp_path / "store" / "pyramid").exists()
+    columns = read_columns(path)
+    assert Pyramid.load(path, columns["time"], columns["queue_depth"]) is None
+
+    # Even a pyramid left behind has the generation of the first run
+    shutil.copytree(tmp_path / "saved", tmp_path / "store" / "pyramid")
+    assert Pyramid.load(path, columns["time"], columns["queue_depth"]) is None
+    second.save(path)
+    loaded = Pyramid.load(path, columns["time"], columns["queue_depth"])
+    assert loaded is not None and np.array_equal(loaded.levels[1][2], second.levels[1][2])
@@ -0,0 +1,120 @@
+from typing import List, Tuple
+
+import pytest
+
+from abdes1.actors import Message
+from abdes1.core import ActorSystem, Event, EventHandle, MetricRecord
+from abdes1.des import DE_Actor, DE_EventLoop, QueueActor, QueueType
+
+
+class RecordingActor(DE_Actor):
+    def __init__(self, id: str, actor_system: ActorSystem) -> None:
+        super().__init__(id, actor_system)
+        self.received: List[Tuple[float, str]] = []
+
+    async def process_message(self, message: Message) -> None:
+        assert message.time is not None
+        self.received.append((message.time, message.content))
+        await super().process_message(message)
+
+
+def schedule(actor_system: ActorSystem, time: float, content: str, priority: int = 0) -> EventHandle:
+    message = Message(type="test", from_id="pytest", to_id="recorder", content=content)
+    return actor_system.schedule_event(Event(time=time, message=message, priority=priority))
+
+
+async def test_synchronous_kernel_orders_ties_fifo() -> None:
+    s = ActorSystem(DE_EventLoop(synchronous=True))
+    s.register_actor(RecordingActor, id="recorder")
+
+    schedule(s, 2.0, "c")
+    schedule(s, 1.0, "a")
+    schedule(s, 2.0, "d")
+    schedule(s, 1.0, "b")
+    schedule(s, 2.0, "urgent", priority=-1)
+
+    # The synchronous kernel returns once the future event list is empty
+    await s.run()
+
+    recorder = s.find_actor("recorder")
+    assert isinstance(recorder, RecordingActor)
+    assert recorder.received == [(1.0, "a"), (1.0, "b"), (2.0, "urgent"), (2.0, "c"), (2.0, "d")]
+    assert s.event_loop.current_time == 2.0  # type: ignore
+
+
+async def test_cancelled_events_are_not_dispatched() -> None:
+    s = ActorSystem(DE_EventLoop(synchronous=True))
+    s.register_actor(RecordingActor, id="recorder")
+
+    schedule(s, 1.0, "a")
+    timeout = schedule(s, 2.0, "timeout")
+    schedule(s, 3.0, "b")
+
+    assert timeout.pending
+    assert timeout.cancel()
+    assert timeout.cancelled
+    assert not timeout.cancel()
+
+    await s.run()
+
+    recorder = s.find_actor("recorder")
+    assert isinstance(recorder, RecordingActor)
+    assert recorder.received == [(1.0, "a"), (3.0, "b")]
+    assert s.event_loop.event_count == 2  # type: ignore
+
+
+class BatchRecordingActor(RecordingActor):
+    def __init__(self, id: str, actor_system: ActorSystem) -> None:
+        super().__init__(id, actor_system)
+        self.batches: List[List[str]] = []
+
+    async def receive_batch(self, messages: List[Message]) -> None:
+        self.batches.append([message.content for message in messages])
+        await super().receive_batch(messages)
+
+
+async def test_batch_dispatch_groups_same_time_events_by_actor() -> None:
+    s = ActorSystem(DE_EventLoop(synchronous=True, batch=True))
+    s.register_actor(BatchRecordingActor, id="recorder")
+    s.register_actor(BatchRecordingActor, id="other")
+
+    schedule(s, 1.0, "a1")
+    s.schedule_event(Event(time=1.0, message=Message(type="test", from_id="pytest", to_id="other", content="b1")))
+    schedule(s, 1.0, "a2")
+    schedule(s, 2.0, "a3")
+
+    await s.run()
+
+    recorder = s.find_actor("recorder")
+    other = s.find_actor("other")
+    assert isinstance(recorder, BatchRecordingActor) and isinstance(other, BatchRecordingActor)
+    assert recorder.batches == [["a1", "a2"], ["a3"]]
+    assert other.batches == [["b1"]]
+    assert recorder.received == [(1.0, "a1"), (1.0, "a2"), (2.0, "a3")]
+    assert s.event_loop.event_count == 4  # type: ignore
+
+
+async def test_unknown_reference_fails_before_the_first_event() -> None:
+    s = ActorSystem(DE_EventLoop(synchronous=True))
+    s.register_actor(QueueActor, id="queue", type=QueueType.FIFO, server="no-such-server", entity_name="customer")
+
+    with pytest.raises(ValueError):
+        await s.run()
+    assert s.event_loop.event_count == 0  # type: ignore
+
+
+async def test_metrics_are_recorded_without_events() -> None:
+    s = ActorSystem(DE_EventLoop(synchronous=True))
+    s.register_actor(QueueActor, id="queue", type=QueueType.FIFO, server="server", entity_name="customer")
+    s.register_actor(RecordingActor, id="server")
+    records: List[MetricRecord] = []
+    s.metrics.subscribe("queue-depth", records.append)
+
+    for time in (1.0, 2.0, 3.0):
+        s.schedule_event(Event(time=time, message=Message(type="customer", from_id="pytest", to_id="queue", content=f"c{time}")))
+
+    await s.run()
+
+    # Only the arrivals go through the future event list, the queue depths don't
+    assert s.event_loop.event_count == 3  # type: ignore
+    assert [(r.time, r.source, r.value) for r in records] == [(1.0, "queue", 1), (2.0, "queue", 2), (3.0, "queue", 3)]
@@ -0,0 +1,113 @@
+import random
+from heapq import heapify, heappop, heappush
+from typing import Any, List
+
+import pytest
+
+from abdes1.actors import Message
+from abdes1.core import BinaryHeap, CalendarQueue, Event, FutureEventList, LadderQueue
+
+IMPLEMENTATIONS = [BinaryHeap, CalendarQueue, LadderQueue]
+
+
+def entry(time: float, seq: int, priority: int = 0) -> Any:
+    # The event itself is never compared, the sequence number is unique
+    return (time, priority, seq, Event(time=time, message=Message(type="test", content=seq, from_id="pytest", to_id="pytest")))
+
+
+@pytest.mark.parametrize("fel_class", IMPLEMENTATIONS)
+def test_pops_in_time_then_fifo_order(fel_class: Any) -> None:
+    fel: FutureEventList = fel_class()
+    r = random.Random(1)
+    entries = [entry(float(r.randint(0, 50)), seq) for seq in range(2000)]
+    for e in entries:
+        fel.push(e)
+
+    assert len(fel) == 2000
+    popped = [fel.pop() for _ in range(len(entries))]
+    assert popped == sorted(entries)
+    assert not fel
+    with pytest.raises(IndexError):
+        fel.pop()
+
+
+@pytest.mark.parametrize("fel_class", IMPLEMENTATIONS)
+def test_hold_model(fel_class: Any) -> None:
+    # Classic hold model: pop the next event and schedule a new one a random increment later
+    fel: FutureEventList = fel_class()
+    r = random.Random(2)
+    seq = 0
+    reference: List[Any] = []
+    for _ in range(5000):
+        e = entry(r.expovariate(1.0), seq)
+        fel.push(e)
+        reference.append(e)
+        seq += 1
+    heapify(reference)
+
+    now = 0.0
+    for _ in range(20000):
+        assert fel.peek() == reference[0]
+        e = fel.pop()
+        assert e == heappop(reference)
+        assert e[0] >= now
+        now = e[0]
+        # bursts of same time events and far future events
+        increments = [0.0] if r.random() < 0.1 else [r.expovariate(1.0) * (1000.0 if r.random() < 0.01 else 1.0)]
+        for increment in increments:
+            new = entry(now + increment, seq)
+            seq += 1
+            fel.push(new)
+            heappush(reference, new)
+
+    assert len(fel) == len(reference)
+
+
+@pytest.mark.parametrize("fel_class", IMPLEMENTATIONS)
+def test_same_time_entries_pop_in_priority_order(fel_class: Any) -> None:
+    fel: FutureEventList = fel_class()
+    for seq, time in enumerate([0.0, 5.0, 10.0]):
+        fel.push(entry(time, seq))
+    assert fel.pop() == entry(0.0, 0)
+    # Same time as the latest event already scheduled, but first by priority
+    fel.push(entry(10.0, 3, priority=-1))
+    assert [fel.pop() for _ in range(3)] == [entry(5.0, 1), entry(10.0, 3, priority=-1), entry(10.0, 2)]
+
+    # Many ties: integer times and priorities
+    r = random.Random(3)
+    reference: List[Any] = []
+    seq = 0
+    for _ in range(500):
+        e = entry(float(r.randint(0, 20)), seq, r.randint(-2, 2))
+        seq += 1
+        fel.push(e)
+        heappush(reference, e)
+    for _ in range(5000):
+        e = fel.pop()
+        assert e == heappop(reference)
+        new = entry(e[0] + r.randint(0, 3), seq, r.randint(-2, 2))
+        seq += 1
+        fel.push(new)
+        heappush(reference, new)
+
+
+@pytest.mark.parametrize("fel_class", IMPLEMENTATIONS)
+def test_cancelled_entries_are_skipped_and_compacted(fel_class: Any) -> None:
+    fel: FutureEventList = fel_class()
+    r = random.Random(3)
+    entries = [entry(r.uniform(0.0, 100.0), seq) for seq in range(5000)]
+    for e in entries:
+        fel.push(e)
+
+    cancelled = set(r.sample(range(5000), 4000))
+    for seq in cancelled:
+        fel.cancel(entries[seq][3])
+
+    assert len(fel) == 1000
+    # More than half of the entries were tombstones, so the list compacted itself
+    assert fel._stored < 5000  # type: ignore
+
+    live = sorted(e for e in entries if e[2] not in cancelled)
+    assert fel.peek() == live[0]
+    assert [fel.pop() for _ in range(len(live))] == live
+    assert not fel
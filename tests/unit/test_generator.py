@@ -0,0 +1,43 @@
+from typing import List, Optional, Tuple
+
+from abdes1.actors import Message
+from abdes1.core import ActorSystem, Event
+from abdes1.des import DE_Actor, DE_EventLoop, Generator
+
+
+class Sink(DE_Actor):
+    def __init__(self, id: str, actor_system: ActorSystem) -> None:
+        super().__init__(id, actor_system)
+        self.arrivals: List[Tuple[float, str]] = []
+        self.max_pending = 0
+
+    async def process_message(self, message: Message) -> None:
+        assert message.time is not None
+        self.arrivals.append((message.time, message.content))
+        self.max_pending = max(self.max_pending, len(self.actor_system.event_loop.future_event_list))  # type: ignore
+
+
+async def generate(window: Optional[int]) -> Tuple[Sink, DE_EventLoop]:
+    event_loop = DE_EventLoop(synchronous=True)
+    s = ActorSystem(event_loop, seed=333)
+    s.register_actor(Generator, id="arrivals", event_rate=2.0, duration=None, num_arrivals=100, destination="sink", entity_name="customer", window=window)
+    s.register_actor(Sink, id="sink")
+    s.register_actor(Sink, id="stats")
+    s.schedule_event(Event(time=0.0, message=Message(type="start", from_id="pytest", to_id="arrivals", content=None)))
+    await s.run()
+    sink = s.find_actor("sink")
+    assert isinstance(sink, Sink)
+    return sink, event_loop
+
+
+async def test_streaming_generator_matches_up_front_generation() -> None:
+    up_front, _ = await generate(window=None)
+    streamed, event_loop = await generate(window=3)
+
+    assert len(streamed.arrivals) == 100
+    assert streamed.arrivals == up_front.arrivals
+    assert up_front.max_pending == 100
+    # the rest of the window, the refill event and save-stats at most
+    assert streamed.max_pending <= 3 + 1
+    # save-stats is still scheduled 10 time units after the last arrival
+    assert event_loop.current_time == streamed.arrivals[-1][0] + 10.0
@@ -0,0 +1,24 @@
+import random
+
+from abdes1.utils.indexed_heap import IndexedHeap
+
+
+def test_minimum_follows_every_update() -> None:
+    rng = random.Random(5)
+    keys = [float(rng.randint(0, 20)) for _ in range(300)]
+    heap = IndexedHeap(keys)
+    for _ in range(5000):
+        item = rng.randrange(len(keys))
+        keys[item] = float(rng.randint(0, 20))
+        heap.update(item, keys[item])
+        # Equal keys go to the lowest item
+        assert heap.minimum() == min(range(len(keys)), key=lambda i: (keys[i], i))
+
+
+def test_state_restores_the_heap() -> None:
+    heap = IndexedHeap([3.0, 1.0, 2.0])
+    state = heap.get_state()
+    heap.update(0, 0.0)
+    assert heap.minimum() == 0
+    heap.set_state(state)
+    assert heap.minimum() == 1
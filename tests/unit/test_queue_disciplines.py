@@ -0,0 +1,136 @@
+import copy
+import random
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from abdes1.core import ActorSystem
+from abdes1.des import DE_EventLoop, QueueActor, QueueType
+from abdes1.des.entity import Entity
+from abdes1.des.queue_disciplines import QueueDiscipline, create_discipline
+
+
+def served(queue_type: str, entities: list, now: float = 0.0) -> list:
+    discipline = create_discipline(queue_type, np.random.default_rng(1))
+    for i, entity in enumerate(entities):
+        discipline.push(float(i), entity)
+    order = []
+    while (item := discipline.pop(now)) is not None:
+        order.append(str(item[1]))
+    assert len(discipline) == 0
+    return order
+
+
+ENTITIES = [
+    Entity("a", priority=2, processing_time=3.0, due_date=9.0, entity_class=0),
+    Entity("b", priority=1, processing_time=1.0, due_date=4.0, entity_class=0),
+    Entity("c", priority=2, processing_time=2.0, due_date=5.0, entity_class=1),
+    Entity("d", priority=0, processing_time=4.0, due_date=6.0, entity_class=0),
+]
+
+
+@pytest.mark.parametrize(
+    "queue_type, order",
+    [
+        ("FIFO", ["a", "b", "c", "d"]),
+        ("LIFO", ["d", "c", "b", "a"]),
+        ("Priority", ["d", "b", "a", "c"]),  # equal priorities in arrival order
+        ("SPT", ["b", "c", "a", "d"]),
+        ("LPT", ["d", "a", "c", "b"]),
+        ("EDD", ["b", "c", "d", "a"]),
+        ("RoundRobin", ["a", "c", "b", "d"]),
+        ("CR", ["d", "c", "b", "a"]),  # ratios at time 2: 7/3, 2/1, 3/2, 4/4
+    ],
+)
+def test_service_order(queue_type: str, order: list) -> None:
+    assert served(queue_type, ENTITIES, now=2.0) == order
+
+
+def test_random_serves_everyone_once() -> None:
+    order = served("Random", ENTITIES * 25)
+    assert sorted(order) == sorted(str(entity) for entity in ENTITIES * 25)
+    assert order != [str(entity) for entity in ENTITIES * 25]
+
+
+def test_entity_formats_as_its_name() -> None:
+    entity = Entity("entity_3", priority=1)
+    assert str(entity) == "entity_3"
+    assert f"{entity:<10}|" == "entity_3  |"
+
+
+def test_plain_names_are_served_in_arrival_order() -> None:
+    names = [f"entity_{i}" for i in range(5)]
+    for queue_type in ("Priority", "SPT", "LPT", "EDD", "RoundRobin", "CR"):
+        assert served(queue_type, names) == names
+
+
+def test_every_queue_type_has_a_discipline() -> None:
+    for queue_type in QueueType:
+        create_discipline(queue_type.value, np.random.default_rng(1))
+    with pytest.raises(ValueError):
+        create_discipline("SIRO", np.random.default_rng(1))
+
+
+@pytest.mark.parametrize("queue_type", [queue_type.value for queue_type in QueueType])
+def test_state_restores_the_rest_of_the_order(queue_type: str) -> None:
+    discipline = create_discipline(queue_type, np.random.default_rng(1))
+    for i, entity in enumerate(ENTITIES * 3):
+        discipline.push(float(i), entity)
+    discipline.pop(2.0)
+    state = copy.deepcopy(discipline.get_state())
+    rest = [discipline.pop(2.0) for _ in range(len(discipline))]
+
+    restored = create_discipline(queue_type, np.random.default_rng(7))
+    restored.set_state(state)
+    assert [restored.pop(2.0) for _ in range(len(restored))] == rest
+
+
+def drain(discipline: QueueDiscipline) -> list:
+    # On a copy: the order in which the rest of the line would be served
+    discipline = copy.deepcopy(discipline)
+    return [discipline.pop(2.0) for _ in range(len(discipline))]
+
+
+@pytest.mark.parametrize("queue_type", [queue_type.value for queue_type in QueueType])
+def test_undo_log_takes_back_the_changes_since_a_mark(queue_type: str) -> None:
+    discipline = create_discipline(queue_type, np.random.default_rng(1))
+    discipline.start_undo_log()
+    r = random.Random(2)
+    marks = []
+    for i in range(300):
+        if i % 20 == 0:
+            marks.append((discipline.mark(), drain(discipline)))
+        if r.random() < 0.55:
+            discipline.push(float(i), ENTITIES[r.randrange(len(ENTITIES))]._replace(name=f"e{i}"))
+        else:
+            discipline.pop(2.0)
+
+    # Latest first, as a rollback does
+    discipline.forget(marks[3][0])
+    for mark, rest in reversed(marks[3:]):
+        discipline.undo(mark)
+        assert drain(discipline) == rest
+    assert discipline.undo_log == []
+
+
+def test_marking_a_long_line_copies_nothing() -> None:
+    actor = QueueActor("queue", QueueType.FIFO, "server", "customer", ActorSystem(DE_EventLoop(synchronous=True)))
+    for i in range(100_000):
+        actor.queue.push(float(i), f"customer {i}")
+    line = list(actor.queue.items)  # type: ignore
+    actor.start_undo_logs()
+
+    tracemalloc.start()
+    states = []
+    for i in range(1000):
+        states.append(actor.mark_state())
+        actor.queue.pop(float(i))
+        actor.queue.push(float(100_000 + i), "late")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # A copy of the line per event would be about 800 KB each, 800 MB in all
+    assert peak < 2_000_000
+
+    actor.undo_state(states[0])
+    assert list(actor.queue.items) == line  # type: ignore
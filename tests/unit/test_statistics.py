@@ -0,0 +1,98 @@
+import copy
+import math
+
+import numpy as np
+import pytest
+
+from abdes1.utils.statistics import (
+    BatchMeans,
+    P2Quantile,
+    RunningStatistics,
+    TimeWeightedStatistics,
+    batch_means_interval,
+    confidence_interval,
+    mser,
+    sample_variance,
+    student_t_ppf,
+)
+
+
+@pytest.mark.parametrize("p, df, expected", [(0.975, 1, 12.7062047), (0.975, 9, 2.2621572), (0.995, 30, 2.7499957), (0.05, 4, -2.1318468)])
+def test_student_t_ppf(p: float, df: int, expected: float) -> None:
+    assert student_t_ppf(p, df) == pytest.approx(expected, abs=1e-6)
+
+
+def test_confidence_interval() -> None:
+    ci = confidence_interval([1.0, 2.0, 3.0, 4.0], level=0.95)
+    assert ci.mean == 2.5
+    # t(0.975, 3) * s / sqrt(n)
+    assert ci.half_width == pytest.approx(3.1824463 * math.sqrt(5 / 3) / 2, rel=1e-6)
+    assert math.isnan(confidence_interval([1.0]).half_width)
+
+
+def test_running_statistics_match_the_batch_functions() -> None:
+    values = [2.0, 4.0, 4.0, 5.0, 7.0, 9.0]
+    running = RunningStatistics()
+    for value in values:
+        running.add(value)
+    assert running.count == 6
+    assert running.mean == pytest.approx(sum(values) / 6)
+    assert running.variance == pytest.approx(sample_variance(values))
+    assert (running.minimum, running.maximum) == (2.0, 9.0)
+
+
+def test_time_weighted_mean() -> None:
+    depth = TimeWeightedStatistics()
+    for time, value in [(0.0, 0), (1.0, 2), (3.0, 1), (4.0, 0)]:
+        depth.update(time, value)
+    assert depth.mean() == pytest.approx((0 * 1 + 2 * 2 + 1 * 1) / 4)
+    # The last value holds until the end
+    depth.update(4.0, 3)
+    assert depth.mean(until=6.0) == pytest.approx((5 + 3 * 2) / 6)
+    assert depth.maximum == 3
+
+
+@pytest.mark.parametrize("p", [0.5, 0.9, 0.99])
+def test_p2_quantile_estimate(p: float) -> None:
+    values = np.random.default_rng(1).exponential(1.0, 20000)
+    quantile = P2Quantile(p)
+    for value in values.tolist():
+        quantile.add(value)
+    assert quantile.value == pytest.approx(np.quantile(values, p), rel=0.02)
+
+
+def test_p2_quantile_copy_is_independent() -> None:
+    quantile = P2Quantile(0.5)
+    for value in range(10):
+        quantile.add(float(value))
+    snapshot = copy.copy(quantile)
+    for value in range(100, 110):
+        quantile.add(float(value))
+    assert snapshot.value != quantile.value
+    assert snapshot.count == 10
+
+
+def test_mser_truncates_the_transient() -> None:
+    rng = np.random.default_rng(3)
+    transient = (10.0 * np.exp(-np.arange(50) / 10.0)).tolist()
+    values = [a + b for a, b in zip(transient + [0.0] * 450, rng.normal(0.0, 0.1, 500).tolist())]
+    truncate = mser(values)
+    assert 20 <= truncate <= 60
+    assert mser(rng.normal(0.0, 1.0, 500).tolist()) < 50
+
+
+def test_batch_means_stay_bounded() -> None:
+    batch_means = BatchMeans(batch_size=5, max_batches=8)
+    for value in range(5 * 8 * 4):
+        batch_means.add(float(value))
+    # Full at 40, 80 and 160 observations: every time merged into 4 batches of twice the size
+    assert len(batch_means.means) == 4
+    assert batch_means.batch_size == 40
+    assert sum(m * batch_means.batch_size for m in batch_means.means) == pytest.approx(sum(range(160)))
+
+
+def test_batch_means_interval_groups_batches() -> None:
+    ci = batch_means_interval([1.0, 2.0, 3.0, 4.0, 5.0], batches=2)
+    # The oldest leftover is dropped: groups (2, 3) and (4, 5)
+    assert ci.mean == 3.5
+    assert ci.n == 2
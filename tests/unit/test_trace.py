@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import pytest
+
+from abdes1.actors import Actor, Message
+from abdes1.core import ActorSystem, Event, TraceReader, TraceRecorder
+from abdes1.des import DE_EventLoop
+
+
+async def test_trace_round_trip(tmp_path: Path) -> None:
+    path = str(tmp_path / "run.trace")
+    # A tiny capacity makes the recorder grow the file a few times
+    with TraceRecorder(path, capacity=4) as trace:
+        s = ActorSystem(DE_EventLoop(synchronous=True, trace=trace))
+        s.register_actor(Actor, id="sink")
+        for i in range(10):
+            content = None if i == 3 else f"entity_{i}"
+            s.schedule_event(Event(time=10.0 - i, message=Message(type="customer", from_id="pytest", to_id="sink", content=content)))
+        await s.run()
+
+    with TraceReader(path) as reader:
+        assert len(reader) == 10
+        records = list(reader)
+        assert [r.time for r in records] == [float(t) for t in range(1, 11)]
+        assert records[0].seq == 9 and records[-1].seq == 0
+        assert records[0] == reader[0]
+        assert reader[-1].content == "entity_0"
+        assert reader[6].content is None
+        assert {(r.type, r.from_id, r.to_id) for r in records} == {("customer", "pytest", "sink")}
+        assert [r.content for r in reader[2:5]] == ["entity_7", "entity_6", "entity_5"]
+
+
+def test_trace_needs_room_for_a_record(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        TraceRecorder(str(tmp_path / "run.trace"), capacity=0)
+    assert list(tmp_path.iterdir()) == []